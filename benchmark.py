@@ -0,0 +1,504 @@
+import argparse
+import json
+import math
+import sys
+import time
+import types
+
+import numpy as np
+
+# Camera-free benchmark and gesture regression check. Synthetic landmark
+# sequences (cursor swipes, pinches, static poses, two-hand zoom/rotate, all
+# with landmark noise) go through the same path as a replayed landmark log:
+# HandTracker positions and finger states, MouseController, and the main
+# loop's gesture logic. OS input is replaced by a recorder, so nothing moves
+# and no display is needed.
+#
+#   python3 benchmark.py                    compare against benchmark_baseline.json
+#   python3 benchmark.py --update-baseline  accept the current results
+#
+# Exits 1 when gesture accuracy drops or a component's p95 latency grows past
+# the stored baseline (see --latency-tolerance). Latencies are compared as
+# ratios to a fixed reference workload timed in the same run, so a slower or
+# faster machine than the one that wrote the baseline doesn't count.
+
+FRAME_W, FRAME_H = 640, 480
+FPS = 30.0
+HAND_PX = 140 # wrist to middle knuckle, roughly, at arm's length
+NOISE_PX = 1.5
+SLACK_FRAMES = 6 # a gesture may fire this many frames after its window (voting, smoothing)
+
+
+# --- Mocked OS input ----------------------------------------------------------
+class MockInput:
+    # Stands in for pyautogui and screeninfo; keeps every call it receives
+    def __init__(self):
+        self.calls = []
+        self.pyautogui = types.ModuleType("pyautogui")
+        for name in ("moveTo", "click", "doubleClick", "scroll", "press", "hotkey"):
+            setattr(self.pyautogui, name, self._recorder(name))
+        self.screeninfo = types.ModuleType("screeninfo")
+        self.screeninfo.get_monitors = lambda: [types.SimpleNamespace(width=1920, height=1080)]
+
+    def _recorder(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return record
+
+    def install(self):
+        # Before anything touches the lazily imported modules
+        sys.modules["pyautogui"] = self.pyautogui
+        sys.modules["screeninfo"] = self.screeninfo
+
+
+# --- Synthetic hands ----------------------------------------------------------
+# Knuckles in hand units (HAND_PX), wrist at the origin, fingers pointing up
+# (-y). Index is on the left, so the thumb sits left too, like a right hand
+# seen palm-on in the mirrored preview.
+KNUCKLES = {1: (-0.30, -1.00), 2: (-0.10, -1.05), 3: (0.10, -1.00), 4: (0.28, -0.90)}
+SEGMENTS = (0.45, 0.27, 0.22) # knuckle->PIP->DIP->tip
+CURL = (np.radians(75), np.radians(100), np.radians(60)) # per joint, into the palm (-z)
+
+
+def hand_pose(fingers, cx, cy, angle=0.0, spread=12.0, rng=None, noise_px=NOISE_PX):
+    # (21, 3) normalized landmarks for a [T, I, M, R, P] pattern with the
+    # wrist at pixel (cx, cy), rotated by `angle` degrees. `spread` fans the
+    # fingers apart in degrees; 0 or less brings index and middle tips
+    # together (a pinch).
+    pts = np.zeros((21, 3))
+    for f, (kx, ky) in KNUCKLES.items():
+        base = 1 + 4 * f
+        pts[base] = (kx, ky, 0.0)
+        fan = np.radians((f - 2.5) * spread)
+        direction = np.array([math.sin(fan), -math.cos(fan), 0.0])
+        bend = 0.0
+        for j, length in enumerate(SEGMENTS):
+            if not fingers[f]:
+                bend += CURL[j]
+            step = direction * math.cos(bend) + np.array([0.0, 0.0, -math.sin(bend)])
+            pts[base + j + 1] = pts[base + j] + step * length
+    # Thumb: out to the side when up, folded across the palm when down
+    if fingers[0]:
+        thumb = [(-0.25, -0.25, 0), (-0.50, -0.45, 0), (-0.70, -0.58, 0), (-0.88, -0.70, 0)]
+    else:
+        thumb = [(-0.25, -0.25, 0), (-0.38, -0.45, -0.1), (-0.20, -0.60, -0.2), (0.00, -0.62, -0.25)]
+    pts[1:5] = thumb
+
+    rot = np.radians(angle)
+    c, s = math.cos(rot), math.sin(rot)
+    x = (pts[:, 0] * c - pts[:, 1] * s) * HAND_PX + cx
+    y = (pts[:, 0] * s + pts[:, 1] * c) * HAND_PX + cy
+    z = pts[:, 2] * HAND_PX
+    if rng is not None and noise_px:
+        x, y, z = (v + rng.normal(0, noise_px, 21) for v in (x, y, z))
+    return np.stack([x / FRAME_W, y / FRAME_H, z / FRAME_W], axis=1).astype(np.float32)
+
+
+class Scenario:
+    # frames: list of per-frame hand lists, each hand (pattern, landmarks)
+    # expected: (gesture, first frame, last frame) windows that must fire
+    # ignore: gestures that may fire here without counting against precision
+    # (gestures=False: finger states only, nothing is scored)
+    def __init__(self, name, ignore=(), gestures=True):
+        self.name = name
+        self.frames = []
+        self.expected = []
+        self.ignore = set(ignore)
+        self.gestures = gestures
+
+    def add(self, hands, expect=None):
+        if expect:
+            if self.expected and self.expected[-1][0] == expect and self.expected[-1][2] == len(self.frames) - 1:
+                name, first, _ = self.expected[-1]
+                self.expected[-1] = (name, first, len(self.frames))
+            else:
+                self.expected.append((expect, len(self.frames), len(self.frames)))
+        self.frames.append(hands)
+
+    def idle(self, n):
+        for _ in range(n):
+            self.add([])
+
+
+def build_scenarios(seed=0):
+    rng = np.random.default_rng(seed)
+    scenarios = []
+
+    def one(pattern, cx, cy, **kwargs):
+        return [(pattern, hand_pose(pattern, cx, cy, rng=rng, **kwargs))]
+
+    # Index finger sweeping left to right and back: cursor moves
+    sc = Scenario("cursor_swipe")
+    sc.idle(5)
+    for sweep in range(3):
+        for i in range(40):
+            x = 220 + 240 * (i / 39 if sweep % 2 == 0 else 1 - i / 39)
+            sc.add(one([0, 1, 0, 0, 0], x, 400 - 30 * math.sin(i / 6)), expect="move_cursor")
+    sc.idle(5)
+    scenarios.append(sc)
+
+    # Index + middle up, fanned out, then pinched together: left clicks
+    sc = Scenario("pinch_click")
+    sc.idle(5)
+    for _ in range(4):
+        for _ in range(20):
+            sc.add(one([0, 1, 1, 0, 0], 320, 400, spread=14))
+        for _ in range(12):
+            sc.add(one([0, 1, 1, 0, 0], 320, 400, spread=-3), expect="left_click")
+    for _ in range(20):
+        sc.add(one([0, 1, 1, 0, 0], 320, 400, spread=14))
+    sc.idle(5)
+    scenarios.append(sc)
+
+    # Static poses held with noise; gaps without hands in between. Thumb +
+    # index also steers the cursor, as in the app.
+    poses = [
+        ("right_click", [0, 1, 1, 1, 0], ()),
+        ("play_pause", [0, 0, 0, 0, 0], ()),
+        ("app_switcher", [1, 0, 0, 0, 0], ()),
+        ("volume", [1, 1, 0, 0, 0], ("move_cursor",)),
+    ]
+    for gesture, pattern, ignore in poses:
+        sc = Scenario(f"pose_{gesture}", ignore=ignore)
+        for _ in range(3):
+            sc.idle(20)
+            for _ in range(30):
+                sc.add(one(pattern, 320, 380, angle=rng.normal(0, 8)), expect=gesture)
+        sc.idle(20)
+        scenarios.append(sc)
+
+    # Pinky toggles the whiteboard, then the index finger draws. In draw mode
+    # any pose with the index down lifts the pen, the pinky included.
+    sc = Scenario("whiteboard", ignore={"lift_pen"})
+    sc.idle(10)
+    for _ in range(20):
+        sc.add(one([0, 0, 0, 0, 1], 320, 380), expect="toggle_draw")
+    sc.idle(10)
+    for i in range(40):
+        sc.add(one([0, 1, 0, 0, 0], 200 + 6 * i, 380 + 20 * math.sin(i / 5)), expect="draw_stroke")
+    sc.idle(10)
+    scenarios.append(sc)
+
+    # Every finger pattern in turn, with heavier noise and tilt: finger states only
+    sc = Scenario("noisy_fingers", gestures=False)
+    for _ in range(3):
+        for code in rng.permutation(32):
+            pattern = [int(b) for b in f"{code:05b}"]
+            for _ in range(10):
+                sc.add(one(pattern, rng.uniform(250, 390), rng.uniform(340, 420),
+                           angle=rng.normal(0, 15), noise_px=4.0))
+    scenarios.append(sc)
+
+    # Two open hands: apart then together (zoom), then turning (rotate). Hand 0
+    # with all fingers up also matches right_click, as in the real app.
+    open_hand = [1, 1, 1, 1, 1]
+    def two(d, angle):
+        cx, cy = 320, 360
+        a = np.radians(angle)
+        dx, dy = d / 2 * math.cos(a), d / 2 * math.sin(a)
+        return [(open_hand, hand_pose(open_hand, cx - dx, cy - dy, rng=rng)),
+                (open_hand, hand_pose(open_hand, cx + dx, cy + dy, rng=rng))]
+
+    sc = Scenario("two_hand_zoom", ignore={"right_click"})
+    sc.idle(5)
+    for _ in range(5):
+        sc.add(two(200, 0))
+    for i in range(30):
+        sc.add(two(200 + 6 * i, 0), expect="zoom_in")
+    for _ in range(15):
+        sc.add(two(380, 0))
+    for i in range(30):
+        sc.add(two(380 - 6 * i, 0), expect="zoom_out")
+    sc.idle(5)
+    scenarios.append(sc)
+
+    # Pointing hand plus a second hand, listed in random order every frame as
+    # the landmarker may do: the cursor must stay with the pointing hand (the
+    # first one seen), with no right clicks or rotations from swaps
+    sc = Scenario("two_hand_swap")
+    point, three = [0, 1, 0, 0, 0], [0, 1, 1, 1, 0]
+    sc.idle(5)
+    for _ in range(10):
+        sc.add(one(point, 220, 380), expect="move_cursor")
+    for i in range(60):
+        hands = one(point, 220 + i / 2, 380 - i / 2) + one(three, 460, 380)
+        if rng.random() < 0.5:
+            hands.reverse()
+        sc.add(hands, expect="move_cursor")
+    sc.idle(5)
+    scenarios.append(sc)
+
+    sc = Scenario("two_hand_rotate", ignore={"right_click"})
+    sc.idle(5)
+    for _ in range(5):
+        sc.add(two(260, 0))
+    for i in range(30):
+        sc.add(two(260, 1.5 * i), expect="rotate_right")
+    for _ in range(15):
+        sc.add(two(260, 45))
+    for i in range(30):
+        sc.add(two(260, 45 - 1.5 * i), expect="rotate_left")
+    sc.idle(5)
+    scenarios.append(sc)
+    return scenarios
+
+
+# --- Scoring ------------------------------------------------------------------
+def percentiles(samples):
+    if not samples:
+        return {"p50_us": 0.0, "p95_us": 0.0, "p99_us": 0.0, "per_s": 0.0}
+    arr = np.asarray(samples) * 1e6
+    return {
+        "p50_us": round(float(np.percentile(arr, 50)), 1),
+        "p95_us": round(float(np.percentile(arr, 95)), 1),
+        "p99_us": round(float(np.percentile(arr, 99)), 1),
+        "per_s": round(len(arr) / (arr.sum() / 1e6), 1),
+    }
+
+
+def episodes(frames, gap=3):
+    # Fire frames -> [first, last] runs, merging fires at most `gap` frames apart
+    runs = []
+    for f in sorted(frames):
+        if runs and f - runs[-1][1] <= gap:
+            runs[-1][1] = f
+        else:
+            runs.append([f, f])
+    return runs
+
+
+def score_gestures(scenario, fired):
+    # fired: gesture -> frames it fired on. A window is recalled if its gesture
+    # fires inside it (plus slack); a run of fires outside every window of that
+    # gesture is a false positive.
+    counts = {}
+    if not scenario.gestures:
+        return counts
+    for name, first, last in scenario.expected:
+        hit = any(first <= f <= last + SLACK_FRAMES for f in fired.get(name, ()))
+        c = counts.setdefault(name, {"tp": 0, "fn": 0, "fp": 0})
+        c["tp" if hit else "fn"] += 1
+    for name, frames in fired.items():
+        if name in scenario.ignore:
+            continue
+        windows = [(a, b + SLACK_FRAMES) for n, a, b in scenario.expected if n == name]
+        stray = [f for f in frames if not any(a <= f <= b for a, b in windows)]
+        if stray:
+            counts.setdefault(name, {"tp": 0, "fn": 0, "fp": 0})["fp"] += len(episodes(stray))
+    return counts
+
+
+# --- Runs ---------------------------------------------------------------------
+def run_scenario(scenario, timings):
+    from hand_tracker import HandTracker
+    from mouse_controller import MouseController
+    from system_controller import SystemController
+    from whiteboard import Whiteboard
+    from gestures import GestureState, build_gesture_engine, process_gestures
+    from main import collect_hands
+
+    tracker = HandTracker(model_path=None, max_hands=2)
+    mouse = MouseController(smoothing=4)
+    state = GestureState(Whiteboard(FRAME_W, FRAME_H), mouse, SystemController(), FRAME_W, FRAME_H)
+    engine = build_gesture_engine()
+    img = np.zeros((FRAME_H, FRAME_W, 3), np.uint8)
+    fired = {}
+    finger_frames = finger_correct = 0
+    last_pattern = {}
+
+    for i, hands in enumerate(scenario.frames):
+        t = i / FPS
+        start = time.perf_counter()
+        landmarks = np.array([lm for _, lm in hands], np.float32).reshape(-1, 21, 3)
+        tracker.set_landmarks(landmarks, ["Right"] * len(hands))
+        # The list API too, as test_cam.py and older callers use it
+        tracker.find_position(img, draw=False)
+        hands_data = collect_hands(tracker, img)
+        tracked = time.perf_counter()
+        for name in (name for _, name in process_gestures(engine, state, hands_data, now=t)):
+            fired.setdefault(name, []).append(i)
+        done = time.perf_counter()
+        timings["tracker"].append(tracked - start)
+        timings["gestures"].append(done - tracked)
+        timings["frame"].append(done - start)
+
+        # Finger states, once the vote window has caught up with a new pose.
+        # Each scripted hand is scored against the tracked hand at its wrist.
+        for pattern, lm in hands:
+            k = int(np.argmin([np.abs(data['landmarks'][0] - lm[0]).sum() for data in hands_data]))
+            h = hands_data[k]['id']
+            seen = last_pattern.get(h)
+            if seen is None or seen[0] != pattern:
+                last_pattern[h] = (pattern, i)
+            elif i - last_pattern[h][1] >= tracker.finger_window:
+                finger_frames += 1
+                finger_correct += hands_data[k]['fingers'] == list(pattern)
+        for h in set(last_pattern) - {data['id'] for data in hands_data}:
+            del last_pattern[h]
+    return score_gestures(scenario, fired), finger_frames, finger_correct
+
+
+def reference_workload(rounds=200):
+    # Fixed mix of small numpy and plain Python work, like the per-frame code;
+    # its median time is the unit the component latencies are measured in
+    rng = np.random.default_rng(2)
+    landmarks = rng.random((2, 21, 3))
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        pts = (landmarks[:, :, :2] * (FRAME_W, FRAME_H)).astype(np.int32)
+        spread = np.linalg.norm(np.diff(landmarks, axis=1), axis=-1).sum(-1)
+        total = 0.0
+        for hand in pts.tolist():
+            for x, y in hand:
+                total += math.hypot(x, y)
+        total += float(spread.sum())
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+def bench_mouse(timings, samples=3000, seed=1):
+    # move_cursor alone, with each cursor filter, on a noisy circular path
+    from cursor_filters import FILTERS
+    from mouse_controller import MouseController
+    rng = np.random.default_rng(seed)
+    path = [(320 + 150 * math.cos(i / 20) + rng.normal(0, NOISE_PX),
+             240 + 100 * math.sin(i / 20) + rng.normal(0, NOISE_PX)) for i in range(samples)]
+    for kind in sorted(FILTERS):
+        mouse = MouseController(smoothing=4, cursor_filter=kind)
+        key = f"mouse_{kind}"
+        for i, (x, y) in enumerate(path):
+            start = time.perf_counter()
+            mouse.move_cursor(x, y, FRAME_W, FRAME_H, timestamp=i / FPS)
+            timings[key].append(time.perf_counter() - start)
+
+
+def run(seed=0, repeat=3):
+    mock = MockInput()
+    mock.install()
+    reference = [reference_workload()]
+    scenarios = build_scenarios(seed)
+    timings = {name: [] for name in ("frame", "tracker", "gestures")}
+    from cursor_filters import FILTERS
+    timings.update({f"mouse_{kind}": [] for kind in sorted(FILTERS)})
+
+    per_gesture = {}
+    finger_frames = finger_correct = 0
+    for rep in range(repeat):
+        for scenario in scenarios:
+            counts, frames, correct = run_scenario(scenario, timings)
+            if rep:
+                continue # accuracy is deterministic; repeats only add timing samples
+            finger_frames += frames
+            finger_correct += correct
+            for name, c in counts.items():
+                total = per_gesture.setdefault(name, {"tp": 0, "fn": 0, "fp": 0})
+                for k in total:
+                    total[k] += c[k]
+        bench_mouse(timings)
+        reference.append(reference_workload())
+
+    accuracy = {"finger_accuracy": round(finger_correct / max(finger_frames, 1), 4)}
+    tp = sum(c["tp"] for c in per_gesture.values())
+    fp = sum(c["fp"] for c in per_gesture.values())
+    fn = sum(c["fn"] for c in per_gesture.values())
+    accuracy["precision"] = round(tp / max(tp + fp, 1), 4)
+    accuracy["recall"] = round(tp / max(tp + fn, 1), 4)
+    for name, c in sorted(per_gesture.items()):
+        accuracy[f"{name}.precision"] = round(c["tp"] / max(c["tp"] + c["fp"], 1), 4)
+        accuracy[f"{name}.recall"] = round(c["tp"] / max(c["tp"] + c["fn"], 1), 4)
+    # The fastest pass is the least disturbed one
+    reference_us = round(min(reference), 2)
+    latency = {name: percentiles(samples) for name, samples in timings.items()}
+    for stats in latency.values():
+        stats["p95_ratio"] = round(stats["p95_us"] / reference_us, 2)
+    return {
+        "accuracy": accuracy,
+        "reference_us": reference_us,
+        "latency": latency,
+        "frames": sum(len(s.frames) for s in scenarios),
+        "input_calls": len(mock.calls),
+    }
+
+
+def compare(results, baseline, latency_tolerance=1.0, accuracy_tolerance=0.0):
+    # -> list of regression messages (empty: pass)
+    problems = []
+    for name, base in baseline.get("accuracy", {}).items():
+        value = results["accuracy"].get(name)
+        if value is None or value < base - accuracy_tolerance:
+            problems.append(f"{name}: {value} < baseline {base}")
+    for name, base in baseline.get("latency", {}).items():
+        # p95 in units of this machine's reference workload; older baselines
+        # only have absolute microseconds
+        key = "p95_ratio" if "p95_ratio" in base else "p95_us"
+        value = results["latency"].get(name, {}).get(key)
+        limit = base[key] * (1 + latency_tolerance)
+        unit = "x reference" if key == "p95_ratio" else "us"
+        if value is None or value > limit:
+            problems.append(f"{name} p95: {value}{unit} > {limit:.2f}{unit} (baseline {base[key]}{unit})")
+    return problems
+
+
+def print_report(results):
+    print(f"{results['frames']} synthetic frames, {results['input_calls']} mocked input calls, "
+          f"reference workload {results['reference_us']}us")
+    print(f"{'component':18s} {'p50 us':>9s} {'p95 us':>9s} {'p99 us':>9s} {'per s':>10s} {'p95/ref':>8s}")
+    for name, stats in results["latency"].items():
+        print(f"{name:18s} {stats['p50_us']:9.1f} {stats['p95_us']:9.1f} {stats['p99_us']:9.1f} {stats['per_s']:10.1f} "
+              f"{stats['p95_ratio']:8.2f}")
+    for name, value in results["accuracy"].items():
+        print(f"{name:28s} {value:.4f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Camera-free benchmark and gesture accuracy regression check")
+    parser.add_argument("--baseline", default="benchmark_baseline.json",
+                        help="stored results to compare against (default benchmark_baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write this run's results to --baseline instead of comparing")
+    parser.add_argument("--latency-tolerance", type=float, default=1.0,
+                        help="allowed p95 latency growth over the baseline, relative to the reference "
+                             "workload, as a fraction (default 1.0: twice the baseline)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.0,
+                        help="allowed drop in any accuracy figure (default 0)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="passes over the scenarios; more passes steady the latency figures")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the full results to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(seed=args.seed, repeat=args.repeat)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {"accuracy": results["accuracy"], "reference_us": results["reference_us"],
+                    "latency": {name: {"p95_us": s["p95_us"], "p95_ratio": s["p95_ratio"]}
+                                for name, s in results["latency"].items()}}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 1
+    problems = compare(results, baseline, args.latency_tolerance, args.accuracy_tolerance)
+    for problem in problems:
+        print(f"❌ REGRESSION {problem}")
+    if not problems:
+        print("✅ No regressions against the baseline.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import math
+import time
+
+
+class ExponentialFilter:
+    # The original fixed-divisor smoothing: move 1/smoothing of the way to the
+    # target each update. reject() undoes an update the caller didn't apply
+    # (the cursor deadzone), which is exactly how MouseController used to behave.
+    def __init__(self, smoothing=4, initial=0.0):
+        self.smoothing = smoothing
+        self.value = initial
+        self.prev_value = initial
+
+    def filter(self, value, t):
+        self.prev_value = self.value
+        self.value = self.value + (value - self.value) / self.smoothing
+        return self.value
+
+    def reject(self):
+        self.value = self.prev_value
+
+    def reset(self, value=0.0):
+        self.value = self.prev_value = value
+
+
+class OneEuroFilter:
+    # Speed-adaptive low-pass (Casiez et al. 2012): a low cutoff while the hand
+    # is still kills jitter, and the cutoff rises with speed so fast flicks lag less.
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, value, t):
+        if self.t is None:
+            self.value = value if self.value is None else self.value
+            self.t = t
+            return self.value
+        dt = t - self.t
+        if dt <= 0:
+            return self.value
+        d_value = (value - self.value) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.d_value = self.d_value + a_d * (d_value - self.d_value)
+
+        cutoff = self.min_cutoff + self.beta * abs(self.d_value)
+        a = self._alpha(cutoff, dt)
+        self.value = self.value + a * (value - self.value)
+        self.t = t
+        return self.value
+
+    def reject(self):
+        pass
+
+    def reset(self, value=None):
+        self.value = value
+        self.d_value = 0.0
+        self.t = None
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter on one axis. The output is the state
+    # extrapolated `lead_ms` ahead, i.e. to when the cursor actually reaches the
+    # screen, which hides part of the capture/inference/display pipeline delay.
+    def __init__(self, process_noise=1e5, measurement_noise=10.0, lead_ms=30.0):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.lead = lead_ms / 1000.0
+        self.reset()
+
+    def filter(self, value, t):
+        if self.t is None:
+            self.p, self.t = value, t
+            return value
+        dt = t - self.t
+        if dt <= 0:
+            return self.p + self.v * self.lead
+        self.t = t
+
+        # Predict
+        self.p += self.v * dt
+        q = self.q
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + q * dt ** 4 / 4
+        p01 = self.p01 + dt * self.p11 + q * dt ** 3 / 2
+        p11 = self.p11 + q * dt ** 2
+
+        # Update with the measured position
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        residual = value - self.p
+        self.p += k0 * residual
+        self.v += k1 * residual
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        return self.p + self.v * self.lead
+
+    def reject(self):
+        pass
+
+    def reset(self, value=None):
+        self.p = value or 0.0
+        self.v = 0.0
+        self.p00, self.p01, self.p11 = 1000.0, 0.0, 1000.0
+        self.t = None
+
+
+FILTERS = {
+    "exponential": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def make_filter(kind, **params):
+    if kind not in FILTERS:
+        raise ValueError(f"Unknown cursor filter '{kind}', expected one of {sorted(FILTERS)}")
+    return FILTERS[kind](**params)
+
+
+def synthetic_trajectory(fps=30, noise_px=1.5, seed=0):
+    # Hold, fast flick across the screen, hold again: (t, true_x, measured_x)
+    import random
+    rng = random.Random(seed)
+    samples = []
+    for i in range(fps * 3):
+        t = i / fps
+        if t < 1.0:
+            true_x = 200.0
+        elif t < 1.25:
+            true_x = 200.0 + (t - 1.0) / 0.25 * 1200.0
+        else:
+            true_x = 1400.0
+        samples.append((t, true_x, true_x + rng.gauss(0, noise_px)))
+    return samples
+
+
+def evaluate_filter(flt, samples, settle_s=0.5):
+    # Lag: mean absolute error while the target moves. Jitter: mean absolute
+    # frame-to-frame output change once the target has been still for settle_s.
+    flt.reset(samples[0][2])
+    moving_err, still_delta = [], []
+    prev_out = prev_true = None
+    still_since = samples[0][0]
+    for t, true_x, measured_x in samples:
+        out = flt.filter(measured_x, t)
+        if prev_true is not None and true_x != prev_true:
+            moving_err.append(abs(out - true_x))
+            still_since = t
+        elif prev_out is not None and t - still_since >= settle_s:
+            still_delta.append(abs(out - prev_out))
+        prev_out, prev_true = out, true_x
+    return {
+        "lag_px": round(sum(moving_err) / max(len(moving_err), 1), 2),
+        "jitter_px": round(sum(still_delta) / max(len(still_delta), 1), 3),
+    }
+
+
+def compare_filters(samples=None, configs=None):
+    samples = samples or synthetic_trajectory()
+    configs = configs or {kind: {} for kind in FILTERS}
+    return {kind: evaluate_filter(make_filter(kind, **params), samples) for kind, params in configs.items()}
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    for kind, result in compare_filters().items():
+        print(f"{kind:12s} lag {result['lag_px']:8.2f}px  jitter {result['jitter_px']:6.3f}px")
+    print(f"evaluated in {(time.perf_counter() - start) * 1000:.1f}ms")
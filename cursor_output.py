@@ -0,0 +1,224 @@
+import threading
+import time
+
+from input_dispatcher import MOVE
+from lazy_imports import LazyModule
+
+pyautogui = LazyModule("pyautogui")
+
+# Cursor output decoupled from the camera: MouseController hands each filtered
+# target to a CursorUpsampler, whose own thread moves the pointer at the
+# display rate and fills the gaps between camera frames, either by easing
+# towards the newest target over one frame interval (interpolate, smooth but
+# one frame behind) or by running on at the last velocity (extrapolate, no
+# added lag, may overshoot on sudden stops, then settles back on the last
+# target). With an InputDispatcher the moves are queued on its worker like
+# every other input event, and settle() puts the pointer on the final target
+# before a click so the click never lands on an eased position.
+
+
+class PyAutoGUIBackend:
+    def move(self, x, y):
+        pyautogui.moveTo(x, y)
+
+
+class NullBackend:
+    # Moves nothing; counts calls (benchmarks, headless stations)
+    def __init__(self):
+        self.moves = 0
+
+    def move(self, x, y):
+        self.moves += 1
+
+
+class RecordingBackend:
+    # Keeps every (time, x, y) it was asked to move to
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.moves = []
+
+    def move(self, x, y):
+        self.moves.append((self.clock(), x, y))
+
+
+class DispatchedBackend:
+    # Queues each move on an InputDispatcher as a coalesced MOVE, so pointer
+    # moves and clicks reach the OS from one thread, in order
+    def __init__(self, backend, dispatcher):
+        self.backend = backend
+        self.dispatcher = dispatcher
+
+    def move(self, x, y):
+        self.dispatcher.submit(MOVE, self.backend.move, x, y)
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "null": NullBackend,
+    "record": RecordingBackend,
+}
+UPSAMPLE_MODES = ("interpolate", "extrapolate")
+
+
+def make_backend(kind, **params):
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown cursor backend '{kind}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[kind](**params)
+
+
+class CursorUpsampler:
+    def __init__(self, backend, rate_hz=120.0, mode="interpolate", max_extrapolation=0.05,
+                 deadzone=0.5, clock=time.perf_counter):
+        if mode not in UPSAMPLE_MODES:
+            raise ValueError(f"Unknown upsample mode '{mode}', expected one of {list(UPSAMPLE_MODES)}")
+        self.backend = backend
+        self.period = 1.0 / rate_hz
+        self.mode = mode
+        self.max_extrapolation = max_extrapolation # seconds to run on past the last target
+        self.deadzone = deadzone # px; smaller output steps are not sent
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._output_lock = threading.Lock() # one move at a time: ticks and settle()
+        self._start = self._end = None # segment being eased along: (x, y)
+        self._velocity = (0.0, 0.0)
+        self._arrived = 0.0
+        self._interval = 1 / 30 # running estimate of the target interval
+        self._sent = None
+        self._thread = None
+        self.running = False
+        self.targets = 0
+        self.ticks = 0
+        self.moves = 0
+        self.late_ticks = 0
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="cursor-output", daemon=True)
+        self._thread.start()
+        return self
+
+    def set_target(self, x, y):
+        # Newest filtered cursor position; called once per processed frame
+        now = self.clock()
+        with self._lock:
+            if self._end is None:
+                self._start = self._end = (x, y)
+            else:
+                dt = now - self._arrived
+                if dt > 0:
+                    self._interval += (min(dt, 0.25) - self._interval) * 0.2
+                    self._velocity = ((x - self._end[0]) / dt, (y - self._end[1]) / dt)
+                # The new segment starts where the output is now, so no jumps
+                self._start = self._position(now)
+                self._end = (x, y)
+            self._arrived = now
+            self.targets += 1
+
+    def _position(self, now):
+        elapsed = now - self._arrived
+        if self.mode == "extrapolate":
+            # Run on for max_extrapolation, then ease back over the same time:
+            # once targets stop the pointer rests on the last one
+            lead = max(min(elapsed, 2 * self.max_extrapolation - elapsed), 0.0)
+            return self._end[0] + self._velocity[0] * lead, self._end[1] + self._velocity[1] * lead
+        f = min(elapsed / max(self._interval, self.period), 1.0)
+        return (self._start[0] + (self._end[0] - self._start[0]) * f,
+                self._start[1] + (self._end[1] - self._start[1]) * f)
+
+    def position(self, now=None):
+        with self._lock:
+            if self._end is None:
+                return None
+            return self._position(self.clock() if now is None else now)
+
+    def tick(self, now=None):
+        # One output step: moves the pointer if the position changed enough
+        with self._output_lock:
+            self.ticks += 1
+            pos = self.position(now)
+            if pos is None:
+                return
+            if self._sent is not None and abs(pos[0] - self._sent[0]) + abs(pos[1] - self._sent[1]) < self.deadzone:
+                return
+            self._move(pos)
+
+    def settle(self):
+        # Ends the current segment on the newest target and moves there now;
+        # called before a click so it lands where the hand pointed
+        with self._output_lock:
+            with self._lock:
+                if self._end is None:
+                    return
+                self._start = self._end
+                self._velocity = (0.0, 0.0)
+                pos = self._end
+            if pos != self._sent:
+                self._move(pos)
+
+    def _move(self, pos):
+        try:
+            self.backend.move(*pos)
+        except Exception as e:
+            print(f"Cursor Output Error: {e}")
+        self._sent = pos
+        self.moves += 1
+
+    def _run(self):
+        deadline = self.clock()
+        while self.running:
+            deadline += self.period
+            delay = deadline - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.period:
+                # Fell a whole tick behind (e.g. descheduled): skip, don't burst
+                self.late_ticks += 1
+                deadline = self.clock()
+            self.tick()
+
+    def stats(self):
+        return {
+            "rate_hz": round(1 / self.period, 1),
+            "mode": self.mode,
+            "targets": self.targets,
+            "ticks": self.ticks,
+            "moves": self.moves,
+            "late_ticks": self.late_ticks,
+        }
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+
+def simulate(mode, rate_hz=144, fps=30, seconds=2.0, speed_px_s=1500.0):
+    # Drives an upsampler with a virtual clock: a cursor target moving at a
+    # constant speed, updated at the camera rate. Returns the largest and mean
+    # pointer step and the mean lag behind the true position, in pixels.
+    now = [0.0]
+    backend = RecordingBackend(clock=lambda: now[0])
+    upsampler = CursorUpsampler(backend, rate_hz=rate_hz, mode=mode, deadzone=0, clock=lambda: now[0])
+    next_frame = 0.0
+    for i in range(int(seconds * rate_hz)):
+        now[0] = i / rate_hz
+        while next_frame <= now[0]:
+            upsampler.set_target(speed_px_s * next_frame, 0.0)
+            next_frame += 1 / fps
+        upsampler.tick()
+    settled = backend.moves[rate_hz // 2:] # skip the first half second
+    xs = [x for _, x, _ in settled]
+    steps = [b - a for a, b in zip(xs, xs[1:])]
+    lag = [speed_px_s * t - x for t, x, _ in settled]
+    return {
+        "max_step_px": round(max(steps), 1),
+        "mean_step_px": round(sum(steps) / len(steps), 1),
+        "mean_lag_px": round(sum(lag) / len(lag), 1),
+    }
+
+
+if __name__ == "__main__":
+    print("30 FPS targets, 144 Hz output, 1500 px/s sweep")
+    print(f"{'per-frame':12s} every move is a {1500.0 / 30:.1f}px jump")
+    for mode in UPSAMPLE_MODES:
+        print(f"{mode:12s} {simulate(mode)}")
@@ -0,0 +1,388 @@
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+from lazy_imports import LazyModule
+
+# mediapipe is imported on first use (see lazy_imports)
+mp = LazyModule("mediapipe")
+python = LazyModule("mediapipe.tasks.python")
+vision = LazyModule("mediapipe.tasks.python.vision")
+
+# Hand detectors behind HandTracker. A detector turns one frame (as main.py
+# hands it over) into (landmarks (n, 21, 3) normalized, handedness labels,
+# scores) through detect(img, timestamp_ms), and has reset() and close().
+# HandTracker does the cropping, downscaling, smoothing and finger logic
+# around it, in process or in inference worker processes.
+DETECTORS = ("mediapipe", "contour")
+DELEGATES = ("cpu", "gpu")
+
+_model_cache = {} # path -> model file bytes
+_model_lock = threading.Lock()
+
+def load_model(model_path):
+    # Reads the .task file once per process; main preloads it while the camera opens
+    with _model_lock:
+        if model_path not in _model_cache:
+            with open(model_path, "rb") as f:
+                _model_cache[model_path] = f.read()
+        return _model_cache[model_path]
+
+def create_landmarker(model_path, max_hands, detection_con, track_con, live_stream=False, result_callback=None,
+                      delegate="cpu"):
+    base_options = {"model_asset_buffer": load_model(model_path)}
+    if delegate == "gpu":
+        base_options["delegate"] = python.BaseOptions.Delegate.GPU
+    return vision.HandLandmarker.create_from_options(vision.HandLandmarkerOptions(
+        base_options=python.BaseOptions(**base_options),
+        num_hands=max_hands,
+        min_hand_detection_confidence=detection_con,
+        min_hand_presence_confidence=track_con,
+        running_mode=vision.RunningMode.LIVE_STREAM if live_stream else vision.RunningMode.VIDEO,
+        result_callback=result_callback
+    ))
+
+def parse_result(result, max_hands):
+    # -> (landmarks (n, 21, 3), handedness labels, handedness scores)
+    if not result or not result.hand_landmarks:
+        return np.zeros((0, 21, 3), np.float32), [], []
+    hands = result.hand_landmarks[:max_hands]
+    landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand] for hand in hands], np.float32)
+    labels = [h[0].category_name if h else "Unknown" for h in result.handedness[:max_hands]]
+    scores = [h[0].score if h else 0.0 for h in result.handedness[:max_hands]]
+    return landmarks, labels, scores
+
+@contextmanager
+def cpu_limit(threads, first_cpu=0):
+    # MediaPipe's Python API has no thread count option; its inference threads
+    # are sized from the core count. They are started while the landmarker is
+    # built and inherit the creating thread's CPU affinity (Linux: per thread),
+    # so pinning this thread to `threads` cores for the duration caps the
+    # cores the landmarker runs on. first_cpu staggers worker processes.
+    # Only the calling thread is pinned, and only inside the block: use it on
+    # a thread that starts nothing else meanwhile (see build_pinned).
+    if not threads:
+        yield
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        print(f"⚠️ Detector threads: CPU pinning is not available on this platform; "
+              f"ignoring the {threads}-core limit")
+        yield
+        return
+    before = os.sched_getaffinity(0)
+    cpus = sorted(before)
+    start = first_cpu % len(cpus)
+    os.sched_setaffinity(0, (cpus + cpus)[start:start + min(threads, len(cpus))])
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, before)
+
+def build_pinned(build, threads, first_cpu=0):
+    # Runs build() under cpu_limit on a short-lived thread of its own, so
+    # neither the caller nor threads the caller starts meanwhile are pinned
+    if not threads:
+        return build()
+    out = {}
+    def run():
+        try:
+            with cpu_limit(threads, first_cpu):
+                out['value'] = build()
+        except Exception as e:
+            out['error'] = e
+    builder = threading.Thread(target=run, name="detector-build", daemon=True)
+    builder.start()
+    builder.join()
+    if 'error' in out:
+        raise out['error']
+    return out['value']
+
+
+class MediaPipeDetector:
+    # The MediaPipe HandLandmarker. model_path picks the model variant (any
+    # hand landmarker .task bundle), threads caps the cores it may use (0: all)
+    # and delegate runs it on the CPU or, where supported, the GPU. In
+    # LIVE_STREAM mode detect() queues the frame and returns the newest
+    # finished result, which may belong to an earlier frame.
+    name = "mediapipe"
+
+    def __init__(self, model_path, max_hands=1, detection_con=0.5, track_con=0.5, live_stream=False,
+                 threads=0, delegate="cpu", first_cpu=0):
+        self.max_hands = max_hands
+        self.live_stream = live_stream
+        self._lock = threading.Lock()
+        self._live_result = None
+        self._last_timestamp_ms = -1
+        self.landmarker = build_pinned(
+            lambda: create_landmarker(model_path, max_hands, detection_con, track_con, live_stream,
+                                      self._on_result if live_stream else None, delegate),
+            threads, first_cpu)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        with self._lock:
+            self._live_result = result
+
+    def detect(self, img, timestamp_ms):
+        # VIDEO mode needs strictly increasing timestamps, even for two calls in one frame
+        timestamp_ms = max(int(timestamp_ms), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img)
+        if self.live_stream:
+            self.landmarker.detect_async(mp_image, timestamp_ms)
+            with self._lock:
+                result = self._live_result
+        else:
+            result = self.landmarker.detect_for_video(mp_image, timestamp_ms)
+        return parse_result(result, self.max_hands)
+
+    def reset(self):
+        with self._lock:
+            self._live_result = None
+
+    def close(self):
+        self.landmarker.close()
+
+
+# Contour skeleton, in palm radii across the palm (towards the thumb) for
+# index..pinky: where the knuckles go, and where an extended finger's tip
+# usually is.
+KNUCKLE_SIDE = (0.75, 0.25, -0.25, -0.7)
+TIP_SIDE = (1.5, 0.4, -0.7, -1.8)
+THUMB_SHIFT = 0.2
+
+
+class ContourDetector:
+    # Lightweight fallback for machines that can't run the landmarker in time
+    # (or can't install mediapipe): skin segmentation in YCrCb on a small copy
+    # of the frame, then a skeleton fitted to each skin blob. The palm is the
+    # blob's largest inscribed circle, fingertips are convex hull points well
+    # outside it, and fingers without a tip are folded. Only a 2D layout is
+    # estimated (z is 0), and it assumes roughly upright hands in front of a
+    # background that isn't skin coloured: enough for the cursor and the
+    # finger-pattern gestures, not for fine pinches.
+    name = "contour"
+    skin_low = np.array([0, 133, 77], np.uint8) # Y, Cr, Cb
+    skin_high = np.array([255, 173, 127], np.uint8)
+
+    def __init__(self, max_hands=1, work_width=160, min_area=0.01, input_bgr=True):
+        self.max_hands = max_hands
+        self.work_width = work_width
+        self.min_area = min_area # smallest blob, as a fraction of the frame
+        # main.py feeds camera frames (BGR) straight to the detector
+        self.color_code = cv2.COLOR_BGR2YCrCb if input_bgr else cv2.COLOR_RGB2YCrCb
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._small = self._ycrcb = self._mask = self._blob = self._dist = None
+
+    def detect(self, img, timestamp_ms):
+        h, w = img.shape[:2]
+        scale = min(self.work_width / w, 1.0)
+        size = (max(int(w * scale), 1), max(int(h * scale), 1))
+        if self._mask is None or self._mask.shape != size[::-1]:
+            self._small = np.empty((size[1], size[0], 3), np.uint8)
+            self._ycrcb = np.empty_like(self._small)
+            self._mask = np.empty(size[::-1], np.uint8)
+            self._blob = np.empty_like(self._mask)
+            self._dist = np.empty(size[::-1], np.float32)
+        cv2.resize(img, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, self.color_code, dst=self._ycrcb)
+        cv2.inRange(self._ycrcb, self.skin_low, self.skin_high, dst=self._mask)
+        cv2.morphologyEx(self._mask, cv2.MORPH_OPEN, self._kernel, dst=self._mask)
+
+        contours, _ = cv2.findContours(self._mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_px = self.min_area * size[0] * size[1]
+        blobs = sorted((c for c in contours if cv2.contourArea(c) >= min_px), key=cv2.contourArea,
+                       reverse=True)[:self.max_hands]
+        landmarks, labels, scores = [], [], []
+        for contour in blobs:
+            fitted = self._fit_hand(contour, size)
+            if fitted is None:
+                continue
+            pts, label = fitted
+            landmarks.append(pts)
+            labels.append(label)
+            scores.append(min(cv2.contourArea(contour) / (4 * min_px), 1.0))
+        if not landmarks:
+            return np.zeros((0, 21, 3), np.float32), [], []
+        return np.array(landmarks, np.float32), labels, scores
+
+    def _fit_hand(self, contour, size):
+        # -> ((21, 3) normalized landmarks, handedness label), or None
+        w, h = size
+        self._blob[:] = 0
+        cv2.drawContours(self._blob, [contour], -1, 255, cv2.FILLED)
+        cv2.distanceTransform(self._blob, cv2.DIST_L2, 3, dst=self._dist)
+        _, r, _, center = cv2.minMaxLoc(self._dist)
+        if r < 2:
+            return None
+        center = np.array(center, np.float64)
+
+        # Hand axis: the blob's principal axis, pointing up, within 60° of vertical
+        m = cv2.moments(contour)
+        theta = 0.5 * np.arctan2(2 * m["mu11"], m["mu20"] - m["mu02"])
+        up = np.array([np.cos(theta), np.sin(theta)])
+        if up[1] > 0:
+            up = -up
+        if up[1] > -0.5:
+            up = np.array([0.0, -1.0])
+        left = np.array([up[1], -up[0]]) # image left when the hand points up
+
+        # Fingertip candidates: hull points far outside the palm, away from the
+        # frame border (where the forearm enters), merged when close together
+        hull = cv2.convexHull(contour).reshape(-1, 2).astype(np.float64)
+        tips = []
+        for p in sorted(hull, key=lambda p: -np.linalg.norm(p - center)):
+            d = p - center
+            if np.linalg.norm(d) < 1.8 * r or d @ up < -0.3 * np.linalg.norm(d):
+                continue
+            if p[0] < 2 or p[1] < 2 or p[0] > w - 3 or p[1] > h - 3:
+                continue
+            if all(np.linalg.norm(p - q) > 0.6 * r for q in tips):
+                tips.append(p)
+        angles = [np.degrees(np.arctan2((p - center) @ left, (p - center) @ up)) for p in tips]
+
+        # The thumb is the most sideways tip; without one, assume the thumb
+        # points towards the middle of the (mirrored) frame
+        lateral = [i for i, a in enumerate(angles) if 50 <= abs(a) <= 120]
+        if lateral:
+            thumb = max(lateral, key=lambda i: abs(angles[i]))
+            side = np.sign(angles[thumb])
+        else:
+            thumb = None
+            side = 1.0 if center[0] > w / 2 else -1.0
+        across = left * side
+
+        def at(a_side, a_up):
+            return center + across * a_side * r + up * a_up * r
+
+        # The remaining tips go to index..pinky in order, skipping the fingers
+        # whose usual tip position fits worst
+        # (an extended thumb widens the palm circle and pulls it thumbwards)
+        shift = THUMB_SHIFT if thumb is not None else 0.0
+        offsets = {i: (tips[i] - center) @ across / r + shift for i in range(len(tips))}
+        # (knuckles of a fist are hull points too, but closer in)
+        fingers = sorted((i for i in range(len(tips)) if i != thumb and abs(angles[i]) < 50
+                          and np.linalg.norm(tips[i] - center) >= 2.6 * r), key=lambda i: -offsets[i])[:4]
+        slots = min(itertools.combinations(range(4), len(fingers)),
+                    key=lambda c: sum((TIP_SIDE[s] - offsets[i]) ** 2 for s, i in zip(c, fingers)))
+        finger_tips = dict(zip(slots, (tips[i] for i in fingers)))
+
+        pts = np.zeros((21, 3), np.float64)
+        pts[0, :2] = at(0, -1.4)
+        pts[1, :2] = at(0.55, -0.8)
+        pts[2, :2] = at(0.95, -0.2)
+        if thumb is not None:
+            pts[4, :2] = tips[thumb]
+            pts[3, :2] = pts[2, :2] + (tips[thumb] - pts[2, :2]) * 0.55
+        else:
+            pts[3, :2], pts[4, :2] = at(0.9, 0.45), at(0.3, 0.75) # folded across the palm
+        for f, knuckle_side in enumerate(KNUCKLE_SIDE):
+            base = 5 + 4 * f
+            mcp = at(knuckle_side, 1.1)
+            pts[base, :2] = mcp
+            if f in finger_tips:
+                tip = finger_tips[f]
+                pts[base + 1, :2] = mcp + (tip - mcp) * 0.48
+                pts[base + 2, :2] = mcp + (tip - mcp) * 0.77
+                pts[base + 3, :2] = tip
+            else:
+                pts[base + 1, :2], pts[base + 2, :2], pts[base + 3, :2] = (
+                    at(knuckle_side, 1.7), at(knuckle_side, 1.35), at(knuckle_side, 0.9))
+        pts[:, 0] /= w
+        pts[:, 1] /= h
+        # MediaPipe labels mirrored frames: a thumb on the image left is a right hand
+        return pts, "Right" if side > 0 else "Left"
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_detector(model_path, max_hands=1, detection_con=0.5, track_con=0.5, live_stream=False,
+                    kind="mediapipe", threads=0, delegate="cpu", first_cpu=0):
+    if kind == "mediapipe":
+        return MediaPipeDetector(model_path, max_hands, detection_con, track_con, live_stream,
+                                 threads=threads, delegate=delegate, first_cpu=first_cpu)
+    if kind == "contour":
+        return ContourDetector(max_hands)
+    raise ValueError(f"Unknown detector '{kind}', expected one of {list(DETECTORS)}")
+
+
+def probe_frame(width, height):
+    # Synthetic benchmark frame: sensor-like noise plus a skin coloured open
+    # hand, so both the landmarker and the contour detector do real work
+    rng = np.random.default_rng(0)
+    img = rng.integers(40, 90, (height, width, 3), np.uint8)
+    skin = (120, 150, 200) # BGR
+    s = min(width, height) / 480
+    cx, cy = width // 2, int(height * 0.6)
+    cv2.ellipse(img, (cx, cy), (int(60 * s), int(70 * s)), 0, 0, 360, skin, cv2.FILLED)
+    for dx, length in ((-45, 110), (-15, 130), (15, 125), (45, 100)):
+        x = cx + int(dx * s)
+        cv2.line(img, (x, cy - int(40 * s)), (x + int(dx * s / 3), cy - int(length * s) - int(40 * s)),
+                 skin, max(int(22 * s), 1))
+    cv2.line(img, (cx - int(55 * s), cy), (cx - int(120 * s), cy - int(50 * s)), skin, max(int(24 * s), 1))
+    return img
+
+
+def time_detector(detector, img, runs=8, warmup=3):
+    # Median ms per detect() on img after a few warm-up calls
+    for t in range(warmup):
+        detector.detect(img, t)
+    times = []
+    for t in range(warmup, warmup + runs):
+        start = time.perf_counter()
+        detector.detect(img, t)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def autoselect(model_path, max_hands, detection_con, track_con, frame_shape, budget_ms=25.0, widths=None,
+               threads=None, delegate="cpu"):
+    # Short startup benchmark: the landmarker at the largest input width that
+    # fits budget_ms per frame, with the fewest threads that get it there, so
+    # spare cores stay free for everything else; the contour detector when
+    # no landmarker configuration fits (or mediapipe can't be loaded).
+    # -> (options for create_detector, input width or None, ms, report lines)
+    h, w = frame_shape[:2]
+    if widths is None:
+        widths = [w] + [x for x in (480, 320) if x < w]
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    if not hasattr(os, "sched_setaffinity"):
+        # Without pinning every thread count is the same configuration
+        print("⚠️ Detector threads: CPU pinning is not available on this platform; "
+              "benchmarking without a core limit")
+        threads = [0]
+    elif threads is None:
+        threads = sorted({min(t, cores) for t in (1, 2, 4, cores)})
+    report = []
+    for width in widths:
+        img = probe_frame(width, max(int(h * width / w), 1))
+        for n in threads:
+            try:
+                detector = create_detector(model_path, max_hands, detection_con, track_con, threads=n,
+                                           delegate=delegate)
+            except Exception as e:
+                report.append(f"mediapipe unavailable: {e}")
+                return _contour_choice(max_hands, w, h, delegate, report)
+            try:
+                ms = time_detector(detector, img)
+            finally:
+                detector.close()
+            report.append(f"mediapipe {width}px {f'{n} thread(s)' if n else 'all threads'}: {ms:.1f}ms")
+            if ms <= budget_ms:
+                options = {"kind": "mediapipe", "threads": n if 0 < n < cores else 0, "delegate": delegate}
+                return options, width if width < w else None, ms, report
+    return _contour_choice(max_hands, w, h, delegate, report)
+
+
+def _contour_choice(max_hands, w, h, delegate, report):
+    detector = ContourDetector(max_hands)
+    ms = time_detector(detector, probe_frame(w, h))
+    report.append(f"contour {w}px: {ms:.1f}ms")
+    return {"kind": "contour", "threads": 0, "delegate": delegate}, None, ms, report
@@ -0,0 +1,126 @@
+import socket
+from collections import namedtuple
+
+import numpy as np
+
+from event_stream import (PROTOCOL_VERSION, MSG_HELLO, MSG_LANDMARKS, MSG_GESTURE, MESSAGE_HEADER, HELLO,
+                          LANDMARKS_HEADER, HAND_BYTES, GESTURE_HEADER, LandmarkRing)
+from video_source import HANDEDNESS_NAMES
+
+# Client side of the event stream (see event_stream.py); no mediapipe needed:
+#
+#   with EventClient("/tmp/gester.sock") as client:
+#       for event in client:
+#           if isinstance(event, GestureEvent): print(event.name)
+LandmarkFrame = namedtuple("LandmarkFrame", "frame_id timestamp landmarks handedness")
+GestureEvent = namedtuple("GestureEvent", "frame_id timestamp hand name")
+
+
+def decode_landmarks(payload):
+    frame_id, timestamp, n = LANDMARKS_HEADER.unpack_from(payload)
+    landmarks = np.empty((n, 21, 3), np.float32)
+    handedness = []
+    offset = LANDMARKS_HEADER.size
+    for i in range(n):
+        handedness.append(HANDEDNESS_NAMES.get(int(np.int8(payload[offset])), "Unknown"))
+        landmarks[i] = np.frombuffer(payload, "<f4", 63, offset + 1).reshape(21, 3)
+        offset += HAND_BYTES
+    return LandmarkFrame(frame_id, timestamp, landmarks, handedness)
+
+
+def decode_gesture(payload):
+    frame_id, timestamp, hand, length = GESTURE_HEADER.unpack_from(payload)
+    start = GESTURE_HEADER.size
+    return GestureEvent(frame_id, timestamp, hand, bytes(payload[start:start + length]).decode())
+
+
+class EventClient:
+    def __init__(self, path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._buf = bytearray()
+        hello = self._read_message()
+        if hello is None or hello[0] != MSG_HELLO:
+            self.sock.close()
+            raise ConnectionError("event stream did not start with a hello")
+        self.version, self.max_hands = HELLO.unpack(hello[1])
+        if self.version != PROTOCOL_VERSION:
+            raise ConnectionError(f"event stream protocol {self.version}, expected {PROTOCOL_VERSION}")
+
+    def _read_message(self):
+        # One (type, payload) off the socket, buffering across partial reads;
+        # None once the server has gone away.
+        while True:
+            if len(self._buf) >= MESSAGE_HEADER.size:
+                length, kind = MESSAGE_HEADER.unpack_from(self._buf)
+                end = MESSAGE_HEADER.size + length
+                if len(self._buf) >= end:
+                    payload = bytes(self._buf[MESSAGE_HEADER.size:end])
+                    del self._buf[:end]
+                    return kind, payload
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                return None
+            self._buf += chunk
+
+    def receive(self):
+        # Next LandmarkFrame or GestureEvent, or None when the stream ends.
+        # Unknown message types are skipped so old clients keep working.
+        while True:
+            message = self._read_message()
+            if message is None:
+                return None
+            kind, payload = message
+            if kind == MSG_LANDMARKS:
+                return decode_landmarks(payload)
+            if kind == MSG_GESTURE:
+                return decode_gesture(payload)
+
+    def __iter__(self):
+        while True:
+            event = self.receive()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RingReader:
+    # Polls the newest frame out of a LandmarkRing by name (printed by
+    # main.py --event-ring). Never blocks the publisher: a slot caught
+    # mid-write is simply read again.
+    def __init__(self, name):
+        self.ring = LandmarkRing(name)
+
+    def latest(self, tries=8):
+        # LandmarkFrame for the newest complete frame, or None if nothing has
+        # been written yet (or the writer kept overtaking us).
+        ring = self.ring
+        for _ in range(tries):
+            count = int(ring.header[0])
+            if count == 0:
+                return None
+            slot = ring.ring[(count - 1) % ring.slots]
+            before = int(slot["seq"])
+            if before & 1:
+                continue
+            frame_id = int(slot["frame"])
+            rec = slot["record"].copy()
+            if int(slot["seq"]) != before:
+                continue
+            n = int(rec["n"])
+            handedness = [HANDEDNESS_NAMES.get(int(code), "Unknown") for code in rec["handedness"][:n]]
+            return LandmarkFrame(frame_id, float(rec["t"]), np.array(rec["landmarks"][:n]), handedness)
+        return None
+
+    def close(self):
+        self.ring.close()
@@ -0,0 +1,320 @@
+import os
+import selectors
+import socket
+import stat
+import struct
+import sys
+import threading
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from video_source import HANDEDNESS_CODES, log_record_dtype
+
+# Landmarks and gesture events for other local processes, so one camera and
+# one inference pass can serve any number of consumers.
+#
+# Socket framing: every message is a 5-byte header (payload length u32,
+# message type u8) followed by the payload, all little-endian:
+#   HELLO     version u16, max hands u16
+#   LANDMARKS frame id u64, timestamp f64, hand count u8, then per hand
+#             handedness i1 (0 left, 1 right, -1 unknown) + (21, 3) float32
+#   GESTURE   frame id u64, timestamp f64, hand u8, name length u8, utf-8 name
+PROTOCOL_VERSION = 1
+MSG_HELLO, MSG_LANDMARKS, MSG_GESTURE = 0, 1, 2
+MESSAGE_HEADER = struct.Struct("<IB")
+HELLO = struct.Struct("<HH")
+LANDMARKS_HEADER = struct.Struct("<QdB")
+HAND_BYTES = 1 + 21 * 3 * 4
+GESTURE_HEADER = struct.Struct("<QdBB")
+
+
+def encode_landmarks(frame_id, timestamp, landmarks, handedness):
+    n = len(landmarks)
+    payload = bytearray(LANDMARKS_HEADER.pack(frame_id, timestamp, n))
+    for i in range(n):
+        label = handedness[i] if i < len(handedness) else "Unknown"
+        payload += struct.pack("<b", HANDEDNESS_CODES.get(label, -1))
+        payload += np.ascontiguousarray(landmarks[i], "<f4").tobytes()
+    return MESSAGE_HEADER.pack(len(payload), MSG_LANDMARKS) + payload
+
+
+def encode_gesture(frame_id, timestamp, hand, name):
+    raw = name.encode()[:255]
+    payload = GESTURE_HEADER.pack(frame_id, timestamp, hand, len(raw)) + raw
+    return MESSAGE_HEADER.pack(len(payload), MSG_GESTURE) + payload
+
+
+class _Subscriber:
+    __slots__ = ("sock", "queue", "pending", "dropped", "sent")
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.queue = deque() # (message type, bytes)
+        self.pending = b"" # rest of a partially sent message
+        self.dropped = 0
+        self.sent = 0
+
+
+class EventServer:
+    # Unix-domain socket publisher. publish_*() only appends encoded bytes to
+    # each subscriber's bounded queue and wakes the sender thread, so the vision
+    # loop never waits on a socket. A subscriber that falls max_queue messages
+    # behind loses its oldest landmark frames first; gesture events are only
+    # dropped if its queue holds nothing else.
+    def __init__(self, path, max_hands=2, max_queue=64):
+        self.path = path
+        self.max_hands = max_hands
+        self.max_queue = max_queue
+        self.subscribers = {}
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._thread = None
+        self.running = False
+        self.published = 0
+        self.dropped = 0 # across all subscribers, including departed ones
+
+    def _remove_socket(self):
+        # Removes a socket file left at self.path; anything else there is kept.
+        # -> False when the path holds something that is not a socket
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            return True
+        if not stat.S_ISSOCK(mode):
+            return False
+        os.unlink(self.path)
+        return True
+
+    def start(self):
+        # A socket left at the path is stale (from a previous run); a regular
+        # file there is most likely a mistyped --event-socket, so it is kept
+        if not self._remove_socket():
+            raise FileExistsError(f"Event socket path '{self.path}' is in use by something that is not a socket")
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.path)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="event-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def publish_landmarks(self, frame_id, timestamp, landmarks, handedness):
+        if not self.subscribers:
+            return
+        self._publish(MSG_LANDMARKS, encode_landmarks(frame_id, timestamp, landmarks, handedness))
+
+    def publish_gesture(self, frame_id, timestamp, hand, name):
+        if not self.subscribers:
+            return
+        self._publish(MSG_GESTURE, encode_gesture(frame_id, timestamp, hand, name))
+
+    def _publish(self, kind, message):
+        with self._lock:
+            self.published += 1
+            for sub in self.subscribers.values():
+                if len(sub.queue) >= self.max_queue:
+                    self._drop_one(sub)
+                sub.queue.append((kind, message))
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass # a wake-up is already pending
+
+    def _drop_one(self, sub):
+        for i, (kind, _) in enumerate(sub.queue):
+            if kind == MSG_LANDMARKS:
+                del sub.queue[i]
+                break
+        else:
+            sub.queue.popleft()
+        sub.dropped += 1
+        self.dropped += 1
+
+    def _run(self):
+        while self.running:
+            for key, _ in self._selector.select(timeout=0.5):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                elif isinstance(key.data, _Subscriber):
+                    self._service(key.data)
+            self._flush_all()
+
+    def _accept(self):
+        try:
+            sock, _ = self._listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        sub = _Subscriber(sock)
+        sub.pending = MESSAGE_HEADER.pack(HELLO.size, MSG_HELLO) + HELLO.pack(PROTOCOL_VERSION, self.max_hands)
+        with self._lock:
+            self.subscribers[sock.fileno()] = sub
+        self._selector.register(sock, selectors.EVENT_READ, sub)
+
+    def _service(self, sub):
+        # Readable subscriber: clients never send anything, so this is a hang-up
+        try:
+            data = sub.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._disconnect(sub)
+
+    def _flush_all(self):
+        with self._lock:
+            subs = list(self.subscribers.values())
+        for sub in subs:
+            self._flush(sub)
+
+    def _flush(self, sub):
+        # Sends as much as the socket takes without blocking; the rest waits for
+        # the next round, re-armed through EVENT_WRITE.
+        while True:
+            if not sub.pending:
+                with self._lock:
+                    if not sub.queue:
+                        break
+                    sub.pending = sub.queue.popleft()[1]
+            try:
+                sent = sub.sock.send(sub.pending)
+            except BlockingIOError:
+                break
+            except OSError:
+                self._disconnect(sub)
+                return
+            sub.pending = sub.pending[sent:]
+            if not sub.pending:
+                sub.sent += 1
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if sub.pending or sub.queue else 0)
+        try:
+            self._selector.modify(sub.sock, events, sub)
+        except (KeyError, ValueError):
+            pass
+
+    def _disconnect(self, sub):
+        with self._lock:
+            self.subscribers.pop(sub.sock.fileno(), None)
+        try:
+            self._selector.unregister(sub.sock)
+        except (KeyError, ValueError):
+            pass
+        sub.sock.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "published": self.published,
+                "subscribers": len(self.subscribers),
+                "dropped": self.dropped,
+            }
+
+    def stop(self):
+        self.running = False
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        for sub in list(self.subscribers.values()):
+            self._disconnect(sub)
+        self._selector.close()
+        self._listener.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        self._remove_socket()
+
+
+# --- Shared-memory ring -------------------------------------------------------
+# The newest `slots` frames as landmark log records (video_source.log_record_dtype)
+# plus a per-slot sequence number, for consumers that only want the latest
+# landmarks and would rather poll memory than read a socket:
+#   header: frames written, slot count, max hands (u64 each)
+#   slot:   seq u64 (odd while being written), frame id u64, log record
+def ring_slot_dtype(max_hands):
+    return np.dtype([("seq", "<u8"), ("frame", "<u8"), ("record", log_record_dtype(max_hands))])
+
+
+# Rings created by this process; a reader in the same process shares the
+# publisher's resource_tracker registration and must leave it alone
+_created = set()
+
+
+def attach_shared_memory(name):
+    # Before Python 3.13 attaching registers the segment with this process's
+    # resource_tracker, which unlinks it when the process exits: the first
+    # reader to exit would delete the publisher's ring. Only the creator
+    # unlinks, so readers attach untracked.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if shm.name not in _created:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class LandmarkRing:
+    HEADER_SIZE = 24
+
+    def __init__(self, name=None, max_hands=2, slots=8):
+        # name=None creates the ring (publisher); a name attaches to it (reader)
+        self.owner = name is None
+        if self.owner:
+            size = self.HEADER_SIZE + slots * ring_slot_dtype(max_hands).itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            _created.add(self.shm.name)
+        else:
+            self.shm = attach_shared_memory(name)
+        self.header = np.ndarray(3, np.uint64, buffer=self.shm.buf)
+        if self.owner:
+            self.header[:] = (0, slots, max_hands)
+        self.slots, self.max_hands = int(self.header[1]), int(self.header[2])
+        self.ring = np.ndarray(self.slots, ring_slot_dtype(self.max_hands), buffer=self.shm.buf,
+                               offset=self.HEADER_SIZE)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame_id, timestamp, landmarks, handedness):
+        count = int(self.header[0])
+        slot = self.ring[count % self.slots]
+        n = min(len(landmarks), self.max_hands)
+        slot["seq"] += 1 # odd: being written
+        slot["frame"] = frame_id
+        rec = slot["record"]
+        rec["t"] = timestamp
+        rec["n"] = n
+        rec["handedness"] = -1
+        if n:
+            rec["landmarks"][:n] = landmarks[:n]
+            for i, label in enumerate(list(handedness)[:n]):
+                rec["handedness"][i] = HANDEDNESS_CODES.get(label, -1)
+        slot["seq"] += 1
+        self.header[0] = count + 1
+
+    def close(self):
+        self.header = self.ring = None
+        self.shm.close()
+        if self.owner:
+            _created.discard(self.shm.name)
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass # already gone (e.g. removed by hand); nothing left to clean up
@@ -0,0 +1,81 @@
+import threading
+import tracemalloc
+
+import numpy as np
+
+
+class FramePool:
+    # Recycles full-size frame buffers between capture, flip and display so the
+    # steady state allocates nothing. acquire() hands out a free buffer of the
+    # requested shape (allocating only when none is free), release() returns it.
+    # Thread-safe: in pipelined mode buffers are acquired and released on
+    # different threads.
+    def __init__(self, dtype=np.uint8, max_free=8):
+        self.dtype = dtype
+        self.max_free = max_free # per shape; extra released buffers are let go
+        self._free = {} # shape -> list of free buffers
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.acquired = 0
+
+    def acquire(self, shape):
+        shape = tuple(shape)
+        with self._lock:
+            self.acquired += 1
+            free = self._free.get(shape)
+            if free:
+                return free.pop()
+            self.allocated += 1
+        return np.empty(shape, self.dtype)
+
+    def release(self, buf):
+        if buf is None:
+            return
+        with self._lock:
+            free = self._free.setdefault(buf.shape, [])
+            if len(free) < self.max_free:
+                free.append(buf)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "allocated": self.allocated,
+                "acquired": self.acquired,
+                "free": sum(len(v) for v in self._free.values()),
+            }
+
+
+class AllocationProbe:
+    # Debug check that steady-state frames make no large allocations. tracemalloc
+    # sees every NumPy buffer (including arrays OpenCV returns), so a transient
+    # full-size temporary still shows up as a jump in the traced peak even if it
+    # is freed again within the frame. Slows everything down; debug only.
+    def __init__(self, threshold_bytes=64 * 1024, warmup=30):
+        self.threshold = threshold_bytes
+        self.warmup = warmup
+        self.frames = 0
+        self.large_frames = 0
+        self.largest = 0
+        self._start = 0
+        self._open = False
+        tracemalloc.start()
+
+    def tick(self):
+        # Call once per loop iteration: closes the previous frame, opens the next
+        if self._open:
+            self.frames += 1
+            growth = tracemalloc.get_traced_memory()[1] - self._start
+            if self.frames > self.warmup and growth >= self.threshold:
+                self.large_frames += 1
+                self.largest = max(self.largest, growth)
+        tracemalloc.reset_peak()
+        self._start = tracemalloc.get_traced_memory()[0]
+        self._open = True
+
+    def report(self):
+        steady = max(self.frames - self.warmup, 0)
+        return (f"{self.large_frames} of {steady} steady-state frames made an allocation of "
+                f">= {self.threshold // 1024}KB (largest {self.largest // 1024}KB)")
+
+    def stop(self):
+        tracemalloc.stop()
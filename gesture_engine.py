@@ -0,0 +1,150 @@
+import time
+
+FINGER_NAMES = "TIMRP"
+
+
+def finger_mask(fingers):
+    # [T, I, M, R, P] -> 5-bit int, thumb is the high bit so masks read like the list
+    mask = 0
+    for f in fingers:
+        mask = (mask << 1) | (1 if f else 0)
+    return mask
+
+
+def pattern_masks(pattern):
+    # "?10??" -> every finger mask it matches ('1' up, '0' down, '?' either)
+    if len(pattern) != 5 or set(pattern) - set("01?"):
+        raise ValueError(f"Finger pattern must be 5 of '0', '1', '?' (T I M R P), got '{pattern}'")
+    masks = [0]
+    for ch in pattern:
+        bits = (0, 1) if ch == "?" else (int(ch),)
+        masks = [(m << 1) | b for m in masks for b in bits]
+    return masks
+
+
+class GestureRule:
+    # One gesture: finger pattern + optional hand / mode / predicate, and an action.
+    # Rules sharing a `chain` behave like an if/elif chain: the first one whose
+    # pattern and predicate match is selected, later ones are not evaluated. A
+    # selected rule still on cooldown does not fall through to the next one.
+    def __init__(self, name, pattern, action, chain=None, hand=None, mode=None, predicate=None,
+                 cooldown=0.0, cooldown_group=None, debounce=0.0):
+        self.name = name
+        self.pattern = pattern
+        self.masks = pattern_masks(pattern)
+        self.action = action
+        self.chain = chain or name
+        self.hand = hand
+        self.mode = mode
+        self.predicate = predicate
+        self.cooldown = cooldown
+        self.cooldown_group = cooldown_group or name
+        self.debounce = debounce
+        self.order = 0
+
+        self.evaluations = 0
+        self.fires = 0
+        self.eval_time = 0.0
+        self._held = {} # hand id -> (first frame time, last frame index) the rule matched
+
+
+class GestureEngine:
+    def __init__(self, modes=("nav", "draw"), clock=time.monotonic):
+        self.modes = modes
+        self.clock = clock
+        self.rules = []
+        self.table = {}
+        self.cooldowns = {} # group -> time it becomes ready again
+        self.frame = 0
+        self.now = 0.0
+        self.started = None
+
+    def register(self, rule):
+        rule.order = len(self.rules)
+        self.rules.append(rule)
+        self.table = {}
+        return rule
+
+    def add(self, name, pattern, action, **kwargs):
+        return self.register(GestureRule(name, pattern, action, **kwargs))
+
+    def compile(self):
+        # table[mode][mask] -> candidate rules in registration order, so a frame
+        # only looks at rules that can match its finger state.
+        self.table = {mode: [[] for _ in range(32)] for mode in self.modes}
+        for rule in self.rules:
+            for mode in ([rule.mode] if rule.mode else self.modes):
+                for mask in rule.masks:
+                    self.table[mode][mask].append(rule)
+        return self.table
+
+    def begin_frame(self, now=None):
+        self.frame += 1
+        self.now = self.clock() if now is None else now
+        if self.started is None:
+            self.started = self.now
+
+    def forget(self, hand_ids):
+        # Drops debounce state of hands that are gone; IDs are never reused, so
+        # without this every hand that ever appeared would stay in _held
+        for rule in self.rules:
+            for key in [key for key in rule._held if key not in hand_ids]:
+                del rule._held[key]
+
+    def ready(self, group):
+        # The microsecond of slack keeps float timestamps from missing an expiry by an ulp
+        return self.now >= self.cooldowns.get(group, 0.0) - 1e-6
+
+    def trigger(self, group, seconds):
+        self.cooldowns[group] = self.now + seconds
+
+    def evaluate(self, hand, fingers, mode, ctx, hand_id=None):
+        # Runs the rules that match this hand's fingers; returns names of rules
+        # fired. `hand` is the hand's position in the frame (what rule.hand
+        # means); debounce state is kept per hand_id, so it follows the hand.
+        key = hand if hand_id is None else hand_id
+        if not self.table:
+            self.compile()
+        fired = []
+        done_chains = set()
+        for rule in self.table[mode][finger_mask(fingers)]:
+            if rule.chain in done_chains or (rule.hand is not None and rule.hand != hand):
+                continue
+            start = time.perf_counter()
+            rule.evaluations += 1
+            matched = rule.predicate is None or rule.predicate(ctx)
+            rule.eval_time += time.perf_counter() - start
+            if not matched:
+                continue
+            done_chains.add(rule.chain)
+
+            # Debounce: the pattern must have been held for `debounce` seconds
+            first_seen, last_frame = rule._held.get(key, (self.now, -1))
+            if last_frame != self.frame - 1:
+                first_seen = self.now
+            rule._held[key] = (first_seen, self.frame)
+            if self.now - first_seen < rule.debounce:
+                continue
+
+            if rule.cooldown and not self.ready(rule.cooldown_group):
+                continue
+            start = time.perf_counter()
+            rule.action(ctx)
+            rule.eval_time += time.perf_counter() - start
+            rule.fires += 1
+            if rule.cooldown:
+                self.trigger(rule.cooldown_group, rule.cooldown)
+            fired.append(rule.name)
+        return fired
+
+    def stats(self):
+        elapsed = max(self.now - self.started, 1e-9) if self.started is not None else 1e-9
+        return {
+            rule.name: {
+                "evaluations": rule.evaluations,
+                "fires": rule.fires,
+                "fire_rate_hz": round(rule.fires / elapsed, 3),
+                "avg_cost_us": round(rule.eval_time / rule.evaluations * 1e6, 2) if rule.evaluations else 0.0,
+            }
+            for rule in self.rules
+        }
@@ -0,0 +1,196 @@
+import math
+import numpy as np
+from gesture_engine import GestureEngine
+
+# Cooldowns used to be frame counts in the main loop; these are the same
+# lengths at the 30 FPS the app was tuned for, now independent of frame rate.
+FPS_TUNED = 30.0
+SWIPE_COOLDOWN = 40 / FPS_TUNED
+APP_SWITCH_COOLDOWN = 20 / FPS_TUNED
+TOGGLE_COOLDOWN = 30 / FPS_TUNED
+VOLUME_COOLDOWN = 5 / FPS_TUNED
+ZOOM_COOLDOWN = 10 / FPS_TUNED
+ROTATE_COOLDOWN = 15 / FPS_TUNED
+
+TOOLBAR_HEIGHT = 70
+PINCH_DISTANCE = 45
+
+
+class GestureState:
+    # Everything the gesture actions read or change. The per-hand fields (hand,
+    # hand_id, pts, fingers) are set before each hand is evaluated: hand is the
+    # position in this frame (0 is the oldest tracked hand, which steers the
+    # cursor), hand_id the persistent ID that per-hand state is kept under.
+    def __init__(self, board, mouse, sys_ctrl, frame_w, frame_h, margin=100):
+        self.board = board
+        self.mouse = mouse
+        self.sys_ctrl = sys_ctrl
+        self.frame_w, self.frame_h = frame_w, frame_h
+        self.margin = margin
+
+        self.draw_mode = False
+        self.draw_color = (0, 255, 0) # Default Green
+        self.brush_thickness = 5
+        self.eraser_thickness = 50
+
+        # 2-Hand Statics
+        self.initial_dist = 0
+        self.initial_angle = 0
+        self.hand_pair = None # IDs of the two hands the statics were taken from
+
+        self.hand = 0
+        self.hand_id = 0
+        self.pts = None
+        self.fingers = None
+        self.now = 0.0
+
+        # Render hints for this frame (the gesture code itself never draws)
+        self.draw_cursors = []
+        self.hand_link = None
+
+    @property
+    def mode(self):
+        return "draw" if self.draw_mode else "nav"
+
+
+# --- NAVIGATION & SYSTEM MODE ---
+def play_pause(s):
+    s.sys_ctrl.media_control('play_pause')
+
+def app_switcher(s):
+    s.sys_ctrl.app_switcher()
+
+def volume(s):
+    y1 = s.pts[8][1]
+    if y1 < 200: s.sys_ctrl.volume_step('up')
+    elif y1 > 300: s.sys_ctrl.volume_step('down')
+
+def toggle_draw_mode(s):
+    s.draw_mode = not s.draw_mode
+
+def move_cursor(s):
+    x1, y1 = s.pts[8]
+    s.mouse.move_cursor(x1, y1, s.frame_w, s.frame_h, margin=s.margin, timestamp=s.now)
+
+def is_pinched(s):
+    (x1, y1), (x2, y2) = s.pts[8], s.pts[12]
+    return np.hypot(x2 - x1, y2 - y1) < PINCH_DISTANCE
+
+def left_click(s):
+    s.mouse.click()
+
+def right_click(s):
+    s.mouse.right_click()
+
+# --- DRAW MODE LOGIC ---
+def in_toolbar(s):
+    return s.pts[8][1] < TOOLBAR_HEIGHT
+
+def below_toolbar(s):
+    return s.pts[8][1] > TOOLBAR_HEIGHT
+
+def select_tool(s):
+    x1 = s.pts[8][0]
+    if 0 < x1 < 100: s.draw_color = (255, 0, 0)
+    elif 100 < x1 < 200: s.draw_color = (0, 255, 0)
+    elif 200 < x1 < 300: s.draw_color = (0, 0, 255)
+    elif 300 < x1 < 450: s.draw_color = (0, 0, 0)
+    elif 450 < x1 < 640: s.board.clear()
+
+def draw_stroke(s):
+    # Drawing (Both hands can draw smoothly!)
+    x1, y1 = s.pts[8]
+    thickness = s.brush_thickness if s.draw_color != (0, 0, 0) else s.eraser_thickness
+    s.board.stroke_to(s.hand_id, (x1, y1), s.draw_color, thickness)
+    s.draw_cursors.append(((x1, y1), s.draw_color))
+
+def lift_pen(s):
+    s.board.end_stroke(s.hand_id)
+
+
+def build_gesture_engine(clock=None):
+    engine = GestureEngine() if clock is None else GestureEngine(clock=clock)
+
+    # System gestures: one if/elif chain, sharing the "swipe" cooldown like before
+    engine.add('play_pause', '00000', play_pause, chain='system', mode='nav',
+               cooldown=SWIPE_COOLDOWN, cooldown_group='swipe')
+    engine.add('app_switcher', '10000', app_switcher, chain='system', mode='nav',
+               cooldown=APP_SWITCH_COOLDOWN, cooldown_group='swipe')
+    engine.add('volume', '11000', volume, chain='system', mode='nav', cooldown=VOLUME_COOLDOWN)
+
+    # Pinky UP to toggle draw mode
+    engine.add('toggle_draw', '00001', toggle_draw_mode, mode='nav',
+               cooldown=TOGGLE_COOLDOWN, cooldown_group='swipe')
+
+    # Mouse Control (Only first hand controls cursor)
+    engine.add('move_cursor', '?10??', move_cursor, chain='mouse', hand=0, mode='nav')
+    engine.add('left_click', '?11??', left_click, chain='mouse', hand=0, mode='nav', predicate=is_pinched)
+    engine.add('right_click', '?111?', right_click, chain='mouse', hand=0, mode='nav')
+
+    # Whiteboard: header interaction is first-hand only to avoid conflicts
+    engine.add('select_tool', '?1???', select_tool, chain='draw', hand=0, mode='draw', predicate=in_toolbar)
+    engine.add('draw_stroke', '?1???', draw_stroke, chain='draw', mode='draw', predicate=below_toolbar)
+    engine.add('lift_pen', '?0???', lift_pen, chain='draw', mode='draw')
+
+    engine.compile()
+    return engine
+
+
+def two_hand_gestures(engine, s, hands_data):
+    # Two-Hand Special Gestures (Zoom & Rotate); returns the names fired
+    fired = []
+    if len(hands_data) != 2:
+        s.initial_dist = 0
+        return fired
+    cx1, cy1 = hands_data[0]['pts'][9]
+    cx2, cy2 = hands_data[1]['pts'][9]
+    pair = (hands_data[0]['id'], hands_data[1]['id'])
+    if pair != s.hand_pair:
+        # A different pair of hands: don't compare against the old one
+        s.initial_dist, s.hand_pair = 0, pair
+
+    curr_dist = np.hypot(cx2 - cx1, cy2 - cy1)
+    curr_angle = math.degrees(math.atan2(cy2 - cy1, cx2 - cx1))
+
+    if s.initial_dist == 0:
+        s.initial_dist, s.initial_angle = curr_dist, curr_angle
+    else:
+        dist_diff = curr_dist - s.initial_dist
+        if abs(dist_diff) > 50 and engine.ready('zoom'):
+            if dist_diff > 0: s.sys_ctrl.zoom_control('in')
+            else: s.sys_ctrl.zoom_control('out')
+            fired.append('zoom_in' if dist_diff > 0 else 'zoom_out')
+            engine.trigger('zoom', ZOOM_COOLDOWN)
+            s.initial_dist = curr_dist
+
+        angle_diff = curr_angle - s.initial_angle
+        if abs(angle_diff) > 20 and engine.ready('zoom'):
+            if angle_diff > 0: s.sys_ctrl.rotate_control('right')
+            else: s.sys_ctrl.rotate_control('left')
+            fired.append('rotate_right' if angle_diff > 0 else 'rotate_left')
+            engine.trigger('zoom', ROTATE_COOLDOWN)
+            s.initial_angle = curr_angle
+
+    s.hand_link = ((cx1, cy1), (cx2, cy2))
+    return fired
+
+
+def process_gestures(engine, s, hands_data, now=None):
+    # Returns (hand, gesture name) for everything that fired this frame;
+    # two-hand gestures are reported on hand 0.
+    engine.begin_frame(now)
+    s.now = engine.now
+    s.draw_cursors = []
+    s.hand_link = None
+    # Hands missing from this frame take their debounce state and open strokes
+    # with them. A hand back within HandAssociator.memory frames keeps its ID
+    # but starts a new stroke; one gone longer comes back under a new ID.
+    hand_ids = {data['id'] for data in hands_data}
+    engine.forget(hand_ids)
+    s.board.end_strokes_except(hand_ids)
+    fired = []
+    for i, data in enumerate(hands_data):
+        s.hand, s.hand_id, s.pts, s.fingers = i, data['id'], data['pts'], data['fingers']
+        fired.extend((i, name) for name in engine.evaluate(i, data['fingers'], s.mode, s, hand_id=data['id']))
+    fired.extend((0, name) for name in two_hand_gestures(engine, s, hands_data))
+    return fired
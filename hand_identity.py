@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+
+# Landmarks that place a hand: the wrist and the four finger knuckles, which
+# move with the hand but not with the fingers
+ANCHORS = [0, 5, 9, 13, 17]
+
+
+class HandAssociator:
+    # Persistent hand IDs across frames. The landmarker reports hands in no
+    # particular order, so with two hands the order can swap from one frame to
+    # the next. Each frame's hands are matched to the tracked ones by palm
+    # centroid distance, plus a penalty when the handedness labels disagree;
+    # max_hands is tiny, so every assignment is tried and the cheapest wins.
+    # Hands without a match get a new ID. A track that lost its hand is kept
+    # for `memory` frames, so one missed detection doesn't renumber the hand.
+    def __init__(self, max_distance=0.25, label_penalty=0.15, memory=5):
+        self.max_distance = max_distance # normalized frame units; farther is a new hand
+        self.label_penalty = label_penalty
+        self.memory = memory
+        self.tracks = {} # id -> [centroid (2,), label, frames since seen]
+        self.next_id = 0
+        self.reordered = 0 # frames whose hands arrived out of ID order
+
+    def _cost(self, track, centroid, label):
+        last, last_label, _ = track
+        dist = float(np.linalg.norm(centroid - last))
+        if dist > self.max_distance:
+            return None
+        if label != last_label and "Unknown" not in (label, last_label):
+            dist += self.label_penalty
+        return dist
+
+    def associate(self, landmarks, labels):
+        # -> (order, ids): order lists this frame's hands by ID, oldest first
+        # (landmarks[order]), and ids[k] is the ID of the k-th hand in that order
+        n = len(landmarks)
+        centroids = landmarks[:, ANCHORS, :2].mean(axis=1) if n else np.zeros((0, 2))
+        track_ids = sorted(self.tracks)
+        costs = [{tid: self._cost(self.tracks[tid], centroids[i], labels[i]) for tid in track_ids}
+                 for i in range(n)]
+
+        # Each hand takes a track or None (new); an unmatched hand costs as
+        # much as the worst allowed match, so a match is always preferred
+        new_cost = self.max_distance + self.label_penalty
+        best, best_cost = [None] * n, new_cost * n
+        for choice in itertools.permutations(track_ids + [None] * n, n):
+            total = 0.0
+            for i, tid in enumerate(choice):
+                c = new_cost if tid is None else costs[i][tid]
+                if c is None:
+                    break
+                total += c
+            else:
+                if total < best_cost - 1e-9:
+                    best, best_cost = list(choice), total
+
+        for tid in track_ids:
+            self.tracks[tid][2] += 1
+        ids = []
+        for i, tid in enumerate(best):
+            if tid is None:
+                tid = self.next_id
+                self.next_id += 1
+            self.tracks[tid] = [centroids[i], labels[i], 0]
+            ids.append(tid)
+        for tid in [t for t, track in self.tracks.items() if track[2] > self.memory]:
+            del self.tracks[tid]
+
+        order = sorted(range(n), key=lambda i: ids[i])
+        if order != list(range(n)):
+            self.reordered += 1
+        return order, [ids[i] for i in order]
+
+    def stats(self):
+        return {"hands_seen": self.next_id, "tracked": len(self.tracks), "reordered_frames": self.reordered}
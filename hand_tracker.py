@@ -1,118 +1,589 @@
 import cv2
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
 import numpy as np
+import threading
+from detectors import create_detector
+from hand_identity import HandAssociator
 
-from collections import deque
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4), # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8), # Index
+    (5, 9), (9, 10), (10, 11), (11, 12), # Middle
+    (9, 13), (13, 14), (14, 15), (15, 16), # Ring
+    (13, 17), (17, 18), (18, 19), (19, 20), # Pinky
+    (0, 5), (0, 17), (5, 17) # Palm
+)
+
+# Joint chains (wrist, MCP, PIP, tip) of index..pinky for the bend angles. The
+# DIP is left out: PIP -> tip is a longer, less noisy segment and the DIP
+# joint bends together with the PIP anyway.
+FINGER_CHAINS = np.array([[0, 5, 6, 8], [0, 9, 10, 12], [0, 13, 14, 16], [0, 17, 18, 20]])
+
+def draw_skeleton(img, hand):
+    # hand: (21, 2+) normalized landmarks of one hand
+    h, w, _ = img.shape
+    points = (hand[:, :2] * (w, h)).astype(np.int32)
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(img, tuple(points[start]), tuple(points[end]), (0, 255, 0), 2)
+
+    for cx, cy in points:
+        cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
+    return img
 
 class HandTracker:
-    def __init__(self, model_path='hand_landmarker.task', max_hands=1, detection_con=0.5, track_con=0.5):
-        base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.HandLandmarkerOptions(
-            base_options=base_options,
-            num_hands=max_hands,
-            min_hand_detection_confidence=detection_con,
-            min_hand_presence_confidence=track_con,
-            running_mode=vision.RunningMode.VIDEO
-        )
-        self.detector = vision.HandLandmarker.create_from_options(options)
-        self.results = None
+    def __init__(self, model_path='hand_landmarker.task', max_hands=1, detection_con=0.5, track_con=0.5, live_stream=False,
+                 roi=False, roi_size=256, roi_padding=0.35, roi_min_score=0.6, roi_refresh=15, max_input_width=None,
+                 adaptive_skip=False, max_skip=4, still_speed=0.25, max_extrapolation=0.02, workers=0,
+                 detector_kind="mediapipe", threads=0, delegate="cpu"):
+        # model_path=None builds a tracker without a detector, fed only through
+        # set_landmarks() (landmark log replay).
+        # LIVE_STREAM runs inference asynchronously: detect_async returns at once and
+        # results arrive on a callback, so find_hands sees the latest finished frame.
+        self.live_stream = live_stream
+        # The detector (detectors.py): the MediaPipe landmarker with its model
+        # variant, CPU thread cap and delegate, or the lightweight contour fallback
+        self.detector_options = {"kind": detector_kind, "threads": threads, "delegate": delegate}
+        self.detector = None
+        # workers > 0 runs the landmarker in that many worker processes instead
+        # (inference_workers.InferenceWorkerPool). The pool is sized from the
+        # first frame (or warm_up's), so it starts lazily in _infer, and is
+        # restarted if a bigger frame arrives.
+        self.workers = workers if model_path is not None else 0
+        self.backend = None
+        self._backend_args = (model_path, max_hands, detection_con, track_con)
+        # set_confidence() builds a replacement landmarker (or worker pool) on a
+        # background thread; _infer swaps it in before the next inference.
+        self.confidence = (detection_con, track_con)
+        self._wanted_confidence = self.confidence
+        self._swap_lock = threading.Lock()
+        self._rebuilding = False
+        self._pending_swap = None # (confidence, detector or pool)
+        self._input_shape = None
+        if model_path is not None and not self.workers:
+            self.detector = create_detector(model_path, max_hands, detection_con, track_con, live_stream,
+                                            **self.detector_options)
         self.tip_ids = [4, 8, 12, 16, 20]
         self.max_hands = max_hands
 
-        # Pre-allocate histories for max_hands
-        self.lm_histories = [[deque(maxlen=5) for _ in range(21)] for _ in range(max_hands)]
-        self.finger_histories = [deque(maxlen=5) for _ in range(max_hands)]
+        # ROI mode: infer on a roi_size x roi_size crop around last frame's hands
+        # instead of the whole frame. Full-frame searches (downscaled to
+        # max_input_width) happen when the crop loses a hand, confidence drops
+        # below roi_min_score, a hand touches the crop edge, or every roi_refresh
+        # frames while fewer than max_hands are tracked. ROI needs the result for
+        # the crop it sent, so it is not available with LIVE_STREAM.
+        if roi and live_stream:
+            print("ROI inference needs synchronous results; disabled in LIVE_STREAM mode.")
+        self.roi_mode = roi and not live_stream
+        self.roi_size = roi_size
+        self.roi_padding = roi_padding
+        self.roi_min_score = roi_min_score
+        self.roi_refresh = roi_refresh
+        self.max_input_width = max_input_width
+        self.roi = None # (x0, y0, x1, y1) in pixels of the full frame
+        self._roi_hands = 0
+        self._frames_since_full = 0
+        self.inference_stats = {"roi": 0, "full": 0, "roi_fallbacks": 0, "skipped": 0}
+        self._resize_buffers = {} # (w, h) -> reused destination for downscales and crops
+
+        # Motion-adaptive inference: while the hands are still (landmark speed
+        # below still_speed, in frame widths per second) only every max_skip-th
+        # frame runs the landmarker. Frames in between get landmarks extrapolated
+        # from the last detection's velocity, and a frame is never skipped if the
+        # predicted shift exceeds max_extrapolation (normalized units).
+        self.adaptive_skip = adaptive_skip
+        self.max_skip = max_skip
+        self.still_speed = still_speed
+        self.max_extrapolation = max_extrapolation
+        self._detected_landmarks = None
+        self._detected_ids = None
+        self._detected_at = None
+        self._velocity = None
+        self._frames_since_detection = 0
+
+        # Normalized (x, y, z) landmarks of the latest result, shape (hands, 21, 3),
+        # ordered by persistent hand ID (oldest first). Every per-hand array
+        # below follows the hand through that ID, not the landmarker's order.
+        self.landmarks = np.zeros((0, 21, 3), np.float32)
+        self.handedness = []
+        self.hand_ids = []
+        self.identity = HandAssociator()
+
+        # Ring buffer of raw pixel positions for every hand/landmark plus the
+        # smoothed output, so all hands are smoothed in one vectorized step.
+        self.history_len = 5
+        self.lm_history = np.zeros((max_hands, 21, self.history_len, 2), np.float64)
+        self.history_counts = np.zeros(max_hands, np.int32)
+        self.history_head = 0
+        self.history_weights, self.history_weight_sums = self._build_history_weights(self.history_len)
+        self.positions = np.zeros((max_hands, 21, 2), np.int32)
+        self._positions_stale = True
+
         self.jitter_threshold = 2 # Pixels
 
+        # Finger states from joint geometry with enter/exit hysteresis, then a
+        # per-finger majority over the last finger_window frames kept as running
+        # counts. A finger goes up below finger_up_angle of total bend (degrees,
+        # wrist->MCP->PIP->tip) and down again above finger_down_angle. The
+        # thumb uses how far its tip reaches past the index knuckle, away from
+        # the pinky, in palm widths.
+        self.finger_up_angle = 60.0
+        self.finger_down_angle = 100.0
+        self.thumb_up_reach = 0.25
+        self.thumb_down_reach = 0.05
+        self.finger_window = 3
+        self.frame_size = (1, 1) # (w, h) of the current frame, from set_landmarks or update_positions
+        self.finger_state = np.zeros((max_hands, 5), bool)
+        self.finger_seen = np.zeros(max_hands, bool) # False: no hysteresis state yet
+        self.finger_votes = np.zeros((max_hands, self.finger_window, 5), np.int32)
+        self.finger_counts = np.zeros((max_hands, 5), np.int32)
+        self.vote_head = np.zeros(max_hands, np.int32)
+        self.vote_filled = np.zeros(max_hands, np.int32)
+        self.fingers = np.zeros((max_hands, 5), np.int32)
+        self._fingers_stale = True
+
+    @staticmethod
+    def _build_history_weights(history_len):
+        # Row `count` holds linspace(0.5, 1.0, count) right-aligned over the ring
+        # read oldest-first, so slots that aren't filled yet get zero weight.
+        weights = np.zeros((history_len + 1, history_len))
+        for count in range(1, history_len + 1):
+            weights[count, history_len - count:] = np.linspace(0.5, 1.0, count)
+        return weights, np.array([sum(w) for w in weights])
+
+    def _start_backend(self, img):
+        from inference_workers import InferenceWorkerPool
+        # Slots must hold a full frame as well as an ROI crop
+        h, w = img.shape[:2]
+        side = self.roi_size if self.roi_mode else 0
+        self.backend = InferenceWorkerPool(*self._backend_args, workers=self.workers,
+                                           frame_shape=(max(h, side), max(w, side), 3),
+                                           detector_options=self.detector_options).start()
+
+    def _infer(self, img, timestamp_ms):
+        # Parsed (landmarks, labels, scores) for img, in process or from the worker pool
+        if self._pending_swap is not None:
+            self._apply_swap()
+        self._input_shape = img.shape
+        # The detector keeps timestamps strictly increasing (in each worker too)
+        if not self.workers:
+            return self.detector.detect(img, timestamp_ms)
+        if self.backend is None:
+            self._start_backend(img)
+        elif img.shape[0] > self.backend.frame_shape[0] or img.shape[1] > self.backend.frame_shape[1]:
+            # warm_up sized the slots from the requested resolution; a camera
+            # that ignored it sends bigger frames, so resize the pool once
+            fh, fw = self.backend.frame_shape[:2]
+            print(f"⚠️ Frames are {img.shape[1]}x{img.shape[0]}, not {fw}x{fh}: restarting the inference workers")
+            old, self.backend = self.backend, None
+            self._dispose(old)
+            self._start_backend(img)
+        # LIVE_STREAM semantics: don't wait, use the newest finished frame
+        return self.backend.detect(img, timestamp_ms, wait=not self.live_stream)
+
+    def set_confidence(self, detection_con=None, track_con=None):
+        # Hot swap of the detector thresholds. MediaPipe fixes them when the
+        # landmarker is created, so a new one is built and warmed up off the
+        # inference thread; frames keep using the old one until it is ready.
+        wanted = (self.confidence[0] if detection_con is None else detection_con,
+                  self.confidence[1] if track_con is None else track_con)
+        with self._swap_lock:
+            self._wanted_confidence = wanted
+            if self.detector is None and self.backend is None:
+                # Nothing built yet (replay, or worker pool not started): just use them later
+                self.confidence = wanted
+                self._backend_args = self._backend_args[:2] + wanted
+                return
+            if self._rebuilding or (wanted == self.confidence and self._pending_swap is None):
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="landmarker-rebuild", daemon=True).start()
+
+    def _rebuild(self):
+        # Keeps building until what was built still matches the newest request,
+        # so dragging a slider costs a few rebuilds, not one per value
+        while True:
+            with self._swap_lock:
+                wanted = self._wanted_confidence
+            try:
+                built = self._build(wanted)
+            except Exception as e:
+                print(f"Landmarker Rebuild Error: {e}")
+                with self._swap_lock:
+                    self._rebuilding = False
+                return
+            with self._swap_lock:
+                if self._wanted_confidence == wanted:
+                    replaced, self._pending_swap = self._pending_swap, (wanted, built)
+                    self._rebuilding = False
+                    break
+            self._dispose(built)
+        if replaced:
+            self._dispose(replaced[1])
+
+    def _build(self, confidence):
+        model_path, max_hands = self._backend_args[:2]
+        if self.workers:
+            from inference_workers import InferenceWorkerPool
+            return InferenceWorkerPool(model_path, max_hands, *confidence, workers=self.workers,
+                                       frame_shape=self.backend.frame_shape,
+                                       detector_options=self.detector_options).start()
+        detector = create_detector(model_path, max_hands, *confidence, self.live_stream, **self.detector_options)
+        if not self.live_stream and self._input_shape:
+            # Warm-up with its own small timestamps; the real ones are far ahead
+            img = np.full(self._input_shape, 128, np.uint8)
+            for timestamp_ms in range(3):
+                detector.detect(img, timestamp_ms)
+        return detector
+
+    def _apply_swap(self):
+        with self._swap_lock:
+            pending, self._pending_swap = self._pending_swap, None
+        if pending is None:
+            return
+        self.confidence, built = pending
+        self._backend_args = self._backend_args[:2] + self.confidence
+        if self.workers:
+            old, self.backend = self.backend, built
+        else:
+            old, self.detector = self.detector, built
+        # Shutting the old one down can take a while (worker processes); not on this thread
+        threading.Thread(target=self._dispose, args=(old,), name="landmarker-dispose", daemon=True).start()
+
+    @staticmethod
+    def _dispose(built):
+        if built is None:
+            return
+        if hasattr(built, "stop"):
+            built.stop()
+        else:
+            built.close()
+
+    def warm_up(self, frame_shape, frames=3):
+        # The first inferences are much slower than steady state (graph setup,
+        # allocations), so run a few on a synthetic frame of every input size the
+        # loop will use. Timestamps stay far below the real time.time() based ones.
+        if self.detector is None and not self.workers:
+            return 0
+        h, w = frame_shape[:2]
+        sizes = [(w, h)]
+        if self.max_input_width and w > self.max_input_width:
+            sizes = [(self.max_input_width, int(h * self.max_input_width / w))]
+        if self.roi_mode:
+            sizes.append((self.roi_size, self.roi_size))
+        if self.workers and self.backend is None:
+            self._start_backend(np.zeros((h, w, 3), np.uint8))
+        runs = frames * max(self.workers, 1) # every worker process has its own graph
+        timestamp_ms = 0
+        for size in sizes:
+            img = np.full((size[1], size[0], 3), 128, np.uint8)
+            for _ in range(runs):
+                self._infer(img, timestamp_ms)
+                timestamp_ms += 1
+        if self.detector is not None:
+            self.detector.reset()
+        return len(sizes) * runs
+
+    def close(self):
+        with self._swap_lock:
+            pending, self._pending_swap = self._pending_swap, None
+        if pending:
+            self._dispose(pending[1])
+        if self.backend:
+            self.backend.stop()
+            self.backend = None
+        if self.detector:
+            self.detector.close()
+            self.detector = None
+
+    def _resize(self, img, size):
+        # INTER_AREA resize into a buffer kept per output size; the landmarker
+        # copies its input, so the buffer can be reused on the next frame.
+        dst = self._resize_buffers.get(size)
+        if dst is None:
+            dst = self._resize_buffers[size] = np.empty((size[1], size[0], 3), np.uint8)
+        return cv2.resize(img, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+    def _detect_full(self, img, timestamp_ms):
+        h, w = img.shape[:2]
+        if self.max_input_width and w > self.max_input_width:
+            # Normalized landmarks don't care about a uniform downscale
+            scale = self.max_input_width / w
+            img = self._resize(img, (self.max_input_width, int(h * scale)))
+        self.inference_stats["full"] += 1
+        self._frames_since_full = 0
+        return self._infer(img, timestamp_ms)
+
+    def _detect_roi(self, img, timestamp_ms):
+        # Returns parsed landmarks in full-frame coordinates, or None to fall back
+        h, w = img.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        crop = self._resize(img[y0:y1, x0:x1], (self.roi_size, self.roi_size))
+        self.inference_stats["roi"] += 1
+        landmarks, labels, scores = self._infer(crop, timestamp_ms)
+
+        edge = 0.02
+        if (len(landmarks) < self._roi_hands or min(scores, default=0.0) < self.roi_min_score or
+                (landmarks[:, :, :2] < edge).any() or (landmarks[:, :, :2] > 1 - edge).any()):
+            self.inference_stats["roi_fallbacks"] += 1
+            return None
+
+        crop_w, crop_h = x1 - x0, y1 - y0
+        landmarks[:, :, 0] = (landmarks[:, :, 0] * crop_w + x0) / w
+        landmarks[:, :, 1] = (landmarks[:, :, 1] * crop_h + y0) / h
+        landmarks[:, :, 2] *= crop_w / w
+        return landmarks, labels, scores
+
+    def _update_roi(self, landmarks, w, h):
+        if not len(landmarks):
+            self.roi = None
+            return
+        # Padded square around every tracked hand, clipped to the frame
+        xs, ys = landmarks[:, :, 0] * w, landmarks[:, :, 1] * h
+        cx, cy = (xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1 + 2 * self.roi_padding)
+        side = int(min(max(side, 32), w, h))
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.roi = (x0, y0, x0 + side, y0 + side)
+        self._roi_hands = len(landmarks)
+
+    def _extrapolate(self, t):
+        # Landmarks predicted at time t, or None when this frame needs inference
+        if not self.adaptive_skip or self._velocity is None or not len(self._detected_landmarks):
+            return None
+        speed = np.abs(self._velocity[:, :, :2]).max()
+        # Linear in speed: every frame at still_speed and above, max_skip when motionless
+        interval = int(round(self.max_skip * (1 - min(speed / self.still_speed, 1.0))))
+        if self._frames_since_detection + 1 >= max(interval, 1):
+            return None
+        shift = self._velocity * (t - self._detected_at)
+        if np.abs(shift[:, :, :2]).max() > self.max_extrapolation:
+            return None
+        return self._detected_landmarks + shift
+
+    def _track_motion(self, landmarks, t):
+        # Per-landmark velocity between consecutive detections of the same hands
+        if (self._detected_landmarks is not None and self.hand_ids == self._detected_ids
+                and len(landmarks) and t > self._detected_at):
+            velocity = (landmarks - self._detected_landmarks) / (t - self._detected_at)
+            self._velocity = velocity if self._velocity is None or self._velocity.shape != velocity.shape \
+                else 0.5 * self._velocity + 0.5 * velocity
+        else:
+            self._velocity = None
+        self._detected_landmarks = landmarks.copy()
+        self._detected_ids = list(self.hand_ids)
+        self._detected_at = t
+        self._frames_since_detection = 0
+
     def find_hands(self, img, draw=True, timestamp_ms=0):
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img)
-        self.results = self.detector.detect_for_video(mp_image, int(timestamp_ms))
-
-        if draw and self.results.hand_landmarks:
-            for hand_landmarks in self.results.hand_landmarks:
-                h, w, _ = img.shape
-                connections = [
-                    (0, 1), (1, 2), (2, 3), (3, 4), # Thumb
-                    (0, 5), (5, 6), (6, 7), (7, 8), # Index
-                    (5, 9), (9, 10), (10, 11), (11, 12), # Middle
-                    (9, 13), (13, 14), (14, 15), (15, 16), # Ring
-                    (13, 17), (17, 18), (18, 19), (19, 20), # Pinky
-                    (0, 5), (0, 17), (5, 17) # Palm
-                ]
-                for start, end in connections:
-                    p1 = (int(hand_landmarks[start].x * w), int(hand_landmarks[start].y * h))
-                    p2 = (int(hand_landmarks[end].x * w), int(hand_landmarks[end].y * h))
-                    cv2.line(img, p1, p2, (0, 255, 0), 2)
-                
-                for lm in hand_landmarks:
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
+        t = timestamp_ms / 1000
+        h, w = img.shape[:2]
+        predicted = self._extrapolate(t)
+        if predicted is not None:
+            self._frames_since_detection += 1
+            self.inference_stats["skipped"] += 1
+            self.set_landmarks(predicted, self.handedness, frame_size=(w, h))
+            if draw:
+                self.draw_hands(img)
+            return img
+
+        parsed = None
+        if self.roi_mode and self.roi is not None:
+            self._frames_since_full += 1
+            if self._roi_hands >= self.max_hands or self._frames_since_full < self.roi_refresh:
+                parsed = self._detect_roi(img, timestamp_ms)
+        if parsed is None:
+            parsed = self._detect_full(img, timestamp_ms)
+
+        landmarks, handedness, _ = parsed
+        if self.roi_mode:
+            self._update_roi(landmarks, w, h)
+        self.set_landmarks(landmarks, handedness, frame_size=(w, h))
+        if self.adaptive_skip:
+            self._track_motion(self.landmarks, t)
+
+        if draw:
+            self.draw_hands(img)
+        return img
+
+    def set_landmarks(self, landmarks, handedness=None, frame_size=None):
+        # Output stage shared by live inference and replayed landmark logs:
+        # landmarks is a (hands, 21, 3) array of normalized coordinates and
+        # frame_size the (w, h) of the frame they belong to, which the finger
+        # classifier scales them by (else the last size update_positions saw).
+        if frame_size is not None:
+            self.frame_size = tuple(frame_size)
+        if landmarks is None or len(landmarks) == 0:
+            landmarks = np.zeros((0, 21, 3), np.float32)
+            handedness = []
+        else:
+            landmarks = np.asarray(landmarks, np.float32)[:self.max_hands]
+            handedness = (list(handedness or []) + ["Unknown"] * len(landmarks))[:len(landmarks)]
+        order, ids = self.identity.associate(landmarks, handedness)
+        self.landmarks = landmarks[order]
+        self.handedness = [handedness[i] for i in order]
+        self._carry_state(ids)
+        self._positions_stale = True
+        self._fingers_stale = True
+        self._reset_fingers(len(self.landmarks))
+
+    def _carry_state(self, ids):
+        # Moves each hand's smoothing history and finger votes to its row in
+        # this frame's order; hands new this frame start over
+        src = [self.hand_ids.index(i) if i in self.hand_ids else -1 for i in ids]
+        self.hand_ids = ids
+        n = len(ids)
+        if src == list(range(n)):
+            return
+        rows = np.array([max(r, 0) for r in src], np.intp)
+        new = np.array([r < 0 for r in src], bool)
+        for arr in (self.lm_history, self.history_counts, self.finger_state, self.finger_seen,
+                    self.finger_votes, self.finger_counts, self.vote_head, self.vote_filled):
+            arr[:n] = arr[rows]
+        self.history_counts[:n][new] = 0
+        self.finger_seen[:n][new] = False
+        self.finger_counts[:n][new] = 0
+        self.vote_head[:n][new] = 0
+        self.vote_filled[:n][new] = 0
+
+    def draw_hands(self, img):
+        for hand in self.landmarks:
+            draw_skeleton(img, hand)
         return img
 
+    def update_positions(self, w, h):
+        # Push this frame's raw pixel positions into the ring and smooth every
+        # landmark of every hand at once.
+        n = len(self.landmarks)
+        self.frame_size = (w, h)
+        head = self.history_head
+        self.lm_history[:n, :, head] = (self.landmarks[:, :, :2] * (w, h)).astype(np.int32)
+        self.history_counts[:n] = np.minimum(self.history_counts[:n] + 1, self.history_len)
+        self.history_counts[n:] = 0 # Hands that vanished start over
+        self.history_head = head = (head + 1) % self.history_len
+        self._positions_stale = False
+        if n == 0:
+            return
+
+        history = self.lm_history[:n]
+        counts = self.history_counts[:n]
+        # Weighted moving average over the history of every landmark, read oldest-first
+        ordered = history[:, :, (head + np.arange(self.history_len)) % self.history_len]
+        weights = self.history_weights[counts][:, None, :, None]
+        avg = (ordered * weights).sum(axis=2) / self.history_weight_sums[counts][:, None, None]
+        raw = history[:, :, (head - 1) % self.history_len]
+        prev = history[:, :, (head - 2) % self.history_len]
+
+        # Jitter gate: hold the previous raw point unless the average moved enough
+        moved = (np.abs(avg - prev) > self.jitter_threshold).any(axis=-1, keepdims=True)
+        smoothed = np.where(moved, avg, prev)
+        smoothed = np.where(counts[:, None, None] > 1, smoothed, raw)
+        self.positions[:n] = smoothed.astype(np.int32)
+
     def find_position(self, img, hand_no=0, draw=True):
         lm_list = []
-        if self.results and self.results.hand_landmarks:
-            if hand_no < len(self.results.hand_landmarks):
-                my_hand = self.results.hand_landmarks[hand_no]
+        if hand_no < len(self.landmarks):
+            if self._positions_stale:
                 h, w, c = img.shape
-                
-                # Get history for this specific hand
-                current_lm_history = self.lm_histories[hand_no]
-                
-                for id, lm in enumerate(my_hand):
-                    # Raw pixel coordinates
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    
-                    # Temporal Smoothing
-                    current_lm_history[id].append((cx, cy))
-                    
-                    # Weighted Moving Average
-                    history_len = len(current_lm_history[id])
-                    if history_len > 1:
-                        weights = np.linspace(0.5, 1.0, history_len)
-                        avg_x = sum(p[0] * weights[i] for i, p in enumerate(current_lm_history[id])) / sum(weights)
-                        avg_y = sum(p[1] * weights[i] for i, p in enumerate(current_lm_history[id])) / sum(weights)
-                        
-                        if abs(avg_x - current_lm_history[id][-2][0]) > self.jitter_threshold or \
-                           abs(avg_y - current_lm_history[id][-2][1]) > self.jitter_threshold:
-                            cx, cy = int(avg_x), int(avg_y)
-                        else:
-                            cx, cy = current_lm_history[id][-2]
-                    
-                    lm_list.append([id, cx, cy])
-                    if draw:
-                        cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
+                self.update_positions(w, h)
+
+            points = self.positions[hand_no]
+            lm_list = [[id, cx, cy] for id, (cx, cy) in enumerate(points.tolist())]
+            if draw:
+                for cx, cy in points:
+                    cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
         return lm_list
 
-    def fingers_up(self, lm_list, hand_no=0):
-        if not lm_list:
+    def find_position_array(self, img, hand_no=0):
+        # Same smoothed positions as find_position, as a (21, 2) int array copy
+        if hand_no >= len(self.landmarks):
+            return None
+        if self._positions_stale:
+            h, w, c = img.shape
+            self.update_positions(w, h)
+        return self.positions[hand_no].copy()
+
+    def _reset_fingers(self, n):
+        # Hands that vanished start over
+        self.finger_seen[n:] = False
+        self.finger_counts[n:] = 0
+        self.vote_head[n:] = 0
+        self.vote_filled[n:] = 0
+
+    def _finger_measures(self, landmarks):
+        # -> (bend (n, 4) degrees for index..pinky, thumb reach (n,)) in pixel space
+        w, h = self.frame_size
+        pts = landmarks * (w, h, w) # MediaPipe z is on roughly the same scale as x
+
+        segments = np.diff(pts[:, FINGER_CHAINS], axis=2) # (n, 4, 3, 3)
+        lengths = np.linalg.norm(segments, axis=-1) + 1e-9
+        cos = (segments[:, :, 1:] * segments[:, :, :-1]).sum(-1) / (lengths[:, :, 1:] * lengths[:, :, :-1])
+        bend = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0))).sum(-1)
+
+        # Outward direction for the thumb: pinky knuckle -> index knuckle. When
+        # the palm is edge-on that collapses, so fall back to the perpendicular
+        # of wrist -> middle knuckle on the side handedness puts the thumb.
+        across = pts[:, 5] - pts[:, 17]
+        palm_width = np.linalg.norm(across, axis=-1)
+        up = pts[:, 9, :2] - pts[:, 0, :2]
+        palm_length = np.linalg.norm(up, axis=-1) + 1e-9
+        labels = (list(self.handedness) + ["Unknown"] * len(pts))[:len(pts)]
+        side = np.array([{"Right": 1.0, "Left": -1.0}.get(label, 0.0) for label in labels])
+        fallback = np.zeros_like(across)
+        fallback[:, 0], fallback[:, 1] = up[:, 1] * side, -up[:, 0] * side
+        use_fallback = (palm_width < 0.35 * palm_length) & (side != 0)
+        outward = np.where(use_fallback[:, None], fallback, across)
+        scale = np.where(use_fallback, palm_length * 0.5, palm_width) + 1e-9
+        reach = ((pts[:, 4] - pts[:, 5]) * outward).sum(-1) / (np.linalg.norm(outward, axis=-1) + 1e-9) / scale
+        return bend, reach
+
+    def classify_fingers(self):
+        # Finger states of every hand at once, (n, 5) of 0/1 in T I M R P order
+        n = len(self.landmarks)
+        self._fingers_stale = False
+        if n == 0:
+            return self.fingers[:0]
+        bend, reach = self._finger_measures(self.landmarks.astype(np.float64))
+
+        # Hysteresis; hands without state yet use the midpoint of each band
+        state = self.finger_state[:n]
+        seen = self.finger_seen[:n, None]
+        mid_angle = (self.finger_up_angle + self.finger_down_angle) / 2
+        mid_reach = (self.thumb_up_reach + self.thumb_down_reach) / 2
+        fingers = np.where(state[:, 1:], bend < self.finger_down_angle, bend < self.finger_up_angle)
+        fingers = np.where(seen, fingers, bend < mid_angle)
+        thumb = np.where(state[:, 0], reach > self.thumb_down_reach, reach > self.thumb_up_reach)
+        thumb = np.where(seen[:, 0], thumb, reach > mid_reach)
+        state[:, 0], state[:, 1:] = thumb, fingers
+        self.finger_seen[:n] = True
+
+        # Majority vote over the window from running counts: add the new frame,
+        # drop the one falling out of the window. Ties go to the newest frame.
+        hands = np.arange(n)
+        head = self.vote_head[:n]
+        full = self.vote_filled[:n] == self.finger_window
+        self.finger_counts[:n] -= self.finger_votes[hands, head] * full[:, None]
+        raw = state.astype(np.int32)
+        self.finger_votes[hands, head] = raw
+        self.finger_counts[:n] += raw
+        self.vote_head[:n] = (head + 1) % self.finger_window
+        self.vote_filled[:n] = np.minimum(self.vote_filled[:n] + 1, self.finger_window)
+
+        twice = 2 * self.finger_counts[:n]
+        filled = self.vote_filled[:n, None]
+        self.fingers[:n] = np.where(twice == filled, raw, twice > filled)
+        return self.fingers[:n]
+
+    def fingers_up(self, lm_list=None, hand_no=0):
+        # [T, I, M, R, P] for one hand; all hands are classified together on the
+        # first call after new landmarks arrive. lm_list (find_position's list)
+        # is only checked for emptiness, as before: classification works on
+        # the tracker's own landmark arrays. fingers_up(1) still means hand 1.
+        if isinstance(lm_list, (int, np.integer)):
+            lm_list, hand_no = None, lm_list
+        if lm_list is not None and len(lm_list) == 0:
             return [0, 0, 0, 0, 0]
-            
-        raw_fingers = []
-        # Thumb: depends on which hand it is (left/right) - simple check for now
-        if lm_list[4][1] > lm_list[3][1] + 5:
-            raw_fingers.append(1)
-        else:
-            raw_fingers.append(0)
-
-        # 4 Fingers
-        for id in range(1, 5):
-            if lm_list[self.tip_ids[id]][2] < lm_list[self.tip_ids[id] - 2][2]:
-                raw_fingers.append(1)
-            else:
-                raw_fingers.append(0)
-        
-        # Stability check for this specific hand
-        if hand_no < len(self.finger_histories):
-            history = self.finger_histories[hand_no]
-            history.append(tuple(raw_fingers))
-            
-            gesture_counts = {}
-            for g in history:
-                gesture_counts[g] = gesture_counts.get(g, 0) + 1
-            stable_fingers = max(gesture_counts, key=gesture_counts.get)
-            return list(stable_fingers)
-            
-        return raw_fingers
+        if hand_no >= len(self.landmarks):
+            return [0, 0, 0, 0, 0]
+        if self._fingers_stale:
+            self.classify_fingers()
+        return self.fingers[hand_no].tolist()
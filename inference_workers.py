@@ -0,0 +1,293 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from video_source import HANDEDNESS_CODES, HANDEDNESS_NAMES
+
+# Frames go to the workers and landmarks come back through two shared-memory
+# rings with the same number of slots. The queues only carry small tuples of
+# ints (slot, sequence number, frame size, timestamp), never pixel data.
+#   frame ring:  slots x frame_shape uint8 BGR (as captured), a frame smaller than the slot
+#                uses its top-left corner
+#   result ring: one result_dtype record per slot
+
+
+def result_dtype(max_hands):
+    return np.dtype([
+        ("seq", "<i8"),
+        ("n", "u1"),
+        ("handedness", "i1", (max_hands,)),
+        ("scores", "<f4", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, 21, 3)),
+    ])
+
+
+class SharedRings:
+    # Numpy views over the two shared-memory blocks; the pool creates them,
+    # workers attach by name.
+    def __init__(self, slots, frame_shape, max_hands, names=None):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+        dtype = result_dtype(max_hands)
+        frame_bytes = slots * int(np.prod(frame_shape))
+        if names is None:
+            self.owner = True
+            self.frame_shm = shared_memory.SharedMemory(create=True, size=frame_bytes)
+            self.result_shm = shared_memory.SharedMemory(create=True, size=slots * dtype.itemsize)
+        else:
+            self.owner = False
+            self.frame_shm = shared_memory.SharedMemory(name=names[0])
+            self.result_shm = shared_memory.SharedMemory(name=names[1])
+        self.frames = np.ndarray((slots,) + self.frame_shape, np.uint8, buffer=self.frame_shm.buf)
+        self.results = np.ndarray(slots, dtype, buffer=self.result_shm.buf)
+
+    @property
+    def names(self):
+        return self.frame_shm.name, self.result_shm.name
+
+    def close(self):
+        # Views must go before the mappings can be closed
+        self.frames = self.results = None
+        self.frame_shm.close()
+        self.result_shm.close()
+        if self.owner:
+            self.frame_shm.unlink()
+            self.result_shm.unlink()
+
+
+def _worker_main(worker_id, names, slots, frame_shape, model_args, detector_options, tasks, done):
+    # Runs in a worker process: one VIDEO-mode detector per process, each
+    # pinned to its own cores when the thread count is capped
+    from detectors import create_detector
+
+    rings = SharedRings(slots, frame_shape, model_args[1], names=names)
+    try:
+        detector = create_detector(*model_args, first_cpu=worker_id * detector_options.get("threads", 0),
+                                   **detector_options)
+    except Exception as e:
+        done.put(("error", worker_id, str(e)))
+        rings.close()
+        return
+    done.put(("ready", worker_id, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        seq, slot, h, w, timestamp_ms = task
+        rec = rings.results[slot]
+        rec["seq"] = seq
+        rec["n"] = 0
+        try:
+            # Each worker sees a subset of the frames, still in increasing time
+            # order; the detector keeps its own timestamps strictly increasing
+            img = np.ascontiguousarray(rings.frames[slot, :h, :w])
+            landmarks, labels, scores = detector.detect(img, timestamp_ms)
+            n = len(landmarks)
+            rec["n"] = n
+            rec["handedness"] = -1
+            if n:
+                rec["landmarks"][:n] = landmarks
+                rec["scores"][:n] = scores
+                for i, label in enumerate(labels):
+                    rec["handedness"][i] = HANDEDNESS_CODES.get(label, -1)
+        except Exception as e:
+            print(f"Inference Worker {worker_id} Error: {e}")
+        done.put(("done", seq, slot))
+
+    detector.close()
+    rings.close()
+
+
+class InferenceWorkerPool:
+    # Detectors (detectors.py, the HandLandmarker by default) in worker
+    # processes, so inference doesn't share the GIL with gesture logic, input
+    # and drawing. Up to `slots` frames are in flight; results are handed back
+    # strictly in submission order. Each worker has its own task queue, so the
+    # pool knows which frames a worker holds: if it dies those frames are
+    # skipped, their slots freed and the worker restarted (up to max_restarts).
+    def __init__(self, model_path, max_hands=1, detection_con=0.5, track_con=0.5, workers=2,
+                 frame_shape=(480, 640, 3), slots=None, timeout=2.0, detector_options=None, max_restarts=3):
+        self.model_args = (model_path, max_hands, detection_con, track_con)
+        self.detector_options = detector_options or {}
+        self.max_hands = max_hands
+        self.workers = workers
+        self.slots = slots or 2 * workers
+        self.frame_shape = tuple(frame_shape)
+        self.timeout = timeout
+        self.max_restarts = max_restarts
+        self.rings = None
+        self.processes = []
+        self._ctx = multiprocessing.get_context("spawn")
+        self._tasks = []
+        self._done = None
+
+        self._free = list(range(self.slots))
+        self._next_seq = 0 # sequence number of the next frame submitted
+        self._deliver_seq = 0 # sequence number the caller gets next
+        self._finished = {} # seq -> slot, finished but not yet delivered
+        self._in_flight = {} # seq -> (worker, slot), submitted but not finished
+        self._lost = set() # seqs whose worker died; skipped on delivery
+        self.latest = (np.zeros((0, 21, 3), np.float32), [], [])
+        self.stats = {"submitted": 0, "delivered": 0, "busy": 0, "timeouts": 0, "lost": 0, "restarts": 0}
+
+    def _spawn(self, i):
+        tasks = self._ctx.Queue()
+        p = self._ctx.Process(target=_worker_main, name=f"inference-{i}", daemon=True,
+                              args=(i, self.rings.names, self.slots, self.frame_shape,
+                                    self.model_args, self.detector_options, tasks, self._done))
+        p.start()
+        return p, tasks
+
+    def start(self):
+        self.rings = SharedRings(self.slots, self.frame_shape, self.max_hands)
+        self._done = self._ctx.Queue()
+        for i in range(self.workers):
+            p, tasks = self._spawn(i)
+            self.processes.append(p)
+            self._tasks.append(tasks)
+
+        # Wait until every worker has its model loaded (or report why not)
+        ready = 0
+        while ready < self.workers:
+            try:
+                kind, worker_id, error = self._done.get(timeout=30.0)
+            except queue.Empty:
+                self.stop()
+                raise RuntimeError("Inference workers did not start in time")
+            if kind == "error":
+                self.stop()
+                raise RuntimeError(f"Inference worker {worker_id} failed to load the model: {error}")
+            ready += 1
+        return self
+
+    def submit(self, img, timestamp_ms):
+        # Copies img into a free slot and queues it; False when every slot is busy
+        if not self._free and not self._recover():
+            self.stats["busy"] += 1
+            return False
+        h, w = img.shape[:2]
+        fh, fw = self.frame_shape[:2]
+        if h > fh or w > fw:
+            raise ValueError(f"Frame {w}x{h} does not fit the {fw}x{fh} shared frame slots")
+        slot = self._free.pop(0)
+        self.rings.frames[slot, :h, :w] = img
+        # The worker with the fewest frames in flight takes it
+        load = [0] * self.workers
+        for worker, _ in self._in_flight.values():
+            load[worker] += 1
+        worker = load.index(min(load))
+        self._in_flight[self._next_seq] = (worker, slot)
+        self._tasks[worker].put((self._next_seq, slot, h, w, int(timestamp_ms)))
+        self._next_seq += 1
+        self.stats["submitted"] += 1
+        return True
+
+    def _drain(self, block, deadline=None):
+        # Move finished notifications into _finished; True if anything arrived
+        got = False
+        while True:
+            try:
+                if block and not got:
+                    remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    kind, seq, slot = self._done.get(timeout=remaining)
+                else:
+                    kind, seq, slot = self._done.get_nowait()
+            except queue.Empty:
+                return got
+            if kind == "done" and self._in_flight.pop(seq, None) is not None:
+                self._finished[seq] = slot
+                got = True
+            elif kind == "error":
+                raise RuntimeError(f"Inference worker {seq} failed to restart: {slot}")
+
+    def _recover(self):
+        # After a timeout: frames held by a dead worker will never finish. Skip
+        # them, free their slots and restart the worker; True if any was dead.
+        dead = [i for i, p in enumerate(self.processes) if not p.is_alive()]
+        for i in dead:
+            if self.stats["restarts"] >= self.max_restarts:
+                raise RuntimeError(f"Inference worker {i} died (exit code {self.processes[i].exitcode}) "
+                                   f"after {self.stats['restarts']} restarts")
+            print(f"⚠️ Inference worker {i} died (exit code {self.processes[i].exitcode}); restarting it")
+            for seq, (worker, slot) in list(self._in_flight.items()):
+                if worker == i:
+                    del self._in_flight[seq]
+                    self._lost.add(seq)
+                    self._free.append(slot)
+                    self.stats["lost"] += 1
+            self.processes[i], self._tasks[i] = self._spawn(i)
+            self.stats["restarts"] += 1
+        return bool(dead)
+
+    def _deliverable(self):
+        return self._deliver_seq in self._finished or self._deliver_seq in self._lost
+
+    def _read(self, slot):
+        rec = self.rings.results[slot]
+        n = int(rec["n"])
+        landmarks = rec["landmarks"][:n].copy()
+        labels = [HANDEDNESS_NAMES.get(int(c), "Unknown") for c in rec["handedness"][:n]]
+        scores = rec["scores"][:n].tolist()
+        self._free.append(slot)
+        return landmarks, labels, scores
+
+    def collect(self, wait=False):
+        # Every result that is ready, oldest first; never out of order, so a fast
+        # worker's result waits for the slower one that got the earlier frame.
+        deadline = time.monotonic() + self.timeout
+        self._drain(block=False)
+        while wait and self._deliver_seq < self._next_seq and not self._deliverable():
+            if not self._drain(block=True, deadline=deadline) and time.monotonic() >= deadline:
+                self.stats["timeouts"] += 1
+                if not self._recover():
+                    break
+                deadline = time.monotonic() + self.timeout
+        out = []
+        while self._deliverable():
+            if self._deliver_seq in self._lost:
+                self._lost.discard(self._deliver_seq) # never finished: nothing to hand back
+            else:
+                out.append(self._read(self._finished.pop(self._deliver_seq)))
+                self.stats["delivered"] += 1
+            self._deliver_seq += 1
+        if out:
+            self.latest = out[-1]
+        return out
+
+    def detect(self, img, timestamp_ms, wait=True):
+        # Synchronous (wait=True): the result for this very frame, so only one
+        # frame is ever in flight and only one worker is busy. Otherwise queue
+        # it and return the newest finished result, like LIVE_STREAM mode; this
+        # is what keeps several workers busy.
+        if not self.submit(img, timestamp_ms) and wait:
+            # Every slot is taken by frames submitted without waiting: finish them first
+            while not self._free and self._deliver_seq < self._next_seq:
+                if not self.collect(wait=True):
+                    break
+            self.submit(img, timestamp_ms)
+        if wait:
+            while self._deliver_seq < self._next_seq:
+                if not self.collect(wait=True):
+                    break
+        else:
+            self.collect()
+        landmarks, labels, scores = self.latest
+        return landmarks.copy(), list(labels), list(scores)
+
+    def stop(self):
+        for tasks in self._tasks:
+            tasks.put(None)
+        for p in self.processes:
+            p.join(timeout=2.0)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        self._tasks = []
+        if self.rings:
+            self.rings.close()
+            self.rings = None
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+
+# Event kinds. Consecutive MOVE events collapse into the newest one; every other
+# kind is delivered exactly once, in submission order.
+MOVE = 'move'
+CLICK = 'click'
+HOTKEY = 'hotkey'
+
+
+class InputEvent:
+    __slots__ = ('kind', 'fn', 'args', 'kwargs', 'queued')
+
+    def __init__(self, kind, fn, args, kwargs):
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.queued = time.perf_counter()
+
+
+class InputDispatcher:
+    # Runs OS input calls (pyautogui, hotkeys) on a dedicated worker so the vision
+    # loop only pays for appending to a deque.
+    def __init__(self, history=256, monitor=None):
+        # monitor: optional PerformanceMonitor; each event's latency is recorded
+        # there as the "input_dispatch" stage.
+        self.monitor = monitor
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.running = False
+        self.submitted = 0
+        self.dispatched = 0
+        self.coalesced = 0
+        self.errors = 0
+        # kind -> recent queue-to-completion latencies in seconds
+        self.latencies = {}
+        self._history = history
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="input-dispatch", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, kind, fn, *args, **kwargs):
+        event = InputEvent(kind, fn, args, kwargs)
+        with self._cond:
+            self.submitted += 1
+            if kind == MOVE and self._events and self._events[-1].kind == MOVE:
+                # Only the newest cursor target matters; keep the older queue time
+                # so the reported latency covers the whole wait.
+                event.queued = self._events[-1].queued
+                self._events[-1] = event
+                self.coalesced += 1
+            else:
+                self._events.append(event)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._events and self.running:
+                    self._cond.wait()
+                if not self._events:
+                    return
+                event = self._events.popleft()
+            try:
+                event.fn(*event.args, **event.kwargs)
+            except Exception as e:
+                self.errors += 1
+                print(f"Input Dispatch Error ({event.kind}): {e}")
+            done = time.perf_counter()
+            if event.kind not in self.latencies:
+                self.latencies[event.kind] = deque(maxlen=self._history)
+            self.latencies[event.kind].append(done - event.queued)
+            if self.monitor:
+                self.monitor.record("input_dispatch", done - event.queued)
+            self.dispatched += 1
+
+    def pending(self):
+        with self._cond:
+            return len(self._events)
+
+    def stats(self):
+        report = {
+            "submitted": self.submitted,
+            "dispatched": self.dispatched,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+        for kind, samples in list(self.latencies.items()):
+            samples = list(samples)
+            if samples:
+                report[kind] = {
+                    "count": len(samples),
+                    "avg_ms": round(sum(samples) / len(samples) * 1000, 2),
+                    "max_ms": round(max(samples) * 1000, 2),
+                }
+        return report
+
+    def stop(self, drain=True):
+        with self._cond:
+            self.running = False
+            if not drain:
+                self._events.clear()
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+
+class DispatchProxy:
+    # Wraps a controller (e.g. SystemController) so every method call is queued
+    # on the dispatcher instead of running inline: proxy.app_switcher() returns at once.
+    def __init__(self, target, dispatcher, kind=HOTKEY):
+        self._target = target
+        self._dispatcher = dispatcher
+        self._kind = kind
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def queued_call(*args, **kwargs):
+            self._dispatcher.submit(self._kind, attr, *args, **kwargs)
+        return queued_call
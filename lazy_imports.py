@@ -0,0 +1,54 @@
+import importlib
+import threading
+
+# Heavy dependencies (mediapipe, pyautogui, screeninfo, psutil) are bound to a
+# LazyModule at import time and only really imported on first attribute
+# access, so importing our modules is cheap. preload() runs those imports on a
+# background thread while the camera and model are being opened, so the first
+# real use doesn't pay for them either.
+
+
+class LazyModule:
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    object.__setattr__(self, "_module", importlib.import_module(self._name))
+                module = self._module
+        return module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr, value):
+        # e.g. pyautogui.PAUSE = 0
+        setattr(self.load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def preload(*names):
+    # Imports the named modules on a daemon thread and returns the thread; a
+    # LazyModule of the same name then finds them in sys.modules. Import errors
+    # are left for the first real use to report.
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -1,218 +1,549 @@
 
+import argparse
 import cv2
-import numpy as np
+import signal
+import threading
 import time
-import math
-from hand_tracker import HandTracker
+from hand_tracker import HandTracker, draw_skeleton
+from detectors import DETECTORS, DELEGATES, autoselect
 from mouse_controller import MouseController
 from system_controller import SystemController
-from performance_monitor import PerformanceMonitor
+from performance_monitor import PerformanceMonitor, StartupProfile
+from lazy_imports import preload
+from pipeline import FramePipeline
+from cursor_filters import FILTERS
+from cursor_output import BACKENDS, UPSAMPLE_MODES, CursorUpsampler, DispatchedBackend, make_backend
+from input_dispatcher import InputDispatcher, DispatchProxy
+from video_source import open_source, is_landmark_log, LandmarkLogWriter
+from whiteboard import Whiteboard
+from frame_pool import FramePool, AllocationProbe
+from power_governor import IdleGovernor, ACTIVE, IDLE
+from settings_channel import SettingsChannel
+from event_stream import EventServer, LandmarkRing
+from gestures import GestureState, build_gesture_engine, process_gestures
 
-def main():
-    V_WIDTH, V_HEIGHT = 640, 480
+# Stages whose p95 is shown in the HUD
+HUD_STAGES = ("capture", "inference", "gestures", "display")
+
+def collect_hands(tracker, img):
+    # Get data for all detected hands (smoothing happens in find_position_array)
+    hands_data = []
+    for i in range(len(tracker.landmarks)):
+        pts = tracker.find_position_array(img, hand_no=i)
+        fingers = tracker.fingers_up(hand_no=i)
+        hands_data.append({'pts': pts, 'fingers': fingers, 'landmarks': tracker.landmarks[i].copy(),
+                           'handedness': tracker.handedness[i] if i < len(tracker.handedness) else "Unknown",
+                           'id': tracker.hand_ids[i]})
+    return hands_data
+
+def detect_hands(tracker, img, perf_mon, draw=False, recorder=None, pool=None, governor=None):
+    with perf_mon.stage("flip"):
+        if pool:
+            # Flip into a pooled buffer and hand the captured one back
+            flipped = pool.acquire(img.shape)
+            cv2.flip(img, 1, dst=flipped)
+            pool.release(img)
+            img = flipped
+        else:
+            img = cv2.flip(img, 1)
+
+    # Idle: a cheap presence check stands in for the landmarker
+    if governor and governor.idle:
+        with perf_mon.stage("presence"):
+            present = governor.presence(img)
+        if not present:
+            tracker.set_landmarks(None)
+            return img, []
+
+    # MediaPipe Video mode requires monotonic timestamps in ms
+    timestamp_ms = int(time.time() * 1000)
+    with perf_mon.stage("inference"):
+        img = tracker.find_hands(img, draw=draw, timestamp_ms=timestamp_ms)
+    if recorder:
+        recorder.write(timestamp_ms / 1000, tracker.landmarks, tracker.handedness)
+    with perf_mon.stage("smoothing"):
+        return img, collect_hands(tracker, img)
+
+def replay_hands(tracker, source, img, perf_mon, draw=False):
+    # Landmarks come straight from the log: no flip, no inference
+    tracker.set_landmarks(source.landmarks, source.handedness, frame_size=(img.shape[1], img.shape[0]))
+    if draw:
+        tracker.draw_hands(img)
+    with perf_mon.stage("smoothing"):
+        return img, collect_hands(tracker, img)
+
+def draw_toolbar(img, draw_color):
+    cv2.rectangle(img, (0, 0), (100, 70), (255, 0, 0), cv2.FILLED) # Blue
+    cv2.rectangle(img, (100, 0), (200, 70), (0, 255, 0), cv2.FILLED) # Green
+    cv2.rectangle(img, (200, 0), (300, 70), (0, 0, 255), cv2.FILLED) # Red
+    cv2.rectangle(img, (300, 0), (450, 70), (200, 200, 200), cv2.FILLED) # Eraser
+    cv2.putText(img, "ERASER", (320, 45), cv2.FONT_HERSHEY_PLAIN, 2, (0, 0, 0), 3)
+    cv2.rectangle(img, (450, 0), (640, 70), (50, 50, 50), cv2.FILLED) # Clear
+    cv2.putText(img, "CLEAR", (480, 45), cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 3)
+
+    # Highlight Selected Color
+    if draw_color == (255, 0, 0): cv2.rectangle(img, (0,0), (100, 70), (255,255,100), 4)
+    elif draw_color == (0, 255, 0): cv2.rectangle(img, (100,0), (200, 70), (255,255,100), 4)
+    elif draw_color == (0, 0, 255): cv2.rectangle(img, (200,0), (300, 70), (255,255,100), 4)
+    elif draw_color == (0, 0, 0): cv2.rectangle(img, (300,0), (450, 70), (0,255,0), 4)
+
+def draw_finger_status(img, hands_data):
+    # --- FINGER STATUS DISPLAY (T I M R P) ---
+    labels = ['T', 'I', 'M', 'R', 'P']
+    for i, data in enumerate(hands_data):
+        # Position at bottom: Hand 1 on left, Hand 2 on right
+        x_start = 20 + (i * 200)
+        y_pos = img.shape[0] - 20
+        cv2.putText(img, f"H{i+1}:", (x_start, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, (255, 255, 255), 2)
+        for j, status in enumerate(data['fingers']):
+            color = (0, 255, 0) if status == 1 else (0, 0, 255) # Green if Up, Red if Down
+            cv2.putText(img, labels[j], (x_start + 45 + j * 25, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, color, 2)
+
+def apply_settings(changes, mouse, tracker):
+    # Live settings from the settings channel, applied between frames
+    if 'smoothing' in changes:
+        mouse.smoothing = max(int(round(changes['smoothing'])), 1)
+    if 'detection_con' in changes or 'track_con' in changes:
+        tracker.set_confidence(changes.get('detection_con'), changes.get('track_con'))
+
+def parse_resolution(text):
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{text}'")
+    return width, height
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="AI Virtual Mouse - control the computer with hand gestures",
+        epilog="Headless stations: send SIGUSR1 to toggle the preview window at runtime.")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture and inference on their own threads (latest frame wins)")
+    parser.add_argument("--live-stream", action="store_true",
+                        help="use MediaPipe LIVE_STREAM mode (detect_async) for inference")
+    parser.add_argument("--cursor-filter", default="exponential", choices=sorted(FILTERS),
+                        help="cursor smoothing filter (one_euro and kalman cut lag during fast moves)")
+    parser.add_argument("--cursor-rate", type=float, default=0, metavar="HZ",
+                        help="move the cursor from its own thread at HZ (e.g. the display refresh rate), "
+                             "filling in between camera frames")
+    parser.add_argument("--cursor-upsample", default="interpolate", choices=UPSAMPLE_MODES,
+                        help="with --cursor-rate: ease towards each new target (smooth) or extrapolate (less lag)")
+    parser.add_argument("--cursor-backend", default="pyautogui", choices=sorted(BACKENDS),
+                        help="with --cursor-rate: where cursor moves go ('null' and 'record' move nothing)")
+    parser.add_argument("--sync-input", action="store_true",
+                        help="send mouse/keyboard events inline instead of from the dispatch thread")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or .hlog landmark log to replay")
+    parser.add_argument("--record", metavar="PATH",
+                        help="write detected landmarks to a .hlog landmark log")
+    parser.add_argument("--realtime", action="store_true",
+                        help="pace .hlog replay to the recorded timestamps instead of running flat out")
+    parser.add_argument("--settings-ui", action="store_true",
+                        help="open the settings panel in its own process; changes apply live between frames")
+    parser.add_argument("--event-socket", metavar="PATH",
+                        help="stream landmarks and gesture events to local clients over a Unix socket at PATH")
+    parser.add_argument("--event-ring", action="store_true",
+                        help="also publish the latest landmarks to a shared-memory ring (its name is printed)")
+    parser.add_argument("--save-board", metavar="PATH",
+                        help="on exit, save the whiteboard drawing as vector strokes (.svg or .json)")
+
+    inference = parser.add_argument_group("inference")
+    inference.add_argument("--resolution", type=parse_resolution, default=(640, 480), metavar="WxH",
+                           help="camera capture size, e.g. 1280x720 (default 640x480)")
+    inference.add_argument("--roi", action="store_true",
+                           help="run the landmarker on a crop around last frame's hands, with full-frame fallback")
+    inference.add_argument("--roi-size", type=int, default=256,
+                           help="side of the square ROI crop fed to the landmarker")
+    inference.add_argument("--max-input-width", type=int, default=None,
+                           help="downscale full-frame searches to at most this width")
+    inference.add_argument("--adaptive-skip", action="store_true",
+                           help="skip inference while hands are still, extrapolating landmarks in between")
+    inference.add_argument("--max-skip", type=int, default=4, metavar="N",
+                           help="with --adaptive-skip, run inference at least every Nth frame")
+    inference.add_argument("--max-extrapolation", type=float, default=0.02,
+                           help="never skip when the predicted landmark shift exceeds this fraction of the frame")
+    inference.add_argument("--workers", type=int, default=0, metavar="N",
+                           help="run the landmarker in N worker processes fed through shared memory "
+                                "(N > 1 implies --live-stream: synchronous frames keep only one worker busy)")
+    inference.add_argument("--detector", default="mediapipe", choices=("auto",) + DETECTORS,
+                           help="hand detector; 'contour' is a lightweight fallback, 'auto' benchmarks at startup")
+    inference.add_argument("--model", default="hand_landmarker.task", metavar="PATH",
+                           help="hand landmarker .task bundle (model variant)")
+    inference.add_argument("--detector-threads", type=int, default=0, metavar="N",
+                           help="CPU cores the landmarker may use, per worker process (0: all)")
+    inference.add_argument("--delegate", default="cpu", choices=DELEGATES,
+                           help="run the landmarker on the CPU or the GPU")
+    inference.add_argument("--detector-budget", type=float, default=25.0, metavar="MS",
+                           help="with --detector auto, the per-frame inference time to fit in")
+    inference.add_argument("--idle-timeout", type=float, default=0, metavar="SECONDS",
+                           help="after this long without a hand, drop to a low-rate presence check (0: never)")
+    inference.add_argument("--idle-fps", type=float, default=5.0,
+                           help="frames per second looked at while idle")
+
+    display = parser.add_argument_group("display")
+    display.add_argument("--headless", action="store_true",
+                         help="skip all overlay rendering and the preview window")
+    display.add_argument("--preview-every", type=int, default=0, metavar="N",
+                         help="in headless mode, render and show every Nth frame")
+    display.add_argument("--preview-scale", type=float, default=0.5,
+                         help="downscale factor for the headless preview window")
+    display.add_argument("--debug-alloc", action="store_true",
+                         help="count steady-state frames that allocate a large buffer (slow, uses tracemalloc)")
+
+    perf = parser.add_argument_group("performance")
+    perf.add_argument("--no-perf", action="store_true",
+                      help="disable the per-stage latency timers")
+    perf.add_argument("--perf-dump", metavar="PATH",
+                      help="periodically write stage latency percentiles to PATH (.json or .csv)")
+    perf.add_argument("--perf-interval", type=float, default=10.0, metavar="SECONDS",
+                      help="seconds between --perf-dump writes")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    V_WIDTH, V_HEIGHT = args.resolution
     FRAME_MARGIN = 100
-    
-    cap = cv2.VideoCapture(0)
+
+    # Startup: heavy imports happen in the background, the model loads on its
+    # own thread while the camera opens here, then the detector is warmed up.
+    startup = StartupProfile()
+    # Replay feeds recorded landmarks straight into the tracker, so no model is loaded
+    replay = is_landmark_log(args.source)
+    if args.workers > 1 and not args.live_stream and not replay:
+        print(f"--workers {args.workers} needs frames in flight; running with --live-stream.")
+        args.live_stream = True
+    # (mediapipe itself is imported by the model thread)
+    preload("pyautogui", "screeninfo")
+
+    built = {}
+    def build_tracker():
+        try:
+            with startup.phase("model"):
+                detector = {"detector_kind": args.detector, "threads": args.detector_threads,
+                            "delegate": args.delegate}
+                max_input_width = args.max_input_width
+                if args.detector == "auto" and not replay:
+                    # Short benchmark of the configurations this host can run
+                    choice, width, ms, report = autoselect(
+                        args.model, 2, 0.4, 0.5, (V_HEIGHT, V_WIDTH), budget_ms=args.detector_budget,
+                        widths=[min(max_input_width, V_WIDTH)] if max_input_width else None,
+                        threads=[args.detector_threads] if args.detector_threads else None,
+                        delegate=args.delegate)
+                    detector = {"detector_kind": choice["kind"], "threads": choice["threads"],
+                                "delegate": choice["delegate"]}
+                    max_input_width = max_input_width or width
+                    print(f"🔎 Detector benchmark: {' | '.join(report)}")
+                    print(f"🔎 Using {choice['kind']} ({ms:.1f}ms); to skip the benchmark: --detector {choice['kind']}"
+                          + (f" --detector-threads {choice['threads']}" if choice["threads"] else "")
+                          + (f" --max-input-width {max_input_width}" if max_input_width else ""))
+                built['tracker'] = HandTracker(model_path=None if replay else args.model,
+                                               max_hands=2, detection_con=0.4, live_stream=args.live_stream,
+                                               roi=args.roi, roi_size=args.roi_size, max_input_width=max_input_width,
+                                               adaptive_skip=args.adaptive_skip, max_skip=args.max_skip,
+                                               max_extrapolation=args.max_extrapolation, workers=args.workers,
+                                               **detector)
+        except Exception as e:
+            built['error'] = e
+    model_thread = threading.Thread(target=build_tracker, name="model-load", daemon=True)
+    model_thread.start()
+
+    with startup.phase("camera"):
+        cap = open_source(args.source, V_WIDTH, V_HEIGHT, realtime=args.realtime)
+    model_thread.join()
+    if 'error' in built:
+        cap.release()
+        raise built['error']
+    tracker = built['tracker']
     if not cap.isOpened():
-        print("❌ CAMERA ERROR: Could not access webcam.")
+        print(f"❌ SOURCE ERROR: Could not open '{args.source}'.")
+        tracker.close()
         return
 
-    cap.set(3, V_WIDTH)
-    cap.set(4, V_HEIGHT)
-    
-    tracker = HandTracker(max_hands=2, detection_con=0.4)
-    mouse = MouseController(smoothing=4)
+    if replay:
+        V_WIDTH, V_HEIGHT = cap.log.frame_size
+        if args.pipelined:
+            print("Replay skips inference; running without --pipelined.")
+            args.pipelined = False
+
+    with startup.phase("warm-up"):
+        tracker.warm_up((V_HEIGHT, V_WIDTH, 3))
+    recorder = LandmarkLogWriter(args.record, max_hands=2, frame_size=(V_WIDTH, V_HEIGHT)) if args.record else None
+    # Per-stage latency histograms; a disabled monitor hands out no-op timers
+    perf_mon = PerformanceMonitor(enabled=not args.no_perf, dump_path=args.perf_dump,
+                                  dump_interval=args.perf_interval)
+
+    # OS input runs on its own worker so the vision loop never blocks on pyautogui
+    dispatcher = None if args.sync_input else InputDispatcher(monitor=perf_mon).start()
+    # Cursor moves at the display rate, decoupled from the camera frame rate
+    cursor_out = None
+    if args.cursor_rate > 0:
+        backend = make_backend(args.cursor_backend)
+        if dispatcher:
+            # Moves share the dispatcher's queue with clicks, so they stay in order
+            backend = DispatchedBackend(backend, dispatcher)
+        cursor_out = CursorUpsampler(backend, rate_hz=args.cursor_rate, mode=args.cursor_upsample)
+    with startup.phase("input"):
+        mouse = MouseController(smoothing=4, cursor_filter=args.cursor_filter, dispatcher=dispatcher,
+                                output=cursor_out)
+    if cursor_out:
+        cursor_out.start()
     sys_ctrl = SystemController()
-    perf_mon = PerformanceMonitor()
+    if dispatcher:
+        sys_ctrl = DispatchProxy(sys_ctrl, dispatcher)
     
+    # Settings panel in its own process (Tk would block this loop); it and the
+    # loop talk through a seqlocked shared-memory snapshot, so neither waits.
+    settings = None
+    if args.settings_ui:
+        settings = SettingsChannel(initial={'smoothing': mouse.smoothing, 'detection_con': tracker.confidence[0],
+                                            'track_con': tracker.confidence[1]})
+        settings.poll() # current values are already applied
+        settings.start_ui()
+    last_stats_publish = 0.0
+
+    # Other local processes can follow the landmarks and gestures: a socket
+    # stream with per-subscriber queues, and/or a shared-memory ring to poll.
+    events = EventServer(args.event_socket, max_hands=2).start() if args.event_socket else None
+    ring = LandmarkRing(max_hands=2) if args.event_ring else None
+    if events:
+        print(f"📡 Event stream on {args.event_socket}")
+    if ring:
+        print(f"📡 Landmark ring: {ring.name}")
+
     # State Variables
-    canvas = np.zeros((V_HEIGHT, V_WIDTH, 3), np.uint8)
-    draw_mode = False
-    prev_draw_x, prev_draw_y = 0, 0
-    prev_draw_x2, prev_draw_y2 = 0, 0
-    draw_color = (0, 255, 0) # Default Green
-    brush_thickness = 5
-    eraser_thickness = 50
-    swipe_cooldown = 0
-    volume_cooldown = 0
-    
-    # 2-Hand Statics
-    initial_dist = 0
-    initial_angle = 0
-    zoom_cooldown = 0
+    board = Whiteboard(V_WIDTH, V_HEIGHT)
+    gestures = GestureState(board, mouse, sys_ctrl, V_WIDTH, V_HEIGHT, margin=FRAME_MARGIN)
+    engine = build_gesture_engine()
     
+    # Pipelined mode: capture and inference overlap with gesture/render work on
+    # this thread. All tracker state stays on the inference thread.
+    # Frame buffers are recycled through the pool: capture reads into one, the
+    # flip writes into another, and each is handed back once the frame is shown.
+    pool = FramePool()
+    frame_shape = (V_HEIGHT, V_WIDTH, 3)
+    alloc_probe = AllocationProbe() if args.debug_alloc else None
+
+    # Idle governor: with no hand for --idle-timeout seconds, only --idle-fps
+    # frames a second are looked at, and those get a presence check instead of
+    # the landmarker. Files and replays run it on media time, not wall time.
+    frames_read = {'n': 0}
+    def media_time():
+        if replay: return cap.timestamp
+        return time.monotonic() if cap.live or args.pipelined else frames_read['n'] / 30.0
+    governor = None
+    if args.idle_timeout > 0:
+        governor = IdleGovernor(timeout=args.idle_timeout, idle_fps=args.idle_fps, clock=media_time)
+
+    pipeline = None
+    if args.pipelined:
+        pipeline = FramePipeline(cap, lambda frame: detect_hands(tracker, frame, perf_mon, recorder=recorder, pool=pool,
+                                                                 governor=governor),
+                                 monitor=perf_mon, pool=pool, frame_shape=frame_shape,
+                                 gate=governor.due if governor else None).start()
+
+    # Headless: no overlays and no window, so vision and input get the whole CPU.
+    # A decimated preview comes from --preview-every or SIGUSR1 at runtime.
+    preview = {'on': not args.headless or args.preview_every > 0, 'every': args.preview_every or 10}
+    preview_window = False
+    if args.headless and hasattr(signal, 'SIGUSR1'):
+        def toggle_preview(signum, _frame):
+            preview['on'] = not preview['on']
+        signal.signal(signal.SIGUSR1, toggle_preview)
+
+    # Ctrl+C / SIGTERM end the loop cleanly so the recorder and threads shut down
+    running = {'on': True}
+    def request_stop(signum, _frame):
+        running['on'] = False
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
     p_time = 0
-    print("🚀 AI Virtual Mouse Started - HAND ELITE MODE!")
+    frame_no = 0
+    print(f"⏱️ Startup: {startup.report()}")
+    print("🚀 AI Virtual Mouse Started - HAND ELITE MODE!" + (" (headless)" if args.headless else ""))
     
-    while True:
-        success, img = cap.read()
-        if not success or img is None:
-            continue
-            
-        img = cv2.flip(img, 1) 
-        
+    img = None
+    preview_img = None
+    while running['on']:
+        # Last iteration's frame buffer is free again
+        pool.release(img)
+        img = None
+        if alloc_probe:
+            alloc_probe.tick()
+
         # 1. AI Tracking
-        # MediaPipe Video mode requires monotonic timestamps in ms
-        timestamp_ms = int(time.time() * 1000)
-        img = tracker.find_hands(img, draw=True, timestamp_ms=timestamp_ms)
-        
-        # Get data for all detected hands
-        hands_data = []
-        if tracker.results and tracker.results.hand_landmarks:
-            for i in range(len(tracker.results.hand_landmarks)):
-                lm_list = tracker.find_position(img, hand_no=i, draw=False)
-                fingers = tracker.fingers_up(lm_list, hand_no=i)
-                hands_data.append({'lm': lm_list, 'fingers': fingers})
-
-
-        
-        # 1. Whiteboard UI Rendering (Always show in draw mode)
-        if draw_mode:
-            cv2.rectangle(img, (0, 0), (100, 70), (255, 0, 0), cv2.FILLED) # Blue
-            cv2.rectangle(img, (100, 0), (200, 70), (0, 255, 0), cv2.FILLED) # Green
-            cv2.rectangle(img, (200, 0), (300, 70), (0, 0, 255), cv2.FILLED) # Red
-            cv2.rectangle(img, (300, 0), (450, 70), (200, 200, 200), cv2.FILLED) # Eraser
-            cv2.putText(img, "ERASER", (320, 45), cv2.FONT_HERSHEY_PLAIN, 2, (0, 0, 0), 3)
-            cv2.rectangle(img, (450, 0), (640, 70), (50, 50, 50), cv2.FILLED) # Clear
-            cv2.putText(img, "CLEAR", (480, 45), cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 3)
-
-            # Highlight Selected Color
-            if draw_color == (255, 0, 0): cv2.rectangle(img, (0,0), (100, 70), (255,255,100), 4)
-            elif draw_color == (0, 255, 0): cv2.rectangle(img, (100,0), (200, 70), (255,255,100), 4)
-            elif draw_color == (0, 0, 255): cv2.rectangle(img, (200,0), (300, 70), (255,255,100), 4)
-            elif draw_color == (0, 0, 0): cv2.rectangle(img, (300,0), (450, 70), (0,255,0), 4)
-
-        # 2. Process Individual Hand Gestures (Looping over all hands)
-        for i, data in enumerate(hands_data):
-            lm = data['lm']
-            fingers = data['fingers']
-            x1, y1 = lm[8][1], lm[8][2]
-            x2, y2 = lm[12][1], lm[12][2]
-
-            # --- DRAW MODE LOGIC ---
-            if draw_mode:
-                if fingers[1] == 1:
-                    # Header Interaction (Only first hand can change settings to avoid conflict)
-                    if i == 0 and y1 < 70:
-                        if 0 < x1 < 100: draw_color = (255, 0, 0)
-                        elif 100 < x1 < 200: draw_color = (0, 255, 0)
-                        elif 200 < x1 < 300: draw_color = (0, 0, 255)
-                        elif 300 < x1 < 450: draw_color = (0, 0, 0)
-                        elif 450 < x1 < 640: canvas = np.zeros((V_HEIGHT, V_WIDTH, 3), np.uint8)
-                    
-                    # Drawing (Both hands can draw smoothly!)
-                    elif y1 > 70:
-                        thickness = brush_thickness if draw_color != (0, 0, 0) else eraser_thickness
-                        if i == 0:
-                            if prev_draw_x == 0: prev_draw_x, prev_draw_y = x1, y1
-                            cv2.line(canvas, (prev_draw_x, prev_draw_y), (x1, y1), draw_color, thickness)
-                            prev_draw_x, prev_draw_y = x1, y1
-                        else:
-                            if prev_draw_x2 == 0: prev_draw_x2, prev_draw_y2 = x1, y1
-                            cv2.line(canvas, (prev_draw_x2, prev_draw_y2), (x1, y1), draw_color, thickness)
-                            prev_draw_x2, prev_draw_y2 = x1, y1
-                        
-                        cv2.circle(img, (x1, y1), 8, draw_color, cv2.FILLED)
-                else:
-                    if i == 0: prev_draw_x, prev_draw_y = 0, 0
-                    else: prev_draw_x2, prev_draw_y2 = 0, 0
-
-            # --- NAVIGATION & SYSTEM MODE ---
-            else:
-                if fingers == [0, 0, 0, 0, 0]: # Reset/Pause
-                    if swipe_cooldown == 0: sys_ctrl.media_control('play_pause'); swipe_cooldown = 40
-                
-                elif fingers == [1, 0, 0, 0, 0]: # App Switcher
-                    if swipe_cooldown == 0: sys_ctrl.app_switcher(); swipe_cooldown = 20
-
-                elif fingers == [1, 1, 0, 0, 0]: # Volume Control
-                    if volume_cooldown == 0:
-                        if y1 < 200: sys_ctrl.volume_step('up')
-                        elif y1 > 300: sys_ctrl.volume_step('down')
-                        volume_cooldown = 5
-
-                # Pinky UP to toggle draw mode
-                if fingers == [0, 0, 0, 0, 1] and swipe_cooldown == 0:
-                    draw_mode = not draw_mode
-                    swipe_cooldown = 30
-
-                # Mouse Control (Only first hand controls cursor)
-                if i == 0:
-                    if fingers[1] == 1 and fingers[2] == 0:
-                        mouse.move_cursor(x1, y1, V_WIDTH, V_HEIGHT, margin=FRAME_MARGIN)
-                    elif fingers[1] == 1 and fingers[2] == 1 and np.hypot(x2-x1, y2-y1) < 45:
-                        mouse.click()
-                    elif fingers[1] == 1 and fingers[2] == 1 and fingers[3] == 1:
-                        mouse.right_click()
-
-        # 3. Two-Hand Special Gestures (Zoom & Rotate)
-        if len(hands_data) == 2:
-            h1, h2 = hands_data[0]['lm'], hands_data[1]['lm']
-            cx1, cy1 = h1[9][1], h1[9][2]
-            cx2, cy2 = h2[9][1], h2[9][2]
-            
-            curr_dist = np.hypot(cx2 - cx1, cy2 - cy1)
-            curr_angle = math.degrees(math.atan2(cy2 - cy1, cx2 - cx1))
-            
-            if initial_dist == 0:
-                initial_dist, initial_angle = curr_dist, curr_angle
-            else:
-                dist_diff = curr_dist - initial_dist
-                if abs(dist_diff) > 50 and zoom_cooldown == 0:
-                    if dist_diff > 0: sys_ctrl.zoom_control('in')
-                    else: sys_ctrl.zoom_control('out')
-                    zoom_cooldown = 10
-                    initial_dist = curr_dist
-                
-                angle_diff = curr_angle - initial_angle
-                if abs(angle_diff) > 20 and zoom_cooldown == 0:
-                    if angle_diff > 0: sys_ctrl.rotate_control('right')
-                    else: sys_ctrl.rotate_control('left')
-                    zoom_cooldown = 15
-                    initial_angle = curr_angle
-
-            cv2.line(img, (cx1, cy1), (cx2, cy2), (255, 0, 255), 3)
-            cv2.putText(img, "MULTI-HAND ACTIVE", (200, 50), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 255), 3)
+        if pipeline:
+            frame = pipeline.read()
+            if frame is None:
+                if pipeline.error:
+                    print(f"❌ INFERENCE ERROR: {pipeline.error}")
+                    break
+                if pipeline.finished: break
+                if not args.headless and cv2.waitKey(1) & 0xFF == ord('q'): break
+                continue
+            img, hands_data = frame['img'], frame['hands']
         else:
-            initial_dist = 0
-
-        # Merge & Render
-        img_gray = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
-        _, img_inv = cv2.threshold(img_gray, 50, 255, cv2.THRESH_BINARY_INV)
-        img_inv = cv2.cvtColor(img_inv, cv2.COLOR_GRAY2BGR)
-        img = cv2.bitwise_and(img, img_inv)
-        img = cv2.bitwise_or(img, canvas)
-
-        if swipe_cooldown > 0: swipe_cooldown -= 1
-        if volume_cooldown > 0: volume_cooldown -= 1
-        if zoom_cooldown > 0: zoom_cooldown -= 1
-
-        # Perf
-        c_time = time.time()
-        fps = 1 / (c_time - p_time) if (c_time - p_time) > 0 else 0
+            if governor and not governor.due():
+                # Idle: take the frame off the camera without decoding it
+                with perf_mon.stage("capture"):
+                    grabbed = cap.grab()
+                frames_read['n'] += 1
+                if not grabbed and not cap.live: break
+                continue
+            out = pool.acquire(frame_shape)
+            with perf_mon.stage("capture"):
+                success, img = cap.read(out)
+            frames_read['n'] += 1
+            if img is not out:
+                pool.release(out)
+            if not success or img is None:
+                if cap.live: continue
+                break # End of file/log
+            frame_shape = img.shape
+            if replay:
+                img, hands_data = replay_hands(tracker, cap, img, perf_mon)
+            else:
+                img, hands_data = detect_hands(tracker, img, perf_mon, recorder=recorder, pool=pool, governor=governor)
+
+        if governor:
+            state = governor.observe(len(hands_data))
+            if state == IDLE:
+                print(f"💤 Idle: no hand for {args.idle_timeout:g}s, checking {args.idle_fps:g} frames a second")
+            elif state == ACTIVE:
+                print("👋 Hand detected, full tracking resumed")
+
+        # Only frames that will actually be shown pay for overlays
+        frame_no += 1
+        render = not args.headless or (preview['on'] and frame_no % preview['every'] == 0)
+
+        if render:
+            for data in hands_data:
+                draw_skeleton(img, data['landmarks'])
+
+        # 1. Whiteboard UI Rendering (Always show in draw mode)
+        if gestures.draw_mode and render:
+            draw_toolbar(img, gestures.draw_color)
+
+        # 2. Gestures: per-hand rules plus two-hand zoom/rotate. Replayed logs
+        # drive the cooldown clock from their own timestamps.
+        with perf_mon.stage("gestures"):
+            fired = process_gestures(engine, gestures, hands_data, now=cap.timestamp if replay else None)
+
+        if events or ring:
+            stamp = cap.timestamp if replay else time.time()
+            landmarks = [data['landmarks'] for data in hands_data]
+            handedness = [data['handedness'] for data in hands_data]
+            if events:
+                events.publish_landmarks(frame_no, stamp, landmarks, handedness)
+                for hand, name in fired:
+                    events.publish_gesture(frame_no, stamp, hand, name)
+            if ring:
+                ring.write(frame_no, stamp, landmarks, handedness)
+
+        if render:
+            for center, color in gestures.draw_cursors:
+                cv2.circle(img, center, 8, color, cv2.FILLED)
+            if gestures.hand_link:
+                cv2.line(img, *gestures.hand_link, (255, 0, 255), 3)
+                cv2.putText(img, "MULTI-HAND ACTIVE", (200, 50), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 255), 3)
+
+        # Merge & Render (in place, only over drawn content; no-op while blank)
+        if render:
+            with perf_mon.stage("compositing"):
+                board.composite(img)
+
+        # Perf: loop-to-loop time feeds the "frame" histogram (FPS = 1 / its p50)
+        c_time = time.perf_counter()
+        frame_time = c_time - p_time if p_time else 0
+        if frame_time:
+            perf_mon.record("frame", frame_time)
         p_time = c_time
+        perf_mon.maybe_dump()
+        if settings:
+            changes = settings.poll()
+            if changes:
+                apply_settings(changes, mouse, tracker)
+            if c_time - last_stats_publish > 0.5:
+                settings.publish_stats(perf_mon.fps(), perf_mon.stage_stats())
+                last_stats_publish = c_time
+        if not render:
+            if preview_window and not preview['on']:
+                cv2.destroyWindow("AI Virtual Mouse Feed")
+                preview_window = False
+            continue
+
         stats = perf_mon.get_latest_stats()
-        cv2.rectangle(img, (0, 0), (200, 80), (0, 0, 0), cv2.FILLED)
-        cv2.putText(img, f"FPS: {int(fps)} | M-HAND: {len(hands_data)}", (10, 25), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 255, 0), 2)
-        cv2.putText(img, f"CPU: {stats['cpu']}% RAM: {stats['memory']}MB", (10, 55), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 255, 0), 2)
-        
-        # --- FINGER STATUS DISPLAY (T I M R P) ---
-        for i, data in enumerate(hands_data):
-            fingers = data['fingers']
-            labels = ['T', 'I', 'M', 'R', 'P']
-            # Position at bottom: Hand 1 on left, Hand 2 on right
-            x_start = 20 + (i * 200)
-            y_pos = V_HEIGHT - 20
-            cv2.putText(img, f"H{i+1}:", (x_start, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, (255, 255, 255), 2)
-            for j, status in enumerate(fingers):
-                color = (0, 255, 0) if status == 1 else (0, 0, 255) # Green if Up, Red if Down
-                cv2.putText(img, labels[j], (x_start + 45 + j * 25, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, color, 2)
-
-        cv2.imshow("AI Virtual Mouse Feed", img)
-        if cv2.waitKey(1) & 0xFF == ord('q'): break
+        stage_stats = perf_mon.stage_stats()
+        hud_lines = [f"FPS: {int(perf_mon.fps() or (1 / frame_time if frame_time else 0))} | M-HAND: {len(hands_data)}",
+                     f"CPU: {stats['cpu']}% RAM: {stats['memory']}MB"]
+        if governor and governor.idle:
+            hud_lines.append("IDLE: waiting for a hand")
+        if pipeline:
+            # Capture-to-display latency of the frame being shown
+            latency_ms = (time.time() - frame['captured']) * 1000
+            hud_lines.append(f"LAT: {int(latency_ms)}ms DROP: {pipeline.capture_slot.dropped}")
+        for name in HUD_STAGES:
+            if name in stage_stats:
+                hud_lines.append(f"{name[:5].upper()} p95: {stage_stats[name]['p95_ms']:.1f}ms")
+        cv2.rectangle(img, (0, 0), (220, 20 + 25 * len(hud_lines)), (0, 0, 0), cv2.FILLED)
+        for i, line in enumerate(hud_lines):
+            cv2.putText(img, line, (10, 25 + 25 * i), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 255, 0), 2)
+        draw_finger_status(img, hands_data)
+
+        with perf_mon.stage("display"):
+            shown = img
+            if args.headless and args.preview_scale != 1:
+                size = (int(img.shape[1] * args.preview_scale), int(img.shape[0] * args.preview_scale))
+                shown = preview_img = cv2.resize(img, size, dst=preview_img, interpolation=cv2.INTER_AREA)
+            cv2.imshow("AI Virtual Mouse Feed", shown)
+            preview_window = True
+            key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'): break
+        elif key == ord('u'): board.undo()
+        elif key == ord('r'): board.redo()
 
+    if pipeline:
+        pipeline.stop()
+    if cursor_out:
+        cursor_out.stop()
+        print(f"Cursor output: {cursor_out.stats()}")
+    if dispatcher:
+        dispatcher.stop()
+        print(f"Input dispatch: {dispatcher.stats()}")
+    if governor:
+        print(f"Idle governor: {governor.stats()}")
+    if tracker.identity.reordered:
+        print(f"Hand identity: {tracker.identity.stats()}")
+    for name, rule_stats in engine.stats().items():
+        if rule_stats['fires']:
+            print(f"Gesture {name}: {rule_stats}")
+    perf_mon.stop()
+    if alloc_probe:
+        alloc_probe.stop()
+        print(f"Frame pool: {pool.stats()}")
+        print(f"Allocation probe: {alloc_probe.report()}")
+    if args.perf_dump and not args.no_perf:
+        print(f"Stage latencies written to {args.perf_dump}")
+    if recorder:
+        recorder.close()
+        print(f"Recorded {recorder.count} frames to {args.record}")
+    if args.save_board and board.strokes.strokes:
+        board.strokes.save(args.save_board)
+        print(f"Saved {len(board.strokes.strokes)} strokes to {args.save_board}")
+    if settings:
+        settings.close()
+    if events:
+        events.stop()
+        print(f"Event stream: {events.stats()}")
+    if ring:
+        ring.close()
+    tracker.close()
     cap.release()
-    cv2.destroyAllWindows()
+    if preview_window:
+        cv2.destroyAllWindows()
+    if pipeline and pipeline.error:
+        # Shut down cleanly first, then fail the way the sync loop would have
+        raise pipeline.error
 
 if __name__ == "__main__":
     main()
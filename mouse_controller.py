@@ -1,46 +1,97 @@
-import pyautogui
 import numpy as np
-from screeninfo import get_monitors
+import time
+from cursor_filters import make_filter
+from input_dispatcher import MOVE, CLICK
+from lazy_imports import LazyModule
+
+pyautogui = LazyModule("pyautogui")
+screeninfo = LazyModule("screeninfo")
 
 class MouseController:
-    def __init__(self, smoothing=4):
-        self.smoothing = smoothing
+    def __init__(self, smoothing=4, cursor_filter='exponential', filter_params=None, axis_params=None, dispatcher=None,
+                 output=None):
+        # cursor_filter: 'exponential' (the original fixed divisor), 'one_euro' or 'kalman'.
+        # filter_params apply to both axes; axis_params={'x': {...}, 'y': {...}} override per axis.
+        # With a dispatcher, pyautogui calls are queued on its worker instead of run inline.
+        # With an output (cursor_output.CursorUpsampler), cursor targets go to it and
+        # its thread moves the pointer at its own rate; before a click it is settled
+        # on the newest target.
+        self.dispatcher = dispatcher
+        self.output = output
+        self.cursor_filter = cursor_filter
         self.ploc_x, self.ploc_y = 0, 0
         self.cloc_x, self.cloc_y = 0, 0
-        
-        monitor = get_monitors()[0]
+        self.filters = {}
+        for axis in ('x', 'y'):
+            params = dict(filter_params or {})
+            params.update((axis_params or {}).get(axis, {}))
+            if cursor_filter == 'exponential':
+                params.setdefault('smoothing', smoothing)
+            self.filters[axis] = make_filter(cursor_filter, **params)
+        self._smoothing = smoothing
+
+        monitor = screeninfo.get_monitors()[0]
         self.screen_width = monitor.width
         self.screen_height = monitor.height
-        
-   
+
+
         pyautogui.PAUSE = 0
         pyautogui.MINIMUM_DURATION = 0
         pyautogui.MINIMUM_SLEEP = 0
         pyautogui.FAILSAFE = False
 
-    def move_cursor(self, x, y, frame_w, frame_h, margin=100):
+    @property
+    def smoothing(self):
+        return self._smoothing
+
+    @smoothing.setter
+    def smoothing(self, value):
+        self._smoothing = value
+        for flt in self.filters.values():
+            if hasattr(flt, 'smoothing'):
+                flt.smoothing = value
+
+    def _send(self, kind, fn, *args, **kwargs):
+        if self.dispatcher:
+            self.dispatcher.submit(kind, fn, *args, **kwargs)
+        else:
+            fn(*args, **kwargs)
+
+    def move_cursor(self, x, y, frame_w, frame_h, margin=100, timestamp=None):
+        t = time.monotonic() if timestamp is None else timestamp
         x_mapped = np.interp(x, (margin, frame_w - margin), (0, self.screen_width))
         y_mapped = np.interp(y, (margin, frame_h - margin), (0, self.screen_height))
-        # Constant Smoothing: Discrete "jumps" in smoothing cause jerky motion.
-        # We use a constant, stable value for all movements.
-        self.cloc_x = self.ploc_x + (x_mapped - self.ploc_x) / self.smoothing
-        self.cloc_y = self.ploc_y + (y_mapped - self.ploc_y) / self.smoothing
-        
+        self.cloc_x = self.filters['x'].filter(x_mapped, t)
+        self.cloc_y = self.filters['y'].filter(y_mapped, t)
+
         # Deadzone / Stabilization: Only move if the change is meaningful
         if np.hypot(self.cloc_x - self.ploc_x, self.cloc_y - self.ploc_y) > 0.5:
-            pyautogui.moveTo(self.cloc_x, self.cloc_y)
+            if self.output:
+                self.output.set_target(self.cloc_x, self.cloc_y)
+            else:
+                self._send(MOVE, pyautogui.moveTo, self.cloc_x, self.cloc_y)
             self.ploc_x, self.ploc_y = self.cloc_x, self.cloc_y
+        else:
+            self.filters['x'].reject()
+            self.filters['y'].reject()
+
+    def _settle(self):
+        if self.output:
+            self.output.settle()
 
     def click(self, button='left'):
-        pyautogui.click(button=button)
+        self._settle()
+        self._send(CLICK, pyautogui.click, button=button)
 
     def double_click(self):
-        pyautogui.doubleClick()
+        self._settle()
+        self._send(CLICK, pyautogui.doubleClick)
 
     def scroll(self, direction):
 
         amount = 5 if direction == 'up' else -5
-        pyautogui.scroll(amount)
+        self._send(CLICK, pyautogui.scroll, amount)
 
     def right_click(self):
-        pyautogui.click(button='right')
+        self._settle()
+        self._send(CLICK, pyautogui.click, button='right')
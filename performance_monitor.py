@@ -1,42 +1,182 @@
-import psutil
+import csv
+import json
+import threading
 import time
+from contextlib import contextmanager
+import numpy as np
+from lazy_imports import LazyModule
+
+psutil = LazyModule("psutil")
+
+class RollingHistogram:
+    # Last `size` samples of one stage in a preallocated ring (fixed memory)
+    def __init__(self, size=512):
+        self.samples = np.zeros(size, np.float64)
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def add(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+
+    def summary(self):
+        n = min(self.count, self.size)
+        if n == 0:
+            return None
+        window = self.samples[:n] * 1000
+        p50, p95, p99 = np.percentile(window, (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean_ms": round(float(window.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(window.max()), 3),
+        }
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
 
 class PerformanceMonitor:
-    def __init__(self):
-        self.process = psutil.Process()
+    def __init__(self, enabled=True, window=512, dump_path=None, dump_interval=10.0):
+        # psutil is only needed once the HUD asks for CPU/RAM (never in headless mode)
+        self.process = None
         self.last_time = time.time()
-        try:
-            self.last_cpu_times = self.process.cpu_times()
-        except:
-            self.last_cpu_times = None
+        self.last_cpu_times = None
+
+        # Named stage timers (capture, inference, gestures, ...). When disabled,
+        # stage() hands back a shared no-op context manager.
+        self.enabled = enabled
+        self.window = window
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._last_dump = time.monotonic()
+        self._summary_cache = (0.0, {})
+        self._last_cpu = 0.0
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, RollingHistogram(self.window))
+        return histogram
+
+    def stage(self, name):
+        # with perf_mon.stage("inference"): ...
+        if not self.enabled:
+            return NULL_TIMER
+        return _StageTimer(self._histogram(name))
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self._histogram(name).add(seconds)
+
+    def stage_stats(self, max_age=0.5):
+        # {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}, recomputed at most every max_age s
+        now = time.monotonic()
+        cached_at, cached = self._summary_cache
+        if now - cached_at < max_age:
+            return cached
+        stats = {}
+        for name, histogram in list(self.histograms.items()):
+            summary = histogram.summary()
+            if summary:
+                stats[name] = summary
+        self._summary_cache = (now, stats)
+        return stats
+
+    def fps(self):
+        frame = self.stage_stats().get("frame")
+        return 1000 / frame["p50_ms"] if frame and frame["p50_ms"] > 0 else 0
+
+    def dump(self, path=None):
+        # JSON or CSV (by extension) snapshot of every stage's summary
+        path = path or self.dump_path
+        stats = self.stage_stats(max_age=0)
+        if path.endswith(".csv"):
+            fields = ["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for name, summary in stats.items():
+                    writer.writerow({"stage": name, **summary})
+        else:
+            with open(path, "w") as f:
+                json.dump({"time": time.time(), "stages": stats}, f, indent=2)
+
+    def maybe_dump(self):
+        if not self.enabled or not self.dump_path:
+            return
+        now = time.monotonic()
+        if now - self._last_dump >= self.dump_interval:
+            self._last_dump = now
+            try:
+                self.dump()
+            except OSError as e:
+                print(f"Perf Dump Error: {e}")
 
     def get_latest_stats(self):
         # Calculate CPU usage since last call without blocking or threading
         current_time = time.time()
         try:
+            if self.process is None:
+                self.process = psutil.Process()
             current_cpu_times = self.process.cpu_times()
             memory_info = self.process.memory_info()
         except:
             return {"cpu": 0, "memory": 0}
-        
+
         delta_time = current_time - self.last_time
-        cpu_percent = 0.0
-        
+
+        # Called every frame, so only re-measure once the interval is long enough
+        # to be meaningful and report the previous reading in between.
         if self.last_cpu_times and delta_time > 0.1:
             # Calculate CPU percentage over the interval manually
             user_delta = current_cpu_times.user - self.last_cpu_times.user
             sys_delta = current_cpu_times.system - self.last_cpu_times.system
             cpu_percent = ((user_delta + sys_delta) / delta_time) * 100
-            
-            # Clamp to 100% just in case
-            cpu_percent = min(max(cpu_percent, 0.0), 100.0)
 
-        self.last_time = current_time
-        self.last_cpu_times = current_cpu_times
+            # Clamp to 100% just in case
+            self._last_cpu = min(max(cpu_percent, 0.0), 100.0)
+            self.last_time = current_time
+            self.last_cpu_times = current_cpu_times
+        elif not self.last_cpu_times:
+            self.last_time = current_time
+            self.last_cpu_times = current_cpu_times
         memory_usage_mb = memory_info.rss / (1024 * 1024)
-        
+
         return {
-            "cpu": round(cpu_percent, 1),
+            "cpu": round(self._last_cpu, 1),
             "memory": int(memory_usage_mb)
         }
 
@@ -45,4 +185,30 @@ class PerformanceMonitor:
         pass
 
     def stop(self):
-        pass
+        if self.enabled and self.dump_path:
+            self.dump()
+
+
+class StartupProfile:
+    # Wall-clock breakdown of startup. Phases may run on other threads and
+    # overlap (camera open vs. model load), so each keeps its own start/end.
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = [] # (name, start s, end s) relative to self.start
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, begin - self.start, time.perf_counter() - self.start))
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def report(self):
+        parts = [f"{name} {int((end - begin) * 1000)}ms @{int(begin * 1000)}" for name, begin, end in self.phases]
+        return " | ".join(parts + [f"total {int(self.total() * 1000)}ms"])
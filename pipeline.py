@@ -0,0 +1,151 @@
+import threading
+import time
+
+
+class LatestSlot:
+    # Single-slot hand-off between stages. A new item replaces one that was
+    # never picked up, so a slow consumer always gets the freshest frame
+    # instead of working through a backlog of stale ones.
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+        self.on_drop = on_drop # called with an item that was replaced unseen
+
+    def put(self, item):
+        with self._cond:
+            dropped = self._item
+            if dropped is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+        if dropped is not None and self.on_drop:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._item is None and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FramePipeline:
+    # Capture -> inference -> (caller) render, each stage on its own thread.
+    # `process(img)` runs on the inference thread and returns (img, hands_data);
+    # the caller pulls finished frames with read() on the main thread, which is
+    # where cv2.imshow has to live anyway.
+    # With a FramePool, captured frames are read into pooled buffers; `process`
+    # owns the buffer it is given, and the caller releases frame['img'] once done.
+    # With a `gate` (e.g. IdleGovernor.due), frames it turns down are grabbed off
+    # the source without decoding and never reach inference.
+    def __init__(self, cap, process, monitor=None, pool=None, frame_shape=None, gate=None):
+        self.cap = cap
+        self.process = process
+        self.gate = gate
+        self.monitor = monitor # optional PerformanceMonitor, times the "capture" stage
+        self.pool = pool
+        self.frame_shape = frame_shape
+        release = self._release_frame if pool else None
+        self.capture_slot = LatestSlot(on_drop=release)
+        self.output_slot = LatestSlot(on_drop=release)
+        self.running = False
+        self.finished = False # Non-live source ran out of frames, or a stage failed
+        self.error = None # exception that stopped the inference stage
+        self.threads = []
+        self.captured = 0
+        self.processed = 0
+        self.skipped = 0
+
+    def start(self):
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for t in self.threads:
+            t.start()
+        return self
+
+    def _release_frame(self, frame):
+        self.pool.release(frame['img'])
+
+    def _capture_loop(self):
+        while self.running:
+            if self.gate and not self.gate():
+                self.skipped += 1
+                if self.monitor:
+                    with self.monitor.stage("capture"):
+                        grabbed = self.cap.grab()
+                else:
+                    grabbed = self.cap.grab()
+                if not grabbed:
+                    if not getattr(self.cap, 'live', True):
+                        self.finished = True
+                        break
+                    time.sleep(0.005)
+                continue
+            out = self.pool.acquire(self.frame_shape) if self.pool else None
+            if self.monitor:
+                with self.monitor.stage("capture"):
+                    success, img = self.cap.read(out)
+            else:
+                success, img = self.cap.read(out)
+            if img is not out and self.pool:
+                self.pool.release(out)
+            if not success or img is None:
+                if not getattr(self.cap, 'live', True):
+                    self.finished = True
+                    break
+                time.sleep(0.005)
+                continue
+            self.frame_shape = img.shape # the source may not honour the requested size
+            self.captured += 1
+            self.capture_slot.put({'id': self.captured, 'img': img, 'captured': time.time()})
+
+    def _inference_loop(self):
+        while self.running:
+            frame = self.capture_slot.get(timeout=0.1)
+            if frame is None:
+                continue
+            try:
+                frame['img'], frame['hands'] = self.process(frame['img'])
+            except Exception as e:
+                # Without this the thread would die silently and read() would
+                # keep returning None; stop both stages and let the caller see it
+                self.error = e
+                self.finished = True
+                self.running = False
+                break
+            self.processed += 1
+            self.output_slot.put(frame)
+
+    def read(self, timeout=1.0):
+        # Returns the newest processed frame dict or None on timeout.
+        return self.output_slot.get(timeout)
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "dropped_capture": self.capture_slot.dropped,
+            "dropped_output": self.output_slot.dropped,
+        }
+
+    def stop(self):
+        self.running = False
+        self.capture_slot.close()
+        self.output_slot.close()
+        for t in self.threads:
+            t.join(timeout=1.0)
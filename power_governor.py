@@ -0,0 +1,138 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+ACTIVE, IDLE = "active", "idle"
+
+
+class IdleGovernor:
+    # Idle state machine for always-on stations. After `timeout` seconds
+    # without a hand the loop drops to IDLE: only idle_fps frames a second are
+    # looked at (the rest are grabbed from the camera without decoding), and
+    # instead of the landmarker they get a presence check, i.e. frame
+    # differencing on a tiny grayscale thumbnail. Only motion (or a periodic
+    # recheck) runs a real detection; if it finds a hand the loop is ACTIVE
+    # again from that same frame.
+    # Thread-safe: in pipelined mode due() runs on the capture thread,
+    # presence() on the inference thread and observe() on the main thread.
+    def __init__(self, timeout=10.0, idle_fps=5.0, recheck=2.0, thumb_width=80, motion_threshold=6.0,
+                 motion_fraction=0.01, clock=time.monotonic):
+        self.clock = clock # seconds; replays and files pass their own media time
+        self.timeout = timeout
+        self.idle_period = 1.0 / idle_fps
+        self.recheck = recheck # seconds between forced detections while idle
+        self.thumb_width = thumb_width
+        self.motion_threshold = motion_threshold # gray levels a thumbnail pixel must change by
+        self.motion_fraction = motion_fraction # share of thumbnail pixels that must change
+        self._lock = threading.Lock()
+        self.state = ACTIVE
+        self.last_hand = None
+        self._next_due = 0.0
+        self._last_detect = 0.0
+        self._thumbs = None # two thumbnails, current and previous, swapped each check
+        self._flip = 0
+        self._have_prev = False
+        self._small = None
+        self._diff = None
+
+        # Accounting: wall and process CPU time per state
+        self._since = None
+        self._cpu_since = time.process_time()
+        self.time_in = {ACTIVE: 0.0, IDLE: 0.0}
+        self.cpu_in = {ACTIVE: 0.0, IDLE: 0.0}
+        self.wakeups = 0
+        self.skipped = 0
+        self.presence_checks = 0
+        self.detections = 0
+
+    @property
+    def idle(self):
+        return self.state == IDLE
+
+    def due(self):
+        # False for frames to skip entirely (idle pacing); always True when active
+        if self.state == ACTIVE:
+            return True
+        now = self.clock()
+        with self._lock:
+            if now + 1e-6 < self._next_due:
+                self.skipped += 1
+                return False
+            self._next_due = now + self.idle_period
+            return True
+
+    def presence(self, img):
+        # Cheap check on an idle frame: True when it is worth running the
+        # landmarker (motion in the thumbnail, or the periodic recheck)
+        with self._lock:
+            now = self.clock()
+            self.presence_checks += 1
+            h, w = img.shape[:2]
+            size = (self.thumb_width, max(int(h * self.thumb_width / w), 1))
+            self._small = cv2.resize(img, size, dst=self._small, interpolation=cv2.INTER_AREA)
+            if self._thumbs is None or self._thumbs[0].shape != size[::-1]:
+                self._thumbs = [np.zeros(size[::-1], np.uint8) for _ in range(2)]
+                self._have_prev = False
+            current, previous = self._thumbs[self._flip], self._thumbs[1 - self._flip]
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=current)
+            moved = True
+            if self._have_prev:
+                self._diff = cv2.absdiff(current, previous, dst=self._diff)
+                cv2.threshold(self._diff, self.motion_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+                moved = cv2.countNonZero(self._diff) >= self.motion_fraction * self._diff.size
+            self._flip = 1 - self._flip
+            self._have_prev = True
+            if moved or now - self._last_detect >= self.recheck:
+                self._last_detect = now
+                self.detections += 1
+                return True
+            return False
+
+    def observe(self, hands):
+        # Feeds the hand count of a processed frame; returns the new state on a
+        # transition, else None
+        with self._lock:
+            now = self.clock()
+            self._account(now)
+            if hands:
+                self.last_hand = now
+            elif self.last_hand is None:
+                self.last_hand = now # the timeout counts from start-up
+            if hands and self.state == IDLE:
+                self.state = ACTIVE
+                self.wakeups += 1
+                return ACTIVE
+            if not hands and self.state == ACTIVE and now - self.last_hand >= self.timeout:
+                self.state = IDLE
+                self._next_due = now + self.idle_period
+                self._last_detect = now
+                self._have_prev = False
+                return IDLE
+            return None
+
+    def _account(self, now):
+        cpu = time.process_time()
+        if self._since is not None:
+            self.time_in[self.state] += max(now - self._since, 0.0)
+            self.cpu_in[self.state] += cpu - self._cpu_since
+        self._since, self._cpu_since = now, cpu
+
+    def stats(self):
+        # CPU saved: idle time at the active CPU rate minus what idling cost
+        with self._lock:
+            self._account(self.clock())
+        active_rate = self.cpu_in[ACTIVE] / self.time_in[ACTIVE] if self.time_in[ACTIVE] else 0.0
+        idle_rate = self.cpu_in[IDLE] / self.time_in[IDLE] if self.time_in[IDLE] else 0.0
+        return {
+            "active_s": round(self.time_in[ACTIVE], 1),
+            "idle_s": round(self.time_in[IDLE], 1),
+            "cpu_active_pct": round(active_rate * 100, 1),
+            "cpu_idle_pct": round(idle_rate * 100, 1),
+            "cpu_saved_s": round(max(active_rate - idle_rate, 0.0) * self.time_in[IDLE], 1),
+            "wakeups": self.wakeups,
+            "skipped_frames": self.skipped,
+            "presence_checks": self.presence_checks,
+            "detections": self.detections,
+        }
@@ -0,0 +1,118 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Live settings between the settings UI process and the running pipeline, in
+# one small shared-memory block with two seqlocked sections:
+#   settings: written by the UI, polled by the vision loop between frames
+#   stats:    written by the vision loop, shown by the UI
+# Each section has a single writer that bumps its sequence number to odd,
+# writes, then bumps it to even again. Readers copy the values and retry if
+# the number changed or was odd meanwhile, so neither side ever waits on a lock.
+SETTINGS = ("smoothing", "detection_con", "track_con")
+DEFAULTS = {"smoothing": 4, "detection_con": 0.4, "track_con": 0.5}
+STAT_FIELDS = ("fps", "frame", "capture", "inference", "smoothing", "gestures", "compositing", "display",
+               "input_dispatch") # fps, then p95 ms per stage
+
+
+class Seqlock:
+    def __init__(self, seq, values, names):
+        self.seq = seq # 0-d uint64 view
+        self.values = values
+        self.names = names
+
+    def write(self, updates):
+        self.seq += 1 # odd: write in progress
+        for name, value in updates.items():
+            self.values[self.names.index(name)] = value
+        self.seq += 1
+
+    def read(self, tries=4):
+        # (version, values) or None if a write kept getting in the way; the
+        # caller just tries again next frame.
+        for _ in range(tries):
+            before = int(self.seq)
+            if before & 1:
+                continue
+            snapshot = self.values.copy()
+            if int(self.seq) == before:
+                return before, snapshot
+        return None
+
+
+class SettingsChannel:
+    def __init__(self, name=None, initial=None):
+        size = 8 * (2 + len(SETTINGS) + len(STAT_FIELDS))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        words = np.ndarray(size // 8, np.float64, buffer=self.shm.buf)
+        seqs = np.ndarray(2, np.uint64, buffer=self.shm.buf)
+        self.settings = Seqlock(seqs[0:1].reshape(()), words[2:2 + len(SETTINGS)], SETTINGS)
+        self.stats = Seqlock(seqs[1:2].reshape(()), words[2 + len(SETTINGS):], STAT_FIELDS)
+        if self.owner:
+            seqs[:] = 0
+            self.stats.values[:] = np.nan
+            self.settings.write(dict(DEFAULTS, **(initial or {})))
+        self._seen = None
+        self._last = None
+        self.ui_process = None
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # --- settings (UI writes, pipeline polls) ---
+    def publish(self, **settings):
+        self.settings.write(settings)
+
+    def snapshot(self):
+        read = self.settings.read(tries=100)
+        return dict(zip(SETTINGS, read[1].tolist())) if read else None
+
+    def poll(self):
+        # Settings that changed since the last poll, or None; never blocks
+        read = self.settings.read()
+        if read is None or read[0] == self._seen:
+            return None
+        self._seen = read[0]
+        current = dict(zip(SETTINGS, read[1].tolist()))
+        last, self._last = self._last, current
+        changes = {k: v for k, v in current.items() if last is None or last[k] != v}
+        return changes or None
+
+    # --- stats (pipeline writes, UI shows) ---
+    def publish_stats(self, fps, stage_stats):
+        updates = {"fps": fps}
+        for name in STAT_FIELDS[1:]:
+            updates[name] = stage_stats[name]["p95_ms"] if name in stage_stats else np.nan
+        self.stats.write(updates)
+
+    def read_stats(self):
+        read = self.stats.read()
+        return dict(zip(STAT_FIELDS, read[1].tolist())) if read else None
+
+    # --- UI process ---
+    def start_ui(self):
+        self.ui_process = multiprocessing.get_context("spawn").Process(
+            target=_ui_main, args=(self.name,), name="settings-ui", daemon=True)
+        self.ui_process.start()
+        return self.ui_process
+
+    def close(self):
+        if self.ui_process and self.ui_process.is_alive():
+            self.ui_process.terminate()
+            self.ui_process.join(timeout=1.0)
+        self.settings = self.stats = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _ui_main(name):
+    # Runs in the UI process; customtkinter is only ever imported here
+    from ui_panel import GesterUI
+    channel = SettingsChannel(name)
+    app = GesterUI(settings_callback=lambda settings: channel.publish(**settings),
+                   initial=channel.snapshot(), stats_source=channel.read_stats)
+    app.mainloop()
@@ -0,0 +1,194 @@
+import json
+
+import cv2
+import numpy as np
+
+ERASER = (0, 0, 0) # black ink is transparent on the board, so it erases
+
+
+class Stroke:
+    # One pen-down..pen-up polyline in board pixels. Points live in a growable
+    # int16 array (4 bytes a point) rather than a list of tuples.
+    __slots__ = ("color", "thickness", "_points", "count")
+
+    def __init__(self, color, thickness, capacity=32):
+        self.color = tuple(int(c) for c in color)
+        self.thickness = int(thickness)
+        self._points = np.empty((capacity, 2), np.int16)
+        self.count = 0
+
+    @property
+    def points(self):
+        return self._points[:self.count]
+
+    @property
+    def eraser(self):
+        return self.color == ERASER
+
+    def append(self, point):
+        if self.count == len(self._points):
+            grown = np.empty((2 * len(self._points), 2), np.int16)
+            grown[:self.count] = self._points
+            self._points = grown
+        self._points[self.count] = point
+        self.count += 1
+
+    def trim(self):
+        # Drop spare capacity once the stroke is finished
+        self._points = self._points[:max(self.count, 1)].copy()
+
+    def render(self, canvas, scale=(1.0, 1.0)):
+        # Same pixels as drawing it segment by segment with cv2.line at scale 1
+        sx, sy = scale
+        pts = self.points.astype(np.int32)
+        if sx != 1.0 or sy != 1.0:
+            pts = np.rint(pts * (sx, sy)).astype(np.int32)
+        thickness = max(int(round(self.thickness * (sx + sy) / 2)), 1)
+        if len(pts) == 1:
+            pts = np.repeat(pts, 2, axis=0)
+        cv2.polylines(canvas, [pts], False, self.color, thickness)
+
+    def to_dict(self):
+        return {"color": list(self.color), "thickness": self.thickness, "points": self.points.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        points = data["points"]
+        stroke = cls(data["color"], data["thickness"], capacity=max(len(points), 1))
+        stroke._points[:len(points)] = points
+        stroke.count = len(points)
+        return stroke
+
+
+class StrokeStore:
+    # The drawing as an ordered list of strokes plus an undo history, so memory
+    # follows what was drawn rather than the frame size. Each hand has at most
+    # one open stroke. History entries are ("stroke", stroke) or
+    # ("clear", strokes removed); undo reverts the newest, redo re-applies it.
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.strokes = []
+        self.open = {} # hand -> stroke being drawn
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def extend(self, hand, point, color, thickness):
+        # Adds a point to the hand's open stroke, starting a new stroke when
+        # none is open or the pen changed; returns (stroke, previous point).
+        stroke = self.open.get(hand)
+        if stroke is not None and (stroke.color != tuple(color) or stroke.thickness != thickness):
+            self.end(hand)
+            stroke = None
+        if stroke is None:
+            stroke = self.open[hand] = Stroke(color, thickness)
+            self.strokes.append(stroke)
+            self.undo_stack.append(("stroke", stroke))
+            self.redo_stack.clear()
+        prev = tuple(int(v) for v in stroke.points[-1]) if stroke.count else tuple(point)
+        stroke.append(point)
+        return stroke, prev
+
+    def end(self, hand):
+        stroke = self.open.pop(hand, None)
+        if stroke is not None:
+            stroke.trim()
+
+    def end_missing(self, hands):
+        # Ends the open strokes of hands not in `hands` (hands that left)
+        for hand in [hand for hand in self.open if hand not in hands]:
+            self.end(hand)
+
+    def end_all(self):
+        for hand in list(self.open):
+            self.end(hand)
+
+    def clear(self):
+        self.end_all()
+        if not self.strokes:
+            return False
+        self.undo_stack.append(("clear", self.strokes))
+        self.redo_stack.clear()
+        self.strokes = []
+        return True
+
+    def undo(self):
+        self.end_all()
+        if not self.undo_stack:
+            return False
+        kind, item = self.undo_stack.pop()
+        if kind == "stroke":
+            self.strokes.remove(item)
+        else:
+            self.strokes = item + self.strokes
+        self.redo_stack.append((kind, item))
+        return True
+
+    def redo(self):
+        self.end_all()
+        if not self.redo_stack:
+            return False
+        kind, item = self.redo_stack.pop()
+        if kind == "stroke":
+            self.strokes.append(item)
+        else:
+            self.strokes = [s for s in self.strokes if s not in item]
+        self.undo_stack.append((kind, item))
+        return True
+
+    @property
+    def point_count(self):
+        return sum(s.count for s in self.strokes)
+
+    def rasterize(self, width=None, height=None, canvas=None):
+        # Draws every stroke, in order, at any resolution (default the board's)
+        if canvas is None:
+            canvas = np.zeros((height or self.height, width or self.width, 3), np.uint8)
+        scale = (canvas.shape[1] / self.width, canvas.shape[0] / self.height)
+        for stroke in self.strokes:
+            stroke.render(canvas, scale)
+        return canvas
+
+    # --- export ---
+    def to_json(self):
+        return json.dumps({"width": self.width, "height": self.height,
+                           "strokes": [s.to_dict() for s in self.strokes]})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        store = cls(data["width"], data["height"])
+        store.strokes = [Stroke.from_dict(s) for s in data["strokes"]]
+        return store
+
+    def to_svg(self):
+        # Eraser strokes become masks over everything drawn before them, so the
+        # SVG shows what the board shows, on a transparent background.
+        defs, body = [], []
+        for stroke in self.strokes:
+            path = _svg_polyline(stroke, "#000" if stroke.eraser else "#%02x%02x%02x" % stroke.color[::-1])
+            if stroke.eraser:
+                mask_id = f"erase{len(defs)}"
+                defs.append(f'<mask id="{mask_id}" maskUnits="userSpaceOnUse">'
+                            f'<rect width="{self.width}" height="{self.height}" fill="#fff"/>{path}</mask>')
+                body = [f'<g mask="url(#{mask_id})">', *body, '</g>']
+            else:
+                body.append(path)
+        return "\n".join([
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}">',
+            f'<defs>{"".join(defs)}</defs>' if defs else "",
+            *body,
+            "</svg>",
+        ])
+
+    def save(self, path):
+        # .svg or .json by extension
+        text = self.to_svg() if path.lower().endswith(".svg") else self.to_json()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+def _svg_polyline(stroke, color):
+    points = " ".join(f"{x},{y}" for x, y in stroke.points.tolist())
+    return (f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="{stroke.thickness}" '
+            f'stroke-linecap="round" stroke-linejoin="round"/>')
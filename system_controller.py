@@ -1,6 +1,8 @@
 import os
 import time
-import pyautogui
+from lazy_imports import LazyModule
+
+pyautogui = LazyModule("pyautogui")
 
 class SystemController:
     def __init__(self):
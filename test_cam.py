@@ -1,9 +1,12 @@
 import cv2
+import sys
 from hand_tracker import HandTracker
+from video_source import open_source
 import time
 
 def main():
-    cap = cv2.VideoCapture(0)
+    # Optional argument: camera index, video file or image directory (default: camera 0)
+    cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
     tracker = HandTracker()
     p_time = 0
     
@@ -11,10 +14,10 @@ def main():
     while True:
         success, img = cap.read()
         if not success:
-            print("Failed to read camera")
+            print("Failed to read source")
             break
             
-        img = tracker.find_hands(img)
+        img = tracker.find_hands(img, timestamp_ms=int(time.time() * 1000))
         lm_list = tracker.find_position(img)
         
         c_time = time.time()
@@ -0,0 +1,12 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_no_regressions_against_baseline():
+    # In a subprocess: the benchmark installs its mocked pyautogui/screeninfo
+    out = subprocess.run([sys.executable, "benchmark.py", "--repeat", "2"], cwd=ROOT, capture_output=True,
+                         text=True, timeout=600)
+    assert out.returncode == 0, out.stdout[-2000:] + out.stderr[-2000:]
+    assert "No regressions" in out.stdout
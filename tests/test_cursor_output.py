@@ -0,0 +1,50 @@
+from cursor_output import CursorUpsampler, DispatchedBackend, RecordingBackend
+from input_dispatcher import CLICK, InputDispatcher
+
+
+def make_upsampler(mode, backend=None):
+    now = [0.0]
+    backend = backend or RecordingBackend(clock=lambda: now[0])
+    upsampler = CursorUpsampler(backend, rate_hz=120, mode=mode, deadzone=0, clock=lambda: now[0])
+    return upsampler, backend, now
+
+
+def test_extrapolation_rests_on_last_target():
+    upsampler, backend, now = make_upsampler("extrapolate")
+    for i in range(30):
+        now[0] = i / 30
+        upsampler.set_target(1000.0 * now[0], 500.0)
+    last = (1000.0 * now[0], 500.0)
+    # Targets stop; the pointer runs on briefly, then comes back
+    for i in range(1, 60):
+        now[0] = 29 / 30 + i / 120
+        upsampler.tick()
+    assert max(x for _, x, _ in backend.moves) > last[0]
+    assert backend.moves[-1][1:] == last
+    assert upsampler.position() == last
+
+
+class CallLog:
+    def __init__(self):
+        self.calls = []
+
+    def move(self, x, y):
+        self.calls.append(("move", x, y))
+
+    def click(self):
+        self.calls.append(("click",))
+
+
+def test_settle_moves_to_target_before_click():
+    dispatcher = InputDispatcher()
+    log = CallLog()
+    upsampler, _, now = make_upsampler("interpolate", DispatchedBackend(log, dispatcher))
+    upsampler.set_target(0.0, 0.0)
+    now[0] = 1 / 30
+    upsampler.set_target(300.0, 300.0)
+    now[0] += 1 / 120
+    upsampler.tick() # partway along the segment
+    upsampler.settle()
+    dispatcher.submit(CLICK, log.click)
+    dispatcher.start().stop()
+    assert log.calls[-2:] == [("move", 300.0, 300.0), ("click",)]
@@ -0,0 +1,66 @@
+import os
+import socket
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+from event_client import RingReader
+from event_stream import EventServer, LandmarkRing
+
+READER = """
+import sys
+from event_client import RingReader
+reader = RingReader(sys.argv[1])
+frame = reader.latest()
+reader.close()
+print(frame.frame_id)
+"""
+
+
+def run_reader(name):
+    # A separate consumer process that attaches, reads, detaches and exits
+    out = subprocess.run([sys.executable, "-c", READER, name], cwd=ROOT, capture_output=True, text=True,
+                         timeout=60)
+    assert out.returncode == 0, out.stderr
+    return int(out.stdout)
+
+
+def test_reader_exit_keeps_ring():
+    ring = LandmarkRing(max_hands=2)
+    try:
+        ring.write(7, 0.25, np.zeros((1, 21, 3), np.float32), ["Right"])
+        assert run_reader(ring.name) == 7
+        # The first reader exiting must not have unlinked the publisher's segment
+        assert run_reader(ring.name) == 7
+        reader = RingReader(ring.name)
+        assert reader.latest().handedness == ["Right"]
+        reader.close()
+    finally:
+        ring.close()
+
+
+def test_owner_close_tolerates_missing_segment():
+    ring = LandmarkRing(max_hands=1)
+    ring.shm.unlink()
+    ring.close()
+
+
+def test_event_socket_keeps_regular_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        EventServer(str(path)).start()
+    assert path.read_text() == "keep me"
+
+
+def test_event_socket_replaces_stale_socket(tmp_path):
+    path = str(tmp_path / "events.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = EventServer(path).start()
+    server.stop()
+    assert not os.path.exists(path)
@@ -0,0 +1,83 @@
+import numpy as np
+
+from gestures import GestureState, build_gesture_engine, process_gestures
+from hand_identity import HandAssociator
+from whiteboard import Whiteboard
+
+INDEX_UP = [0, 1, 0, 0, 0]
+
+
+def hand(hand_id, x, y):
+    pts = np.zeros((21, 2), np.int32)
+    pts[8] = (x, y)
+    return {'id': hand_id, 'pts': pts, 'fingers': INDEX_UP}
+
+
+def test_hand_that_leaves_and_returns_with_new_id():
+    board = Whiteboard(640, 480)
+    state = GestureState(board, None, None, 640, 480)
+    state.draw_mode = True
+    engine = build_gesture_engine()
+    t = 0.0
+    for x in range(100, 200, 10):
+        process_gestures(engine, state, [hand(0, x, 300)], now=t)
+        t += 1 / 30
+    assert list(board.strokes.open) == [0]
+
+    # The hand leaves: its stroke ends and no debounce state is kept for it
+    process_gestures(engine, state, [], now=t)
+    assert board.strokes.open == {}
+    assert all(not rule._held for rule in engine.rules)
+
+    # It comes back under a new ID and draws a separate stroke
+    for x in range(300, 400, 10):
+        t += 1 / 30
+        process_gestures(engine, state, [hand(1, x, 300)], now=t)
+    assert list(board.strokes.open) == [1]
+    assert len(board.strokes.strokes) == 2
+    assert all(set(rule._held) <= {1} for rule in engine.rules)
+
+
+def palm(x, y):
+    # (21, 3) normalized landmarks of a hand whose palm is centred on (x, y)
+    landmarks = np.zeros((21, 3), np.float32)
+    landmarks[:, 0], landmarks[:, 1] = x, y
+    landmarks[8, 1] = y - 0.1 # index fingertip above the palm
+    return landmarks
+
+
+def test_associator_reuses_id_within_memory_then_drops_state():
+    associator = HandAssociator(memory=5)
+    board = Whiteboard(640, 480)
+    state = GestureState(board, None, None, 640, 480)
+    state.draw_mode = True
+    engine = build_gesture_engine()
+    frame = [0]
+
+    def step(present, x=0.5):
+        landmarks = np.array([palm(x, 0.6)] if present else np.zeros((0, 21, 3)), np.float32)
+        _, ids = associator.associate(landmarks, ["Right"] * len(landmarks))
+        hands = [hand(hand_id, int(x * 640), 300) for hand_id in ids]
+        process_gestures(engine, state, hands, now=frame[0] / 30)
+        frame[0] += 1
+        return ids
+
+    for _ in range(5):
+        assert step(True) == [0]
+    # Missed for fewer than `memory` frames: the same ID comes back
+    for _ in range(3):
+        assert step(False) == []
+        assert board.strokes.open == {}
+        assert all(not rule._held for rule in engine.rules)
+    assert step(True, 0.52) == [0]
+    assert list(board.strokes.open) == [0]
+
+    # Gone for longer: the track is forgotten and the hand gets a new ID
+    for _ in range(7):
+        step(False)
+    assert 0 not in associator.tracks
+    assert board.strokes.open == {}
+    assert all(not rule._held for rule in engine.rules)
+    assert step(True) == [1]
+    assert list(board.strokes.open) == [1]
+    assert all(set(rule._held) <= {1} for rule in engine.rules)
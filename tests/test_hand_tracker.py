@@ -0,0 +1,30 @@
+import numpy as np
+
+from benchmark import FRAME_H, FRAME_W, hand_pose
+from detectors import probe_frame
+from hand_tracker import HandTracker
+
+
+def test_workers_resize_for_frames_larger_than_warm_up():
+    tracker = HandTracker(model_path="unused", max_hands=1, workers=1, detector_kind="contour")
+    try:
+        tracker.warm_up((120, 160, 3), frames=1)
+        assert tracker.backend.frame_shape[:2] == (120, 160)
+        # The camera ignored the requested size
+        tracker.find_hands(probe_frame(320, 240), draw=False, timestamp_ms=1000)
+        assert tracker.backend.frame_shape[:2] == (240, 320)
+        assert len(tracker.landmarks) == 1
+    finally:
+        tracker.close()
+
+
+def test_fingers_use_the_current_frame_size():
+    fingers = [1, 1, 0, 0, 1]
+    landmarks = hand_pose(fingers, 320, 240)[None]
+    tracker = HandTracker(model_path=None, max_hands=1)
+    # A previous frame of a very different shape
+    tracker.set_landmarks(landmarks, ["Right"], frame_size=(64, 960))
+    tracker.find_position_array(np.zeros((960, 64, 3), np.uint8))
+    tracker.set_landmarks(landmarks, ["Right"], frame_size=(FRAME_W, FRAME_H))
+    assert tracker.fingers_up(hand_no=0) == fingers
+    assert tracker.fingers_up(0) == fingers
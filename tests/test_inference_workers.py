@@ -0,0 +1,24 @@
+import numpy as np
+
+from detectors import probe_frame
+from inference_workers import InferenceWorkerPool
+
+
+def test_pool_recovers_from_dead_worker():
+    frame = probe_frame(160, 120)
+    pool = InferenceWorkerPool(None, max_hands=1, workers=2, frame_shape=frame.shape, timeout=0.5,
+                               detector_options={"kind": "contour"}).start()
+    try:
+        expected = pool.detect(frame, 0)[0]
+        pool.processes[1].kill()
+        pool.processes[1].join()
+        for i in range(1, 9):
+            landmarks, _, _ = pool.detect(frame, i * 33, wait=i % 2 == 0)
+        # Frames the dead worker held are skipped, never waited on again
+        landmarks, _, _ = pool.detect(frame, 400)
+        assert pool.stats["restarts"] == 1
+        assert pool.stats["timeouts"] <= 2
+        assert len(pool._free) == pool.slots
+        assert np.array_equal(landmarks, expected)
+    finally:
+        pool.stop()
@@ -0,0 +1,23 @@
+import numpy as np
+
+from pipeline import FramePipeline
+
+
+class Camera:
+    live = True
+
+    def read(self, out=None):
+        return True, np.zeros((4, 4, 3), np.uint8)
+
+
+def test_inference_error_stops_pipeline():
+    def process(img):
+        raise ValueError("detector failed")
+
+    pipeline = FramePipeline(Camera(), process).start()
+    try:
+        assert pipeline.read(timeout=0.5) is None
+        assert pipeline.finished
+        assert isinstance(pipeline.error, ValueError)
+    finally:
+        pipeline.stop()
@@ -1,13 +1,17 @@
 import customtkinter as ctk
 
 class GesterUI(ctk.CTk):
-    def __init__(self, settings_callback=None):
+    def __init__(self, settings_callback=None, initial=None, stats_source=None):
+        # initial: current settings to start the sliders from; stats_source: callable
+        # returning live pipeline stats (settings_channel.SettingsChannel.read_stats)
         super().__init__()
         
         self.settings_callback = settings_callback
+        self.stats_source = stats_source
+        initial = initial or {}
         
         self.title("AI Virtual Mouse Settings")
-        self.geometry("400x500")
+        self.geometry("400x640")
         
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -17,14 +21,25 @@ class GesterUI(ctk.CTk):
         self.smoothing_label = ctk.CTkLabel(self, text="Smoothing (Lower = Faster)")
         self.smoothing_label.pack(pady=5)
         self.smoothing_slider = ctk.CTkSlider(self, from_=1, to=15, command=self.update_settings)
-        self.smoothing_slider.set(7)
+        self.smoothing_slider.set(initial.get("smoothing", 7))
         self.smoothing_slider.pack(pady=10)
         
         self.det_label = ctk.CTkLabel(self, text="Detection Confidence")
         self.det_label.pack(pady=5)
         self.det_slider = ctk.CTkSlider(self, from_=0.1, to=1.0, command=self.update_settings)
-        self.det_slider.set(0.8)
+        self.det_slider.set(initial.get("detection_con", 0.8))
         self.det_slider.pack(pady=10)
+
+        self.track_label = ctk.CTkLabel(self, text="Tracking Confidence")
+        self.track_label.pack(pady=5)
+        self.track_slider = ctk.CTkSlider(self, from_=0.1, to=1.0, command=self.update_settings)
+        self.track_slider.set(initial.get("track_con", 0.5))
+        self.track_slider.pack(pady=10)
+
+        self.stats_label = ctk.CTkLabel(self, text="Waiting for pipeline...", font=("Roboto Mono", 12), justify="left")
+        self.stats_label.pack(pady=5)
+        if self.stats_source:
+            self.after(500, self.refresh_stats)
         
         self.info_box = ctk.CTkTextbox(self, width=350, height=150)
         self.info_box.pack(pady=20)
@@ -42,10 +57,22 @@ class GesterUI(ctk.CTk):
         if self.settings_callback:
             settings = {
                 "smoothing": int(self.smoothing_slider.get()),
-                "detection_con": self.det_slider.get()
+                "detection_con": round(self.det_slider.get(), 2),
+                "track_con": round(self.track_slider.get(), 2)
             }
             self.settings_callback(settings)
 
+    def refresh_stats(self):
+        # Live p95 stage timings published by the vision loop
+        stats = self.stats_source()
+        if stats and stats["fps"] == stats["fps"]: # NaN until the first publish
+            lines = [f"FPS: {stats['fps']:.0f}"]
+            for name, value in stats.items():
+                if name != "fps" and value == value:
+                    lines.append(f"{name:<15} p95 {value:6.2f} ms")
+            self.stats_label.configure(text="\n".join(lines))
+        self.after(500, self.refresh_stats)
+
 def start_ui(callback):
     app = GesterUI(settings_callback=callback)
     app.mainloop()
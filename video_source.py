@@ -0,0 +1,242 @@
+import glob
+import os
+import struct
+import time
+
+import cv2
+import numpy as np
+
+# Frame sources all look like cv2.VideoCapture: read() -> (success, img),
+# isOpened(), release(). `live` tells the main loop whether a failed read means
+# "try again" (camera) or "end of stream" (files and logs). read(out) decodes
+# into `out` when it has the right size, like cv2.VideoCapture.read(image).
+
+
+class CameraSource:
+    live = True
+
+    def __init__(self, index=0, width=640, height=480):
+        self.cap = cv2.VideoCapture(index)
+        if self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, out=None):
+        return self.cap.read(out)
+
+    def grab(self):
+        # Takes the next frame off the device without decoding it (skipped frames)
+        return self.cap.grab()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    live = False
+
+    def __init__(self, path, width=None, height=None, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        self.loop = loop
+        self.size = (width, height) if width and height else None
+        self._needs_resize = False
+        self._decoded = None
+
+    def read(self, out=None):
+        # Frames that need resizing are decoded into a reused buffer first
+        target = self._decoded if self._needs_resize else out
+        success, img = self.cap.read(target)
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, img = self.cap.read(target)
+        if success:
+            self._needs_resize = bool(self.size) and (img.shape[1], img.shape[0]) != self.size
+            if self._needs_resize:
+                self._decoded = img
+                img = cv2.resize(img, self.size, dst=out)
+        return success, img
+
+
+class ImageDirSource:
+    live = False
+
+    def __init__(self, path, width=None, height=None, patterns=("*.png", "*.jpg", "*.jpeg", "*.bmp"), loop=False):
+        self.files = sorted(f for p in patterns for f in glob.glob(os.path.join(path, p)))
+        self.loop = loop
+        self.index = 0
+        self.size = (width, height) if width and height else None
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def grab(self):
+        if self.index >= len(self.files):
+            if not self.loop or not self.files:
+                return False
+            self.index = 0
+        self.index += 1
+        return True
+
+    def read(self, out=None):
+        if self.index >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self.index = 0
+        img = cv2.imread(self.files[self.index])
+        self.index += 1
+        if img is not None and self.size and (img.shape[1], img.shape[0]) != self.size:
+            img = cv2.resize(img, self.size, dst=out)
+        return img is not None, img
+
+    def release(self):
+        pass
+
+
+# --- Landmark log -------------------------------------------------------------
+# A fixed-size header followed by fixed-size records, so a whole session can be
+# np.memmap'ed and indexed without parsing:
+#   header: magic, version, max_hands, frame width, frame height
+#   record: timestamp (s), hand count, handedness per hand (0 left, 1 right,
+#           -1 unknown), landmarks (max_hands, 21, 3) float32 normalized x/y/z
+LOG_MAGIC = b"HLOG"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sHHII")
+LOG_HEADER_SIZE = 64
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_NAMES = {0: "Left", 1: "Right"}
+
+
+def log_record_dtype(max_hands):
+    return np.dtype([
+        ("t", "<f8"),
+        ("n", "u1"),
+        ("handedness", "i1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, 21, 3)),
+    ])
+
+
+class LandmarkLogWriter:
+    def __init__(self, path, max_hands=2, frame_size=(640, 480)):
+        self.max_hands = max_hands
+        self.file = open(path, "wb")
+        header = LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, max_hands, frame_size[0], frame_size[1])
+        self.file.write(header.ljust(LOG_HEADER_SIZE, b"\0"))
+        self.record = np.zeros(1, log_record_dtype(max_hands))
+        self.count = 0
+
+    def write(self, timestamp, landmarks, handedness=None):
+        rec = self.record[0]
+        n = min(len(landmarks), self.max_hands)
+        rec["t"] = timestamp
+        rec["n"] = n
+        rec["handedness"] = -1
+        rec["landmarks"] = 0
+        if n:
+            rec["landmarks"][:n] = landmarks[:n]
+            for i, label in enumerate((handedness or [])[:n]):
+                rec["handedness"][i] = HANDEDNESS_CODES.get(label, -1)
+        self.record.tofile(self.file)
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+class LandmarkLog:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, max_hands, width, height = LOG_HEADER.unpack(f.read(LOG_HEADER.size))
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f"{path} is not a landmark log (v{LOG_VERSION})")
+        self.max_hands = max_hands
+        self.frame_size = (width, height)
+        dtype = log_record_dtype(max_hands)
+        count = (os.path.getsize(path) - LOG_HEADER_SIZE) // dtype.itemsize
+        self.records = np.memmap(path, dtype=dtype, mode="r", offset=LOG_HEADER_SIZE, shape=(count,)) \
+            if count else np.zeros(0, dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        # -> (timestamp, landmarks (n, 21, 3), handedness labels)
+        rec = self.records[i]
+        n = int(rec["n"])
+        handedness = [HANDEDNESS_NAMES.get(int(c), "Unknown") for c in rec["handedness"][:n]]
+        return float(rec["t"]), rec["landmarks"][:n], handedness
+
+
+class LandmarkReplaySource:
+    # Plays a landmark log back as a frame source. Frames are a shared blank image
+    # of the recorded size; the landmarks for the frame just read are in
+    # `timestamp`, `landmarks` and `handedness` for HandTracker.set_landmarks().
+    live = False
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.log = LandmarkLog(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        width, height = self.log.frame_size
+        self.blank = np.zeros((height, width, 3), np.uint8)
+        self.timestamp, self.landmarks, self.handedness = 0.0, np.zeros((0, 21, 3), np.float32), []
+        self._start = None
+
+    def isOpened(self):
+        return len(self.log) > 0
+
+    def grab(self):
+        # Advances to the next record (timestamp, landmarks) without a frame
+        if self.index >= len(self.log):
+            if not self.loop or not len(self.log):
+                return False
+            self.index = 0
+            self._start = None
+        self.timestamp, self.landmarks, self.handedness = self.log[self.index]
+        self.index += 1
+
+        if self.realtime:
+            # Pace playback to the recorded timestamps
+            first_t = float(self.log.records[0]["t"])
+            if self._start is None:
+                self._start = time.perf_counter()
+            delay = (self.timestamp - first_t) - (time.perf_counter() - self._start)
+            if delay > 0:
+                time.sleep(delay)
+        return True
+
+    def read(self, out=None):
+        if not self.grab():
+            return False, None
+        frame = self.blank if out is None or out.shape != self.blank.shape else out
+        frame[:] = 0
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def is_landmark_log(spec):
+    return str(spec).endswith(".hlog")
+
+
+def open_source(spec, width=640, height=480, realtime=False):
+    # "0" / 0 -> camera index, directory -> images, *.hlog -> landmark replay,
+    # anything else -> video file.
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec), width, height)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, width, height)
+    if is_landmark_log(spec):
+        return LandmarkReplaySource(spec, realtime=realtime)
+    return VideoFileSource(spec, width, height)
@@ -0,0 +1,119 @@
+import cv2
+import numpy as np
+
+from strokes import StrokeStore
+
+
+class Whiteboard:
+    # The drawing itself is a StrokeStore (vector strokes with undo/redo); the
+    # canvas is its raster cache for compositing, drawn segment by segment as
+    # strokes grow and re-rasterized only on undo/redo. A stroke mask is kept up
+    # to date alongside. Compositing touches only the bounding box of what has
+    # been drawn since the last clear, in place on the frame, and is skipped
+    # while the board is blank. The raster buffers are allocated on first ink.
+    def __init__(self, width, height, threshold=50):
+        self.width, self.height = width, height
+        self.threshold = threshold
+        self.strokes = StrokeStore(width, height)
+        self.canvas = None
+        # 255 where a canvas pixel counts as ink (gray > threshold): those pixels
+        # replace the camera image, the rest is OR-ed onto it.
+        self.mask = None
+        self._gray = None
+        self.content_rect = None # (x0, y0, x1, y1), exclusive end
+
+    @property
+    def blank(self):
+        return self.content_rect is None
+
+    def _clip_rect(self, x0, y0, x1, y1):
+        return max(x0, 0), max(y0, 0), min(x1, self.width), min(y1, self.height)
+
+    def _ensure_canvas(self):
+        if self.canvas is None:
+            self.canvas = np.zeros((self.height, self.width, 3), np.uint8)
+            self.mask = np.zeros((self.height, self.width), np.uint8)
+            self._gray = np.zeros((self.height, self.width), np.uint8)
+
+    def line(self, p1, p2, color, thickness):
+        # Raster only: ink drawn here is not a stroke, so undo/redo drop it
+        self._ensure_canvas()
+        cv2.line(self.canvas, p1, p2, color, thickness)
+
+        pad = thickness // 2 + 2
+        # Dirty rect of this segment: refresh the mask there only
+        x0, y0, x1, y1 = self._clip_rect(min(p1[0], p2[0]) - pad, min(p1[1], p2[1]) - pad,
+                                         max(p1[0], p2[0]) + pad + 1, max(p1[1], p2[1]) + pad + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self._update_mask(x0, y0, x1, y1)
+
+        if self.content_rect is None:
+            self.content_rect = (x0, y0, x1, y1)
+        else:
+            cx0, cy0, cx1, cy1 = self.content_rect
+            self.content_rect = (min(cx0, x0), min(cy0, y0), max(cx1, x1), max(cy1, y1))
+
+    def stroke_to(self, hand, point, color, thickness):
+        # Continues the hand's open stroke to `point` (or starts one there)
+        stroke, prev = self.strokes.extend(hand, point, color, thickness)
+        self.line(prev, tuple(point), stroke.color, stroke.thickness)
+
+    def end_stroke(self, hand):
+        self.strokes.end(hand)
+
+    def end_strokes_except(self, hands):
+        self.strokes.end_missing(hands)
+
+    def undo(self):
+        if self.strokes.undo():
+            self.redraw()
+
+    def redo(self):
+        if self.strokes.redo():
+            self.redraw()
+
+    def redraw(self):
+        # Re-rasterizes the store: cost follows the drawn content, not the frame
+        self._clear_raster()
+        if not self.strokes.strokes:
+            return
+        self._ensure_canvas()
+        x0 = y0 = float("inf")
+        x1 = y1 = -x0
+        for stroke in self.strokes.strokes:
+            stroke.render(self.canvas)
+            pts, pad = stroke.points, stroke.thickness // 2 + 2
+            x0, y0 = min(x0, int(pts[:, 0].min()) - pad), min(y0, int(pts[:, 1].min()) - pad)
+            x1, y1 = max(x1, int(pts[:, 0].max()) + pad + 1), max(y1, int(pts[:, 1].max()) + pad + 1)
+        x0, y0, x1, y1 = self._clip_rect(x0, y0, x1, y1)
+        if x0 < x1 and y0 < y1:
+            self._update_mask(x0, y0, x1, y1)
+            self.content_rect = (x0, y0, x1, y1)
+
+    def _update_mask(self, x0, y0, x1, y1):
+        gray = self._gray[y0:y1, x0:x1]
+        cv2.cvtColor(self.canvas[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY, dst=gray)
+        cv2.threshold(gray, self.threshold, 255, cv2.THRESH_BINARY, dst=self.mask[y0:y1, x0:x1])
+
+    def clear(self):
+        self.strokes.clear()
+        self._clear_raster()
+
+    def _clear_raster(self):
+        if self.content_rect is not None:
+            x0, y0, x1, y1 = self.content_rect
+            self.canvas[y0:y1, x0:x1] = 0
+            self.mask[y0:y1, x0:x1] = 0
+        self.content_rect = None
+
+    def composite(self, img):
+        # Same result as the old full-frame (img & ~mask) | canvas, written into img
+        if self.content_rect is None:
+            return img
+        x0, y0, x1, y1 = self.content_rect
+        img_roi = img[y0:y1, x0:x1]
+        canvas_roi = self.canvas[y0:y1, x0:x1]
+        cv2.bitwise_or(img_roi, canvas_roi, dst=img_roi)
+        cv2.copyTo(canvas_roi, self.mask[y0:y1, x0:x1], img_roi)
+        return img